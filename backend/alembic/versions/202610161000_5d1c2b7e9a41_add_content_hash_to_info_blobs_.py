@@ -0,0 +1,29 @@
+# flake8: noqa
+
+"""add content hash to info blobs
+Revision ID: 5d1c2b7e9a41
+Revises: 1e58cb567f44
+Create Date: 2026-10-16 10:00:12.418203
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = "5d1c2b7e9a41"
+down_revision = "1e58cb567f44"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("info_blobs", sa.Column("content_hash", sa.String(), nullable=True))
+    op.add_column("info_blobs", sa.Column("etag", sa.String(), nullable=True))
+    op.add_column("info_blobs", sa.Column("last_modified", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("info_blobs", "last_modified")
+    op.drop_column("info_blobs", "etag")
+    op.drop_column("info_blobs", "content_hash")
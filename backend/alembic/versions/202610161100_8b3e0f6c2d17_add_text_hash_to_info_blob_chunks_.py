@@ -0,0 +1,29 @@
+# flake8: noqa
+
+"""add text hash to info blob chunks
+Revision ID: 8b3e0f6c2d17
+Revises: 5d1c2b7e9a41
+Create Date: 2026-10-16 11:00:41.902215
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = "8b3e0f6c2d17"
+down_revision = "5d1c2b7e9a41"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("info_blob_chunks", sa.Column("text_hash", sa.String(), nullable=True))
+    op.create_index(
+        op.f("ix_info_blob_chunks_text_hash"), "info_blob_chunks", ["text_hash"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_info_blob_chunks_text_hash"), table_name="info_blob_chunks")
+    op.drop_column("info_blob_chunks", "text_hash")
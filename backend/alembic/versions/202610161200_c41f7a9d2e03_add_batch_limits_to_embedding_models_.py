@@ -0,0 +1,27 @@
+# flake8: noqa
+
+"""add batch limits to embedding models
+Revision ID: c41f7a9d2e03
+Revises: 8b3e0f6c2d17
+Create Date: 2026-10-16 12:00:27.315640
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = "c41f7a9d2e03"
+down_revision = "8b3e0f6c2d17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("embedding_models", sa.Column("max_batch_size", sa.Integer(), nullable=True))
+    op.add_column("embedding_models", sa.Column("max_batch_tokens", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("embedding_models", "max_batch_tokens")
+    op.drop_column("embedding_models", "max_batch_size")
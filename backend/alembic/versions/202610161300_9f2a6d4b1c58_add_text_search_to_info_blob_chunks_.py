@@ -0,0 +1,72 @@
+# flake8: noqa
+
+"""add text search to info blob chunks
+Revision ID: 9f2a6d4b1c58
+Revises: c41f7a9d2e03
+Create Date: 2026-10-16 13:00:12.417305
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from intric.database.alembic_utils import update_in_batches
+
+
+# revision identifiers, used by Alembic
+revision = "9f2a6d4b1c58"
+down_revision = "c41f7a9d2e03"
+branch_labels = None
+depends_on = None
+
+
+TRIGGER_NAME = "info_blob_chunks_text_search"
+
+
+def upgrade() -> None:
+    # A plain column, unlike a stored generated one, is added without rewriting
+    # the table. A trigger keeps it up to date, for chunks copied in as well.
+    op.add_column(
+        "info_blob_chunks", sa.Column("text_search", postgresql.TSVECTOR(), nullable=True)
+    )
+    op.execute(
+        f"""
+        CREATE FUNCTION {TRIGGER_NAME}() RETURNS trigger AS $$
+        BEGIN
+            NEW.text_search := to_tsvector('simple', NEW.text);
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        f"""
+        CREATE TRIGGER {TRIGGER_NAME}
+            BEFORE INSERT OR UPDATE OF text
+            ON info_blob_chunks
+            FOR EACH ROW
+        EXECUTE PROCEDURE {TRIGGER_NAME}();
+        """
+    )
+
+    # Backfill and build the index without locking the table for writes
+    with op.get_context().autocommit_block():
+        update_in_batches(
+            op.get_bind(),
+            "info_blob_chunks",
+            set_clause="text_search = to_tsvector('simple', text)",
+            where_clause="text_search IS NULL",
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_info_blob_chunks_text_search "
+            "ON info_blob_chunks USING gin (text_search)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_info_blob_chunks_text_search")
+
+    op.execute(f"DROP TRIGGER IF EXISTS {TRIGGER_NAME} ON info_blob_chunks")
+    op.execute(f"DROP FUNCTION IF EXISTS {TRIGGER_NAME}()")
+    op.drop_column("info_blob_chunks", "text_search")
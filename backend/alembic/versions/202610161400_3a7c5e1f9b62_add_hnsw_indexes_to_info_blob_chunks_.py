@@ -0,0 +1,40 @@
+# flake8: noqa
+
+"""add hnsw indexes to info blob chunks
+Revision ID: 3a7c5e1f9b62
+Revises: 9f2a6d4b1c58
+Create Date: 2026-10-16 14:00:37.582114
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = "3a7c5e1f9b62"
+down_revision = "9f2a6d4b1c58"
+branch_labels = None
+depends_on = None
+
+# text-embedding-3-small, multilingual-e5-large and text-embedding-ada-002
+DIMENSIONS = (512, 1024, 1536)
+
+
+def upgrade() -> None:
+    # Build the indexes without locking the table for writes
+    with op.get_context().autocommit_block():
+        for dimensions in DIMENSIONS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                f"ix_info_blob_chunks_embedding_{dimensions} ON info_blob_chunks "
+                f"USING hnsw ((embedding::vector({dimensions})) vector_cosine_ops) "
+                f"WHERE vector_dims(embedding) = {dimensions}"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for dimensions in DIMENSIONS:
+            op.execute(
+                f"DROP INDEX CONCURRENTLY IF EXISTS ix_info_blob_chunks_embedding_{dimensions}"
+            )
@@ -0,0 +1,50 @@
+# flake8: noqa
+
+"""add source id to info blob chunks
+Revision ID: 6e0b4d2a7f13
+Revises: 3a7c5e1f9b62
+Create Date: 2026-10-16 15:00:21.904316
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from intric.database.alembic_utils import update_in_batches
+
+
+# revision identifiers, used by Alembic
+revision = "6e0b4d2a7f13"
+down_revision = "3a7c5e1f9b62"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("info_blob_chunks", sa.Column("source_id", sa.UUID(), nullable=True))
+
+    # Backfill and build the index without locking the table for writes
+    with op.get_context().autocommit_block():
+        update_in_batches(
+            op.get_bind(),
+            "info_blob_chunks",
+            set_clause=(
+                "source_id = COALESCE("
+                "info_blobs.group_id, info_blobs.website_id, info_blobs.integration_knowledge_id)"
+            ),
+            from_clause="FROM info_blobs",
+            where_clause=(
+                "info_blobs.id = info_blob_chunks.info_blob_id "
+                "AND info_blob_chunks.source_id IS NULL"
+            ),
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_info_blob_chunks_source_id "
+            "ON info_blob_chunks (source_id)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_info_blob_chunks_source_id")
+
+    op.drop_column("info_blob_chunks", "source_id")
@@ -0,0 +1,74 @@
+# flake8: noqa
+
+"""create transcription cache table
+Revision ID: b84e1c9d5a27
+Revises: 6e0b4d2a7f13
+Create Date: 2026-10-17 10:00:43.118204
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = "b84e1c9d5a27"
+down_revision = "6e0b4d2a7f13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transcription_cache",
+        sa.Column("checksum", sa.String(), nullable=False),
+        sa.Column("transcription", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "tenant_id",
+            sa.UUID(),
+            sa.ForeignKey("tenants.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "transcription_model_id",
+            sa.UUID(),
+            sa.ForeignKey("transcription_models.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "id",
+            sa.UUID(),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "tenant_id",
+            "checksum",
+            "transcription_model_id",
+            name="transcription_cache_tenant_checksum_model_unique",
+        ),
+    )
+    op.create_index(
+        op.f("ix_transcription_cache_expires_at"),
+        "transcription_cache",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_transcription_cache_expires_at"), table_name="transcription_cache")
+    op.drop_table("transcription_cache")
@@ -0,0 +1,28 @@
+# flake8: noqa
+
+"""add blob in store to files
+Revision ID: c39d7f2e8a41
+Revises: b84e1c9d5a27
+Create Date: 2026-10-17 11:00:12.530917
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = "c39d7f2e8a41"
+down_revision = "b84e1c9d5a27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "files",
+        sa.Column("blob_in_store", sa.Boolean(), server_default="False", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("files", "blob_in_store")
@@ -25,6 +25,8 @@ class EmbeddingModelBase(BaseModel):
     open_source: bool
     dimensions: Optional[int] = None
     max_input: Optional[int] = None
+    max_batch_size: Optional[int] = None
+    max_batch_tokens: Optional[int] = None
     hf_link: Optional[str] = None
     stability: ModelStability
     hosting: ModelHostingLocation
@@ -18,6 +18,7 @@ from intric.database.tables.questions_table import (
 )
 from intric.database.tables.sessions_table import Sessions
 from intric.database.tables.users_table import Users
+from intric.files.file_repo import defer_payload
 from intric.sessions.session import SessionInDB
 
 
@@ -92,6 +93,7 @@ class AnalysisRepository:
                 selectinload(Sessions.questions)
                 .selectinload(Questions.questions_files)
                 .selectinload(QuestionsFiles.file)
+                .options(*defer_payload())
             )
             .options(selectinload(Sessions.questions).selectinload(Questions.completion_model))
             .options(selectinload(Sessions.assistant).selectinload(Assistants.user))
@@ -138,6 +140,7 @@ class AnalysisRepository:
                 selectinload(Sessions.questions)
                 .selectinload(Questions.questions_files)
                 .selectinload(QuestionsFiles.file)
+                .options(*defer_payload())
             )
             .options(selectinload(Sessions.group_chat))
             .options(
@@ -4,7 +4,7 @@ from intric.apps.app_runs.api.app_run_models import AppRunParams
 from intric.apps.app_runs.app_run_factory import AppRunFactory
 from intric.apps.app_runs.app_run_repo import AppRunRepository
 from intric.apps.apps.app_service import AppService
-from intric.completion_models.infrastructure.context_builder import count_tokens
+from intric.completion_models.infrastructure.token_counter import count_tokens
 from intric.files.file_service import FileService
 from intric.jobs.job_models import Task
 from intric.jobs.job_service import JobService
@@ -252,7 +252,10 @@ class App:
         audio_files = [file for file in files if AudioMimeTypes.has_value(file.mimetype)]
 
         transcriptions = [
-            await transcriber.transcribe(file, self.transcription_model) for file in audio_files
+            await transcriber.transcribe(
+                file, self.transcription_model, retention_days=self.data_retention_days
+            )
+            for file in audio_files
         ]
 
         text_files = [file for file in files if TextMimeTypes.has_value(file.mimetype)]
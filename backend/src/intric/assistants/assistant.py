@@ -30,6 +30,7 @@ if TYPE_CHECKING:
     from intric.integration.domain.entities.integration_knowledge import (
         IntegrationKnowledge,
     )
+    from intric.services.service import DatastoreResult
     from intric.templates.assistant_template.assistant_template import AssistantTemplate
     from intric.websites.domain.website import Website
 
@@ -295,27 +296,24 @@ class Assistant(Entity):
             model_kwargs=model_kwargs,
         )
 
-    async def ask(
-        self,
-        question: str,
-        completion_service: "CompletionService",
-        references_service: "ReferencesService",
-        session: Optional["SessionInDB"] = None,
-        files: list["File"] = [],
-        stream: bool = False,
-        version: int = 1,
-        web_search_results: list["WebSearchResult"] = [],
-    ):
+    def validate_files(self, files: list["File"]):
         if any([file.file_type == FileType.IMAGE for file in files]):
             if not self.completion_model.vision:
                 raise BadRequestException(
                     f"Completion model {self.completion_model.name} do not support vision."
                 )
 
+    async def get_references(
+        self,
+        question: str,
+        references_service: "ReferencesService",
+        session: Optional["SessionInDB"] = None,
+        version: int = 1,
+    ) -> "DatastoreResult":
         # Fill half the context
         num_chunks = self.completion_model.token_limit // 200 // 2 if version == 2 else 30
 
-        datastore_result = await references_service.get_references(
+        return await references_service.get_references(
             question=question,
             session=session,
             collections=self.collections,
@@ -325,6 +323,29 @@ class Assistant(Entity):
             version=version,
         )
 
+    async def ask(
+        self,
+        question: str,
+        completion_service: "CompletionService",
+        references_service: "ReferencesService",
+        session: Optional["SessionInDB"] = None,
+        files: list["File"] = [],
+        stream: bool = False,
+        version: int = 1,
+        web_search_results: list["WebSearchResult"] = [],
+        datastore_result: Optional["DatastoreResult"] = None,
+    ):
+        self.validate_files(files)
+
+        # The references can be fetched beforehand, concurrently with other work
+        if datastore_result is None:
+            datastore_result = await self.get_references(
+                question=question,
+                references_service=references_service,
+                session=session,
+                version=version,
+            )
+
         response = await completion_service.get_response(
             model=self.completion_model,
             text_input=question,
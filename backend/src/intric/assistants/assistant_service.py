@@ -1,3 +1,4 @@
+import asyncio
 import re
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional, Union
@@ -12,9 +13,10 @@ from intric.assistants.assistant import Assistant
 from intric.assistants.assistant_factory import AssistantFactory
 from intric.assistants.assistant_repo import AssistantRepository
 from intric.authentication.auth_service import AuthService
-from intric.completion_models.infrastructure.context_builder import count_tokens
+from intric.completion_models.infrastructure.token_counter import count_tokens
 from intric.completion_models.infrastructure.web_search import WebSearch
 from intric.files.file_service import FileService
+from intric.main.config import get_settings
 from intric.main.exceptions import BadRequestException, UnauthorizedException
 from intric.main.models import NOT_PROVIDED, NotProvided
 from intric.prompts.api.prompt_models import PromptCreate
@@ -69,24 +71,90 @@ def clean_intric_tag(input_string: str):
     return re.sub(AT_TAG_PATTERN, "", input_string)
 
 
+# Longest possible match of REFERENCE_PATTERN
+REFERENCE_TAG_LENGTH = len('<inref id="00000000"/>')
+
+
+class ReferenceTracker:
+    """Finds the references in an answer as it is streamed.
+
+    Only the newly added text is scanned, together with the end of the
+    previous text in case a reference tag is split between two chunks.
+    """
+
+    def __init__(
+        self,
+        info_blobs: list["InfoBlobChunkInDBWithScore"],
+        version: int = 1,
+        get_id_func=lambda blob: blob.id,
+    ):
+        self.info_blobs = info_blobs
+        self.version = version
+        self.get_id_func = get_id_func
+
+        # Ordered set of the referenced ids, in order of appearance
+        self._reference_ids: dict[str, None] = {}
+        self._references = []
+        self._tail = ""
+        self._blobs_by_id = self._index_by_id(info_blobs, get_id_func)
+
+    @staticmethod
+    def _index_by_id(info_blobs, get_id_func):
+        blobs_by_id = {}
+        for blob in info_blobs:
+            blobs_by_id.setdefault(str(get_id_func(blob))[:8], blob)
+
+        return blobs_by_id
+
+    def add_text(self, text: str):
+        if self.version == 1:
+            return
+
+        text = f"{self._tail}{text}"
+
+        for blob_id in re.findall(REFERENCE_PATTERN, text):
+            if blob_id in self._reference_ids:
+                continue
+
+            self._reference_ids[blob_id] = None
+
+            blob = self._blobs_by_id.get(blob_id)
+            if blob is not None:
+                self._references.append(blob)
+
+        # A tag that is cut off can be at most one character shorter than a whole tag
+        self._tail = text[-(REFERENCE_TAG_LENGTH - 1) :]
+
+    @property
+    def references(self):
+        if self.version == 1:
+            return self.info_blobs
+
+        return list(self._references)
+
+    def get_references_from(self, info_blobs: list, get_id_func=lambda blob: blob.id):
+        """Get the referenced items among other items than the tracked ones,
+        for example the chunks rather than the info blobs of the answer."""
+        if self.version == 1:
+            return info_blobs
+
+        blobs_by_id = self._index_by_id(info_blobs, get_id_func)
+
+        return [blobs_by_id[blob_id] for blob_id in self._reference_ids if blob_id in blobs_by_id]
+
+
 def get_references(
     response_string: str,
     info_blobs: list["InfoBlobChunkInDBWithScore"],
     version: int = 1,
     get_id_func=lambda blob: blob.id,
 ):
-    if version == 1:
-        return info_blobs
-
-    # Preserve order, remove duplicates
-    info_blob_ids = list(dict.fromkeys(re.findall(REFERENCE_PATTERN, response_string)))
-
-    def _get_blob(blob_id):
-        return next((blob for blob in info_blobs if str(get_id_func(blob))[:8] == blob_id), None)
-
-    blobs = [_get_blob(blob_id) for blob_id in info_blob_ids]
+    reference_tracker = ReferenceTracker(
+        info_blobs=info_blobs, version=version, get_id_func=get_id_func
+    )
+    reference_tracker.add_text(response_string)
 
-    return [blob for blob in blobs if blob is not None]
+    return reference_tracker.references
 
 
 class AssistantService:
@@ -129,7 +197,7 @@ class AssistantService:
         self.references_service = references_service
 
     @property
-    async def web_search(self):
+    def web_search(self):
         return WebSearch()
 
     def validate_space_assistant(self, space: "Space", assistant: Assistant):
@@ -430,19 +498,19 @@ class AssistantService:
 
             async def response_stream():
                 reasoning_token_count = 0
-                response_string = ""
+                response_parts = []
                 generated_files = []
+                reference_tracker = ReferenceTracker(
+                    info_blobs=datastore_result.info_blobs, version=version
+                )
 
                 async for chunk in response.completion:
                     reasoning_token_count = chunk.reasoning_token_count
 
                     if chunk.response_type == ResponseType.TEXT:
-                        response_string = f"{response_string}{chunk.text}"
-                        chunk.reference_chunks = get_references(
-                            response_string=response_string,
-                            info_blobs=datastore_result.info_blobs,
-                            version=version,
-                        )
+                        response_parts.append(chunk.text or "")
+                        reference_tracker.add_text(chunk.text or "")
+                        chunk.reference_chunks = reference_tracker.references
                         yield chunk
 
                     if chunk.response_type == ResponseType.FILES:
@@ -456,10 +524,9 @@ class AssistantService:
                         yield chunk
 
                 # Get the references for the whole response
-                reference_chunks = get_references(
-                    response_string=response_string,
-                    info_blobs=datastore_result.no_duplicate_chunks,
-                    version=version,
+                response_string = "".join(response_parts)
+                reference_chunks = reference_tracker.get_references_from(
+                    datastore_result.no_duplicate_chunks,
                     get_id_func=lambda chunk: chunk.info_blob_id,
                 )
                 total_response_tokens = count_tokens(response_string) + reasoning_token_count
@@ -528,6 +595,41 @@ class AssistantService:
                     f"Embedding Model {item.embedding_model.name} is not in space."
                 )
 
+    async def _get_or_create_session(
+        self,
+        question: str,
+        files: list["File"],
+        assistant_id: "UUID",
+        session_id: Optional["UUID"] = None,
+        group_chat_id: Optional["UUID"] = None,
+    ) -> "SessionInDB":
+        if session_id is not None:
+            # Only the newest questions can fit in the context, don't load the rest
+            session = await self.session_service.get_session_with_recent_history(
+                id=session_id,
+                max_questions=get_settings().session_history_max_questions,
+                assistant_id=assistant_id if group_chat_id is None else None,
+                group_chat_id=group_chat_id,
+            )
+        else:
+            # Set the name as the question or the filenames
+            name = question
+            if not name and files:
+                name = " ".join(file.name for file in files)
+            if group_chat_id is not None:
+                session = await self.session_service.create_session(
+                    name=name, group_chat_id=group_chat_id
+                )
+            else:
+                session = await self.session_service.create_session(
+                    name=name, assistant_id=assistant_id
+                )
+
+        for _question in session.questions:
+            _question.question = clean_intric_tag(_question.question)
+
+        return session
+
     async def ask(
         self,
         question: str,
@@ -566,38 +668,41 @@ class AssistantService:
             assistant_to_ask = active_assistant
 
         cleaned_question = clean_intric_tag(question)
-        files = await self.file_service.get_files_by_ids(file_ids=file_ids)
 
-        if session_id is not None:
-            if group_chat_id is not None:
-                session = await self.session_service.get_session_by_uuid(
-                    id=session_id, group_chat_id=group_chat_id
-                )
-            else:
-                session = await self.session_service.get_session_by_uuid(
-                    id=session_id, assistant_id=assistant_id
-                )
+        # The web search only needs the question, so run it while the rest is
+        # fetched. The database work stays sequential, as it shares the
+        # session of the request.
+        if use_web_search and version == 2:
+            web_search_task = asyncio.create_task(self.web_search.search(search_query=question))
         else:
-            # Set the name as the question or the filenames
-            name = question
-            if not name and files:
-                name = " ".join(file.name for file in files)
-            if group_chat_id is not None:
-                session = await self.session_service.create_session(
-                    name=name, group_chat_id=group_chat_id
-                )
-            else:
-                session = await self.session_service.create_session(
-                    name=name, assistant_id=active_assistant.id
-                )
+            web_search_task = None
 
-        for _question in session.questions:
-            _question.question = clean_intric_tag(_question.question)
+        try:
+            files = await self.file_service.get_files_by_ids(file_ids=file_ids)
+            assistant_to_ask.validate_files(files)
 
-        if use_web_search and version == 2:
-            web_search_results = await self.web_search.search(search_query=question)
-        else:
-            web_search_results = []
+            session = await self._get_or_create_session(
+                question=question,
+                files=files,
+                assistant_id=active_assistant.id,
+                session_id=session_id,
+                group_chat_id=group_chat_id,
+            )
+
+            datastore_result = await assistant_to_ask.get_references(
+                question=cleaned_question,
+                references_service=self.references_service,
+                session=session,
+                version=version,
+            )
+
+            web_search_results = await web_search_task if web_search_task is not None else []
+        except BaseException:
+            if web_search_task is not None:
+                web_search_task.cancel()
+                # Wait for the cancelled search, so that it is not left pending
+                await asyncio.gather(web_search_task, return_exceptions=True)
+            raise
 
         response, datastore_result = await assistant_to_ask.ask(
             question=cleaned_question,
@@ -608,6 +713,7 @@ class AssistantService:
             stream=stream,
             version=version,
             web_search_results=web_search_results,
+            datastore_result=datastore_result,
         )
 
         # TODO: Separate the response based on stream true or false
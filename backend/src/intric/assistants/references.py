@@ -2,7 +2,8 @@ from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
 from intric.files.file_models import FileType
-from intric.info_blobs.info_blob import InfoBlobInDBWithScore
+from intric.info_blobs.info_blob import InfoBlobInDBNoTextWithScore
+from intric.main.config import get_settings
 from intric.services.service import DatastoreResult
 
 if TYPE_CHECKING:
@@ -40,6 +41,7 @@ class ReferencesService:
         integration_knowledge_list: list["IntegrationKnowledge"] = [],
         num_chunks: Optional[int] = None,
         version: int = 1,
+        question: Optional[str] = None,
     ) -> list["InfoBlobChunkInDBWithScore"]:
         if (collections or websites or integration_knowledge_list) and input_string:
             if version == 1:
@@ -55,6 +57,18 @@ class ReferencesService:
             elif integration_knowledge_list:
                 embedding_model = integration_knowledge_list[0].embedding_model
 
+            if get_settings().using_hybrid_search:
+                # Exact terms are searched for in the question only, not the conversation
+                return await self.datastore.hybrid_search(
+                    input_string,
+                    embedding_model=embedding_model,
+                    collections=collections,
+                    websites=websites,
+                    integration_knowledge_list=integration_knowledge_list,
+                    keyword_search_string=question,
+                    **search_params,
+                )
+
             return await self.datastore.semantic_search(
                 input_string,
                 embedding_model=embedding_model,
@@ -68,14 +82,20 @@ class ReferencesService:
 
     async def _get_info_blobs_from_chunks(
         self, info_blob_chunks: list["InfoBlobChunkInDBWithScore"]
-    ) -> list["InfoBlobInDBWithScore"]:
-        info_blobs = []
-        for chunk in info_blob_chunks:
-            info_blob = await self.info_blobs_repo.get(chunk.info_blob_id)
-            info_blob = InfoBlobInDBWithScore(**info_blob.model_dump(), score=chunk.score)
-            info_blobs.append(info_blob)
+    ) -> list["InfoBlobInDBNoTextWithScore"]:
+        info_blobs = await self.info_blobs_repo.get_many(
+            [chunk.info_blob_id for chunk in info_blob_chunks], without_text=True
+        )
+        info_blobs_by_id = {info_blob.id: info_blob for info_blob in info_blobs}
 
-        return info_blobs
+        # Keep the order of the chunks
+        return [
+            InfoBlobInDBNoTextWithScore(
+                **info_blobs_by_id[chunk.info_blob_id].model_dump(), score=chunk.score
+            )
+            for chunk in info_blob_chunks
+            if chunk.info_blob_id in info_blobs_by_id
+        ]
 
     def _get_info_blob_chunks_without_duplicates(
         self, info_blob_chunks: list["InfoBlobChunkInDBWithScore"]
@@ -148,6 +168,7 @@ class ReferencesService:
             integration_knowledge_list=integration_knowledge_list,
             num_chunks=num_chunks,
             version=version,
+            question=question,
         )
         no_duplicate_chunks = self._get_info_blob_chunks_without_duplicates(chunks)
         info_blobs = await self._get_info_blobs_from_chunks(no_duplicate_chunks)
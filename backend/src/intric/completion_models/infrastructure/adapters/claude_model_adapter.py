@@ -1,5 +1,3 @@
-import base64
-
 from anthropic import AsyncAnthropic
 
 from intric.ai_models.completion_models.completion_model import (
@@ -11,6 +9,7 @@ from intric.completion_models.infrastructure import get_response_claude
 from intric.completion_models.infrastructure.adapters.base_adapter import (
     CompletionModelAdapter,
 )
+from intric.files.encoded_image_cache import encoded_image_cache
 from intric.files.file_models import File
 from intric.main.config import get_settings
 from intric.main.logging import get_logger
@@ -43,7 +42,7 @@ class ClaudeModelAdapter(CompletionModelAdapter):
         return self.model.token_limit
 
     def _build_image_input(self, file: File):
-        image_data = base64.b64encode(file.blob).decode("utf-8")
+        image_data = encoded_image_cache.encode(file)
 
         return {
             "type": "image",
@@ -1,4 +1,3 @@
-import base64
 import json
 
 from openai import AsyncOpenAI
@@ -12,6 +11,7 @@ from intric.completion_models.infrastructure import get_response_open_ai
 from intric.completion_models.infrastructure.adapters.base_adapter import (
     CompletionModelAdapter,
 )
+from intric.files.encoded_image_cache import encoded_image_cache
 from intric.files.file_models import File
 from intric.logging.logging import LoggingDetails
 from intric.main.config import get_settings
@@ -49,7 +49,7 @@ class OpenAIModelAdapter(CompletionModelAdapter):
         )
 
     def _build_image(self, file: File):
-        image_data = base64.b64encode(file.blob).decode("utf-8")
+        image_data = encoded_image_cache.encode(file)
 
         return {
             "type": "image_url",
@@ -20,6 +20,8 @@ from intric.completion_models.infrastructure.adapters import (
     VLMMModelAdapter,
 )
 from intric.completion_models.infrastructure.context_builder import ContextBuilder
+from intric.files.blob_store import load_blobs
+from intric.files.encoded_image_cache import encoded_image_cache
 from intric.files.file_models import File
 from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
 from intric.main.config import SETTINGS
@@ -32,6 +34,7 @@ if TYPE_CHECKING:
         CompletionModelAdapter,
     )
     from intric.completion_models.infrastructure.web_search import WebSearchResult
+    from intric.files.file_repo import FileRepository
     from intric.main.container.container import Container
 
 logger = get_logger(__name__)
@@ -47,6 +50,7 @@ class CompletionService:
     def __init__(
         self,
         context_builder: ContextBuilder,
+        file_repo: FileRepository | None = None,
     ):
         self._adapters = {
             ModelFamily.OPEN_AI: OpenAIModelAdapter,
@@ -57,6 +61,7 @@ class CompletionService:
             ModelFamily.MISTRAL: MistralModelAdapter,
         }
         self.context_builder = context_builder
+        self.file_repo = file_repo
 
     def _get_adapter(self, model: CompletionModel) -> "CompletionModelAdapter":
         adapter_class = self._adapters.get(model.family.value)
@@ -112,6 +117,29 @@ class CompletionService:
 
                 yield chunk
 
+    async def _load_images(self, images: list[File]):
+        """Loads and encodes the images that are not encoded already.
+
+        The encodings found in the cache are kept with the images right away,
+        as they could be evicted while the other images are loaded.
+        """
+        for image in images:
+            if image.encoded_blob is None:
+                image.encoded_blob = encoded_image_cache.get(image.checksum)
+
+        unloaded = [image for image in images if image.encoded_blob is None and image.blob is None]
+
+        deferred = [image for image in unloaded if not image.payload_loaded]
+        if deferred and self.file_repo is not None:
+            blobs = await self.file_repo.get_blobs([image.id for image in deferred])
+            for image in deferred:
+                image.blob = blobs.get(image.id)
+
+        await load_blobs(unloaded)
+
+        for image in images:
+            image.encoded_blob = encoded_image_cache.encode(image)
+
     async def get_response(
         self,
         model: CompletionModel,
@@ -150,6 +178,17 @@ class CompletionService:
             version=version,
             use_image_generation=use_image_generation,
             web_search_results=web_search_results,
+            model_name=model.name,
+        )
+
+        # Only the images of the messages that fit in the context are loaded
+        await self._load_images(
+            context.images
+            + [
+                image
+                for message in context.messages
+                for image in message.images + message.generated_images
+            ]
         )
 
         if extended_logging:
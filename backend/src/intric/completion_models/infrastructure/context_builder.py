@@ -2,8 +2,6 @@ from collections import defaultdict
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Optional
 
-import tiktoken
-
 from intric.ai_models.completion_models.completion_model import (
     Context,
     FunctionDefinition,
@@ -14,6 +12,7 @@ from intric.completion_models.infrastructure.static_prompts import (
     SHOW_REFERENCES_PROMPT,
     TRANSCRIPTION_PROMPT,
 )
+from intric.completion_models.infrastructure.token_counter import TokenCounter
 from intric.files.file_models import File, FileType
 from intric.main.exceptions import QueryException
 from intric.sessions.session import SessionInDB
@@ -30,14 +29,6 @@ MIN_PERCENTAGE_KNOWLEDGE = (
 )
 
 
-def count_tokens(text: str):
-    # ensure we're always passing a string to the encoder
-    if text is None:
-        return 0
-    encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(text))
-
-
 def _build_files_string(files: list[File]):
     if files:
         files_string = "\n".join(
@@ -67,7 +58,8 @@ class ChunkGrouping:
 
 
 class _Prompt:
-    def __init__(self, version: int = 1):
+    def __init__(self, version: int = 1, token_counter: Optional[TokenCounter] = None):
+        self.token_counter = token_counter or TokenCounter()
         self.prompt = None
         self.knowledge = None
         self.web_search_result = None
@@ -156,17 +148,19 @@ class _Prompt:
         # Create a dictionary to store chunk indices
         chunk_indices = {id(chunk): i for i, chunk in enumerate(chunks)}
 
+        # Count all chunks in one batch rather than one encoder call per chunk
+        tokens_of_chunks = self.token_counter.count_batch([chunk.text for chunk in chunks])
+
         # Group chunks by info_blob
         chunks_by_info_blob = {}
         used_tokens = 0
-        for chunk in chunks:
-            chunk_tokens = count_tokens(chunk.text)
+        for chunk, chunk_tokens in zip(chunks, tokens_of_chunks):
 
             if chunks_by_info_blob.get(chunk.info_blob_id) is None:
                 chunks_by_info_blob[chunk.info_blob_id] = []
 
                 # Count the tokens for the metadata
-                chunk_tokens += count_tokens(
+                chunk_tokens += self.token_counter.count(
                     '"""source_title: {}, source_id: {}\n"""'.format(
                         chunk.info_blob_title, str(chunk.info_blob_id)[:8]
                     )
@@ -257,7 +251,7 @@ class _Prompt:
 
     @property
     def num_tokens(self):
-        return count_tokens(str(self))
+        return self.token_counter.count(str(self))
 
     def add_prompt(
         self,
@@ -341,11 +335,17 @@ class ContextBuilder:
         return [file for file in files if file.file_type == file_type]
 
     def _build_messages(
-        self, session: Optional[SessionInDB], max_tokens: int, min_len: int = 3
+        self,
+        session: Optional[SessionInDB],
+        max_tokens: int,
+        min_len: int = 3,
+        token_counter: Optional[TokenCounter] = None,
     ):
         if session is None:
             return [], 0
 
+        token_counter = token_counter or TokenCounter()
+
         messages = []
         total_tokens = 0
 
@@ -360,7 +360,9 @@ class ContextBuilder:
                 message.generated_files, FileType.IMAGE
             )
 
-            message_tokens = count_tokens(question) + count_tokens(answer)
+            # Previous questions and answers never change, so their counts are memoized
+            message_tokens = token_counter.count_immutable(question)
+            message_tokens += token_counter.count_immutable(answer)
 
             if len(messages) > min_len and total_tokens + message_tokens > max_tokens:
                 break
@@ -393,7 +395,9 @@ class ContextBuilder:
         version: int = 1,
         use_image_generation: bool = False,
         web_search_results: list["WebSearchResult"] = [],
+        model_name: Optional[str] = None,
     ):
+        token_counter = TokenCounter(model_name=model_name)
         tokens_used = 0
         max_tokens_usable = max_tokens - CONTEXT_SIZE_BUFFER  # Leave some room.
 
@@ -403,12 +407,12 @@ class ContextBuilder:
             files=self._get_files_by_type(files, FileType.TEXT),
             transcription_inputs=transcription_inputs,
         )
-        tokens_used_input = count_tokens(_input_string)
+        tokens_used_input = token_counter.count(_input_string)
         tokens_used += tokens_used_input
 
         # Create the necessary parts of the prompt.
         # Add the tokens used.
-        _prompt = _Prompt(version=version)
+        _prompt = _Prompt(version=version, token_counter=token_counter)
         _prompt.add_prompt(
             prompt=prompt,
             transcription=bool(transcription_inputs),
@@ -426,7 +430,10 @@ class ContextBuilder:
             int(max_tokens_usable * (1 - MIN_PERCENTAGE_KNOWLEDGE)) - tokens_used
         )
         messages, tokens_used_messages = self._build_messages(
-            session=session, max_tokens=max_tokens_messages, min_len=3
+            session=session,
+            max_tokens=max_tokens_messages,
+            min_len=3,
+            token_counter=token_counter,
         )
         tokens_used += tokens_used_messages
 
@@ -0,0 +1,95 @@
+import functools
+import time
+from typing import Optional
+
+import tiktoken
+
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_ENCODING_NAME = "cl100k_base"
+MEMOIZED_COUNTS_MAX_SIZE = 8192
+
+# Seconds before an encoding that could not be loaded is tried again
+ENCODING_RETRY_SECONDS = 60
+
+# When loading an encoding last failed, by encoding name
+_failed_encodings: dict[str, float] = {}
+
+
+@functools.cache
+def get_encoding(encoding_name: str = DEFAULT_ENCODING_NAME) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(encoding_name)
+
+
+@functools.cache
+def get_encoding_name_for_model(model_name: Optional[str] = None) -> str:
+    if model_name is None:
+        return DEFAULT_ENCODING_NAME
+
+    # Models that tiktoken does not know about (Claude, Mistral, open source models)
+    # are counted with the default encoding. Not exact, but close enough.
+    try:
+        return tiktoken.encoding_name_for_model(model_name)
+    except KeyError:
+        return DEFAULT_ENCODING_NAME
+
+
+def get_encoding_for_model(model_name: Optional[str] = None) -> tiktoken.Encoding:
+    encoding_name = get_encoding_name_for_model(model_name)
+
+    # The encoding files are downloaded on first use, which fails on hosts
+    # without internet access. Fall back to the default encoding rather than
+    # failing the request. Only loaded encodings are cached by `get_encoding`,
+    # so the encoding of the model is tried again after a while.
+    failed_at = _failed_encodings.get(encoding_name)
+    if failed_at is None or time.monotonic() - failed_at >= ENCODING_RETRY_SECONDS:
+        try:
+            encoding = get_encoding(encoding_name)
+        except Exception:
+            _failed_encodings[encoding_name] = time.monotonic()
+            logger.exception(f"Could not load encoding {encoding_name}, using the default")
+        else:
+            _failed_encodings.pop(encoding_name, None)
+            return encoding
+
+    return get_encoding(DEFAULT_ENCODING_NAME)
+
+
+@functools.lru_cache(maxsize=MEMOIZED_COUNTS_MAX_SIZE)
+def _count_tokens_memoized(text: str, encoding_name: str) -> int:
+    return len(get_encoding(encoding_name).encode(text))
+
+
+class TokenCounter:
+    def __init__(self, model_name: Optional[str] = None):
+        self.encoding = get_encoding_for_model(model_name)
+        self.encoding_name = self.encoding.name
+
+    def count(self, text: Optional[str]) -> int:
+        # ensure we're always passing a string to the encoder
+        if text is None:
+            return 0
+
+        return len(self.encoding.encode(text))
+
+    def count_batch(self, texts: list[Optional[str]]) -> list[int]:
+        encoded = self.encoding.encode_batch([text or "" for text in texts])
+        return [len(tokens) for tokens in encoded]
+
+    def count_immutable(self, text: Optional[str]) -> int:
+        """Counts the tokens of a text that never changes, such as a stored
+        question or answer. The count is memoized across calls."""
+        if text is None:
+            return 0
+
+        return _count_tokens_memoized(text, self.encoding_name)
+
+
+def count_tokens(text: Optional[str]) -> int:
+    return TokenCounter().count(text)
+
+
+def count_tokens_batch(texts: list[Optional[str]]) -> list[int]:
+    return TokenCounter().count_batch(texts)
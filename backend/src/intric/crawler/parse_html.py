@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
@@ -13,6 +14,16 @@ class CrawledPage:
     url: str
     title: str
     content: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def _get_header(response: Response, name: str) -> Optional[str]:
+    value = response.headers.get(name)
+    if value is None:
+        return None
+
+    return value.decode("utf-8", errors="ignore")
 
 
 def parse_response(response: Response):
@@ -26,7 +37,13 @@ def parse_response(response: Response):
     title = response.css("title::text").get()
     url = response.url
 
-    return CrawledPage(url=url, title=title, content=content)
+    return CrawledPage(
+        url=url,
+        title=title,
+        content=content,
+        etag=_get_header(response, "ETag"),
+        last_modified=_get_header(response, "Last-Modified"),
+    )
 
 
 def parse_file(response: Response):
@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -6,13 +7,24 @@ from sqlalchemy.sql import text
 
 from intric.database.tables.app_table import AppRuns, Apps
 from intric.database.tables.assistant_table import Assistants
+from intric.database.tables.files_table import Files
 from intric.database.tables.questions_table import Questions
 from intric.database.tables.sessions_table import Sessions
+from intric.database.tables.transcription_cache_table import TranscriptionCache
+from intric.files.blob_store import BlobStore, blob_store
+
+# Blobs are kept at least this long, so that a blob is not deleted between being
+# stored and the file that refers to it being added
+BLOB_GRACE_PERIOD = timedelta(days=1)
+
+# Blobs checked for references at a time
+BLOB_BATCH_SIZE = 1000
 
 
 class DataRetentionService:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, blob_store: Optional[BlobStore] = blob_store):
         self.session = session
+        self.blob_store = blob_store
 
     async def delete_old_questions(self):
         subquery = (
@@ -57,3 +69,51 @@ class DataRetentionService:
 
         query = sa.delete(Sessions).where(Sessions.id.in_(subquery))
         await self.session.execute(query)
+
+    async def delete_expired_transcriptions(self):
+        query = sa.delete(TranscriptionCache).where(TranscriptionCache.expires_at <= sa.func.now())
+        await self.session.execute(query)
+
+    async def _delete_unreferenced_blobs(
+        self, checksums: list[str], stored_before: datetime
+    ) -> int:
+        query = sa.select(Files.checksum).where(
+            Files.checksum.in_(checksums), Files.blob_in_store.is_(True)
+        )
+        referenced = set(await self.session.scalars(query))
+
+        num_deleted = 0
+        for checksum in checksums:
+            if checksum in referenced:
+                continue
+
+            # Stored again since it was listed, by a file that is not added yet
+            stored_at = await self.blob_store.stored_at(checksum)
+            if stored_at is None or stored_at >= stored_before:
+                continue
+
+            await self.blob_store.delete(checksum)
+            num_deleted += 1
+
+        return num_deleted
+
+    async def delete_unreferenced_blobs(self) -> int:
+        """Delete the blobs that no file refers to anymore, since files are
+        deleted without their blobs."""
+        if self.blob_store is None:
+            return 0
+
+        stored_before = datetime.now(timezone.utc) - BLOB_GRACE_PERIOD
+        num_deleted = 0
+        batch = []
+
+        async for checksum in self.blob_store.list_checksums(stored_before):
+            batch.append(checksum)
+            if len(batch) >= BLOB_BATCH_SIZE:
+                num_deleted += await self._delete_unreferenced_blobs(batch, stored_before)
+                batch = []
+
+        if batch:
+            num_deleted += await self._delete_unreferenced_blobs(batch, stored_before)
+
+        return num_deleted
@@ -12,4 +12,11 @@ async def cleanup_old_data(container: Container):
         await data_retention_service.delete_old_questions()
         await data_retention_service.delete_old_app_runs()
         await data_retention_service.delete_old_sessions()
+        await data_retention_service.delete_expired_transcriptions()
+
+    # Blobs can not be restored by a rollback, they are checked for references in
+    # a transaction of their own
+    async with container.session().begin():
+        await data_retention_service.delete_unreferenced_blobs()
+
     return True
@@ -18,3 +18,46 @@ def timestamps(indexed: bool = False) -> tuple[sa.Column, sa.Column]:
             index=indexed,
         ),
     )
+
+
+def update_in_batches(
+    connection: sa.Connection,
+    table: str,
+    set_clause: str,
+    from_clause: str = "",
+    where_clause: str = "",
+    batch_size: int = 10_000,
+):
+    """Update every row of a table in batches of ids, for backfills of large tables.
+
+    Run it inside `op.get_context().autocommit_block()`, so that every batch
+    commits on its own. The rows are then only locked, and the dead versions
+    left by the update only add up, one batch at a time.
+    """
+    last_id = None
+    while True:
+        after_last = "" if last_id is None else f"WHERE {table}.id > :last_id"
+        upper_id = connection.execute(
+            sa.text(
+                f"SELECT id FROM (SELECT id FROM {table} {after_last} "
+                f"ORDER BY id LIMIT :batch_size) AS batch ORDER BY id DESC LIMIT 1"
+            ),
+            {"last_id": last_id, "batch_size": batch_size},
+        ).scalar()
+        if upper_id is None:
+            return
+
+        conditions = [f"{table}.id <= :upper_id"]
+        if last_id is not None:
+            conditions.append(f"{table}.id > :last_id")
+        if where_clause:
+            conditions.append(f"({where_clause})")
+
+        connection.execute(
+            sa.text(
+                f"UPDATE {table} SET {set_clause} {from_clause} "
+                f"WHERE {' AND '.join(conditions)}"
+            ),
+            {"last_id": last_id, "upper_id": upper_id},
+        )
+        last_id = upper_id
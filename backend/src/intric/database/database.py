@@ -1,6 +1,8 @@
 import contextlib
 from typing import AsyncIterator
 
+from pgvector.utils import from_db, from_db_binary, to_db_binary
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
     AsyncEngine,
@@ -14,6 +16,30 @@ from intric.main.logging import get_logger
 logger = get_logger(__name__)
 
 
+def _encode_vector(value):
+    # pgvector.sqlalchemy binds vectors in the text format
+    if isinstance(value, str):
+        value = from_db(value)
+
+    return to_db_binary(value)
+
+
+async def register_vector_codec(connection):
+    """Send and receive vectors in the binary format of pgvector, which is
+    smaller and cheaper to encode, and what COPY of embeddings requires."""
+    try:
+        await connection.set_type_codec(
+            "vector", encoder=_encode_vector, decoder=from_db_binary, format="binary"
+        )
+    except ValueError:
+        # The vector extension is created by the first migration
+        logger.warning("Vector type not found, vectors are sent in the text format")
+
+
+def _on_connect(dbapi_connection, connection_record):
+    dbapi_connection.run_async(register_vector_codec)
+
+
 class DatabaseSessionManager:
     def __init__(self):
         self._engine: AsyncEngine | None = None
@@ -21,6 +47,7 @@ class DatabaseSessionManager:
 
     def init(self, host: str):
         self._engine = create_async_engine(host, pool_size=20, max_overflow=10)
+        event.listen(self._engine.sync_engine, "connect", _on_connect)
         self._sessionmaker = async_sessionmaker(
             autocommit=False, bind=self._engine, autobegin=False
         )
@@ -25,6 +25,7 @@ import intric.database.tables.sessions_table
 import intric.database.tables.settings_table
 import intric.database.tables.spaces_table
 import intric.database.tables.tenant_table
+import intric.database.tables.transcription_cache_table
 import intric.database.tables.user_groups_table
 import intric.database.tables.users_table
 import intric.database.tables.web_search_results_table
@@ -15,6 +15,7 @@ class Files(BasePublic):
     name: Mapped[str] = mapped_column()
     text: Mapped[Optional[str]] = mapped_column()
     blob: Mapped[Optional[bytes]] = mapped_column(BYTEA)
+    blob_in_store: Mapped[bool] = mapped_column(server_default="False")
     checksum: Mapped[str] = mapped_column(index=True)
     size: Mapped[int] = mapped_column()
     mimetype: Mapped[Optional[str]] = mapped_column()
@@ -1,19 +1,42 @@
+from typing import Optional
 from uuid import UUID
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from intric.database.tables.base_class import BasePublic
 from intric.database.tables.info_blobs_table import InfoBlobs
 from intric.database.tables.tenant_table import Tenants
 
+# The simple configuration does no stemming or stop word removal, which keeps
+# exact terms like product codes and case numbers searchable in any language
+TEXT_SEARCH_CONFIG = "simple"
+
+# The embedding column is untyped since it holds embeddings of every model, and
+# an untyped vector can not be indexed. Instead there is one partial HNSW index
+# per dimension, on the embeddings cast to that dimension.
+EMBEDDING_INDEX_DIMENSIONS = (512, 1024, 1536)
+
+
+def _embedding_index(dimensions: int):
+    return Index(
+        f"ix_info_blob_chunks_embedding_{dimensions}",
+        text(f"(embedding::vector({dimensions})) vector_cosine_ops"),
+        postgresql_using="hnsw",
+        postgresql_where=text(f"vector_dims(embedding) = {dimensions}"),
+    )
+
 
 class InfoBlobChunks(BasePublic):
     text: Mapped[str] = mapped_column()
     chunk_no: Mapped[int] = mapped_column()
     size: Mapped[int] = mapped_column()
     embedding: Mapped[list[float]] = mapped_column(Vector)
+    text_hash: Mapped[Optional[str]] = mapped_column(index=True)
+    # Set to to_tsvector(TEXT_SEARCH_CONFIG, text) by a trigger on insert and update
+    text_search: Mapped[Optional[str]] = mapped_column(TSVECTOR, deferred=True)
 
     # Foreign keys
     info_blob_id: Mapped[UUID] = mapped_column(
@@ -22,3 +45,12 @@ class InfoBlobChunks(BasePublic):
     tenant_id: Mapped[UUID] = mapped_column(
         ForeignKey(Tenants.id, ondelete="CASCADE"), index=True
     )
+
+    # The group, website or integration knowledge of the info blob, copied here so
+    # that searches can filter on it without joining the info blobs first
+    source_id: Mapped[Optional[UUID]] = mapped_column(index=True)
+
+    __table_args__ = (
+        Index("ix_info_blob_chunks_text_search", "text_search", postgresql_using="gin"),
+        *(_embedding_index(dimensions) for dimensions in EMBEDDING_INDEX_DIMENSIONS),
+    )
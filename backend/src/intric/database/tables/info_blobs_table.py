@@ -18,6 +18,9 @@ class InfoBlobs(BasePublic):
     title: Mapped[Optional[str]] = mapped_column()
     url: Mapped[Optional[str]] = mapped_column()
     size: Mapped[int] = mapped_column()
+    content_hash: Mapped[Optional[str]] = mapped_column()
+    etag: Mapped[Optional[str]] = mapped_column()
+    last_modified: Mapped[Optional[str]] = mapped_column()
 
     # Foreign keys
     user_id: Mapped[UUID] = mapped_column(ForeignKey(Users.id, ondelete="CASCADE"), index=True)
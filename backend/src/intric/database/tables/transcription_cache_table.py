@@ -0,0 +1,30 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from intric.database.tables.ai_models_table import TranscriptionModels
+from intric.database.tables.base_class import BasePublic
+from intric.database.tables.tenant_table import Tenants
+
+
+class TranscriptionCache(BasePublic):
+    checksum: Mapped[str] = mapped_column()
+    transcription: Mapped[str] = mapped_column()
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+    # Foreign keys
+    tenant_id: Mapped[UUID] = mapped_column(ForeignKey(Tenants.id, ondelete="CASCADE"))
+    transcription_model_id: Mapped[UUID] = mapped_column(
+        ForeignKey(TranscriptionModels.id, ondelete="CASCADE")
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "tenant_id",
+            "checksum",
+            "transcription_model_id",
+            name="transcription_cache_tenant_checksum_model_unique",
+        ),
+    )
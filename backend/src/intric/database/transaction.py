@@ -1,3 +1,4 @@
+import contextlib
 import uuid
 
 import wrapt
@@ -22,3 +23,22 @@ def gen_transaction(session: AsyncSession):
         logger.debug(f"Transaction {transaction_id} ended")
 
     return _inner
+
+
+@contextlib.asynccontextmanager
+async def unit_of_work(session: AsyncSession, savepoint: bool = True):
+    """Runs a unit of work of a job in a transaction of its own.
+
+    Jobs that run with short transactions (see `Worker.task`) have no
+    transaction open between their units of work, and commit every unit as it
+    is done. Otherwise the unit is part of the open transaction, in a savepoint
+    unless `savepoint` is False, so that a failing unit leaves the rest intact.
+    """
+    if not session.in_transaction():
+        async with session.begin():
+            yield
+    elif savepoint:
+        async with session.begin_nested():
+            yield
+    else:
+        yield
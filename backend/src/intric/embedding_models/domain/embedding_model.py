@@ -45,6 +45,8 @@ class EmbeddingModel(AIModel):
         max_input: int,
         dimensions: Optional[int],
         security_classification: Optional[SecurityClassification],
+        max_batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
     ):
         super().__init__(
             user=user,
@@ -67,6 +69,8 @@ class EmbeddingModel(AIModel):
 
         self.max_input = max_input
         self.dimensions = dimensions
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
 
     @classmethod
     def to_domain(
@@ -103,6 +107,8 @@ class EmbeddingModel(AIModel):
             is_org_enabled=is_org_enabled,
             max_input=db_model.max_input,
             dimensions=db_model.dimensions,
+            max_batch_size=db_model.max_batch_size,
+            max_batch_tokens=db_model.max_batch_tokens,
             security_classification=SecurityClassification.to_domain(
                 db_security_classification=security_classification
             ),
@@ -1,32 +1,87 @@
 import abc
+import asyncio
 from abc import abstractmethod
 
 from intric.embedding_models.domain.embedding_model import EmbeddingModel
+from intric.embedding_models.infrastructure.adapters.rate_limiter import get_rate_limiter
 from intric.files.chunk_embedding_list import ChunkEmbeddingList
 from intric.info_blobs.info_blob import InfoBlobChunk
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 2048
+DEFAULT_MAX_BATCH_TOKENS = 8191
 
 
 class EmbeddingModelAdapter(abc.ABC):
     def __init__(self, model: EmbeddingModel):
         self.model = model
 
+    @staticmethod
+    def _count_tokens(chunk: "InfoBlobChunk") -> int:
+        if chunk.num_tokens is not None:
+            return chunk.num_tokens
+
+        # Roughly four characters per token
+        return len(chunk.text) // 4 + 1
+
     def _chunk_chunks(self, chunks: list["InfoBlobChunk"]):
-        cum_len = 0
-        prev_i = 0
-        for i, chunk in enumerate(chunks):
-            cum_len += len(chunk.text)
+        """Packs the chunks into batches that are as large as the model
+        allows, both in number of inputs and in tokens per request."""
+        max_batch_size = self.model.max_batch_size or DEFAULT_MAX_BATCH_SIZE
+        max_batch_tokens = (
+            self.model.max_batch_tokens or self.model.max_input or DEFAULT_MAX_BATCH_TOKENS
+        )
+
+        batch = []
+        batch_tokens = 0
+        for chunk in chunks:
+            num_tokens = self._count_tokens(chunk)
+
+            if batch and (
+                len(batch) >= max_batch_size or batch_tokens + num_tokens > max_batch_tokens
+            ):
+                yield batch
+                batch = []
+                batch_tokens = 0
+
+            batch.append(chunk)
+            batch_tokens += num_tokens
 
-            if cum_len > self.model.max_input:
-                yield chunks[prev_i:i]
-                prev_i = i
-                cum_len = 0
+        if batch:
+            yield batch
 
-        yield chunks[prev_i:]
+    async def _get_embeddings_for_batch(self, chunks: list[InfoBlobChunk]) -> list[list[float]]:
+        num_tokens = sum(self._count_tokens(chunk) for chunk in chunks)
+
+        async with get_rate_limiter(self.model).limit(num_tokens):
+            logger.debug(f"Embedding a chunk of {len(chunks)} chunks")
+            return await self._get_embeddings_for_chunks(chunks)
+
+    async def get_embeddings(self, chunks: list[InfoBlobChunk]) -> ChunkEmbeddingList:
+        batches = list(self._chunk_chunks(chunks))
+
+        # The rate limiter bounds how many of these run at the same time
+        tasks = [asyncio.create_task(self._get_embeddings_for_batch(batch)) for batch in batches]
+
+        chunk_embedding_list = ChunkEmbeddingList(capacity=len(chunks))
+        try:
+            for batch, task in zip(batches, tasks):
+                chunk_embedding_list.add(batch, await task)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            # Wait for the cancelled tasks, so that none is left running
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        return chunk_embedding_list
 
     @abstractmethod
     async def get_embedding_for_query(self, query: str):
         raise NotImplementedError
 
     @abstractmethod
-    async def get_embeddings(self, chunks: list[InfoBlobChunk]) -> ChunkEmbeddingList:
+    async def _get_embeddings_for_chunks(self, chunks: list[InfoBlobChunk]) -> list[list[float]]:
         raise NotImplementedError
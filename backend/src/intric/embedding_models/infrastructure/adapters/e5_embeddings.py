@@ -3,7 +3,6 @@ from tenacity import retry, stop_after_attempt, wait_random_exponential
 from intric.embedding_models.infrastructure.adapters.base import (
     EmbeddingModelAdapter,
 )
-from intric.files.chunk_embedding_list import ChunkEmbeddingList
 from intric.info_blobs.info_blob import InfoBlobChunk
 from intric.main.aiohttp_client import aiohttp_client
 from intric.main.config import get_settings
@@ -20,24 +19,20 @@ class E5Adapter(EmbeddingModelAdapter):
         embeddings = await self._get_embeddings(query_prepended)
         return embeddings[0]
 
-    async def get_embeddings(self, chunks: list[InfoBlobChunk]):
-        chunk_embedding_list = ChunkEmbeddingList()
-        for chunked_chunks in self._chunk_chunks(chunks):
-            texts_prepended = [f"passage: {chunk.text}" for chunk in chunked_chunks]
+    async def _get_embeddings_for_chunks(self, chunks: list[InfoBlobChunk]):
+        texts_prepended = [f"passage: {chunk.text}" for chunk in chunks]
+        return await self._get_embeddings(texts_prepended)
 
-            logger.debug(f"Embedding a chunk of {len(chunked_chunks)} chunks")
-
-            embeddings_for_chunks = await self._get_embeddings(texts_prepended)
-            chunk_embedding_list.add(chunked_chunks, embeddings_for_chunks)
-
-        return chunk_embedding_list
-
-    @retry(wait=wait_random_exponential(min=1, max=20), stop=stop_after_attempt(3))
+    # Back off for long enough that rate limited (429) requests can recover
+    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
     async def _get_embeddings(self, texts: list[str]) -> list[list[float]]:
         payload = {"input": texts, "model": self.model.name}
 
         url = f"{get_settings().infinity_url}/embeddings"
         async with aiohttp_client().post(url, json=payload) as resp:
+            if resp.status == 429:
+                logger.warning("Rate limited by the embedding server, backing off")
+            resp.raise_for_status()
             data = await resp.json()
 
         return [embedding["embedding"] for embedding in data["data"]]
@@ -9,7 +9,6 @@ from tenacity import (
 )
 
 from intric.embedding_models.infrastructure.adapters.base import EmbeddingModelAdapter
-from intric.files.chunk_embedding_list import ChunkEmbeddingList
 from intric.main.config import get_settings
 from intric.main.exceptions import BadRequestException, OpenAIException
 from intric.main.logging import get_logger
@@ -31,26 +30,18 @@ class OpenAIEmbeddingAdapter(EmbeddingModelAdapter):
         self.client = client
         super().__init__(model)
 
-    async def get_embeddings(self, chunks: list["InfoBlobChunk"]) -> ChunkEmbeddingList:
-        chunk_embedding_list = ChunkEmbeddingList()
-        for chunked_chunks in self._chunk_chunks(chunks):
-            texts_for_chunks = [chunk.text for chunk in chunked_chunks]
-
-            logger.debug(f"Embedding a chunk of {len(chunked_chunks)} chunks")
-
-            embeddings_for_chunks = await self._get_embeddings(texts=texts_for_chunks)
-            chunk_embedding_list.add(chunked_chunks, embeddings_for_chunks)
-
-        return chunk_embedding_list
+    async def _get_embeddings_for_chunks(self, chunks: list["InfoBlobChunk"]):
+        return await self._get_embeddings(texts=[chunk.text for chunk in chunks])
 
     async def get_embedding_for_query(self, query: str):
         truncated_query = query[: self.model.max_input]
         embeddings = await self._get_embeddings([truncated_query])
         return embeddings[0]
 
+    # Back off for long enough that rate limited (429) requests can recover
     @retry(
-        wait=wait_random_exponential(min=1, max=20),
-        stop=stop_after_attempt(3),
+        wait=wait_random_exponential(min=1, max=60),
+        stop=stop_after_attempt(6),
         retry=retry_if_not_exception_type(BadRequestException),
         reraise=True,
     )
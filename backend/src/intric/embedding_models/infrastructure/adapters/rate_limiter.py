@@ -0,0 +1,82 @@
+import asyncio
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Optional
+
+from intric.main.config import get_settings
+
+if TYPE_CHECKING:
+    from intric.embedding_models.domain.embedding_model import EmbeddingModel
+
+WINDOW_SECONDS = 60
+
+
+class EmbeddingRateLimiter:
+    """Bounds the number of concurrent requests and the tokens sent per minute
+    to one embedding model."""
+
+    def __init__(self, max_concurrent_requests: int, tokens_per_minute: Optional[int] = None):
+        self.max_concurrent_requests = max_concurrent_requests
+        self.tokens_per_minute = tokens_per_minute
+
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._lock = asyncio.Lock()
+        self._sent: deque[tuple[float, int]] = deque()
+        self._sent_tokens = 0
+
+    def _evict_expired(self, now: float):
+        while self._sent and now - self._sent[0][0] >= WINDOW_SECONDS:
+            _, num_tokens = self._sent.popleft()
+            self._sent_tokens -= num_tokens
+
+    async def _reserve_tokens(self, num_tokens: int):
+        if self.tokens_per_minute is None:
+            return
+
+        # A single request larger than the budget would otherwise wait forever
+        num_tokens = min(num_tokens, self.tokens_per_minute)
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._evict_expired(now)
+
+                if self._sent_tokens + num_tokens <= self.tokens_per_minute:
+                    self._sent.append((now, num_tokens))
+                    self._sent_tokens += num_tokens
+                    return
+
+                await asyncio.sleep(WINDOW_SECONDS - (now - self._sent[0][0]))
+
+    @asynccontextmanager
+    async def limit(self, num_tokens: int):
+        await self._reserve_tokens(num_tokens)
+
+        async with self._semaphore:
+            yield
+
+
+# asyncio primitives are bound to the event loop they are first used in,
+# so keep one set of rate limiters per loop
+_rate_limiters: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, EmbeddingRateLimiter]
+] = weakref.WeakKeyDictionary()
+
+
+def get_rate_limiter(model: "EmbeddingModel") -> EmbeddingRateLimiter:
+    rate_limiters = _rate_limiters.setdefault(asyncio.get_running_loop(), {})
+
+    if model.name not in rate_limiters:
+        settings = get_settings()
+        rate_limiters[model.name] = EmbeddingRateLimiter(
+            max_concurrent_requests=settings.embedding_model_concurrency.get(
+                model.name, settings.embedding_max_concurrent_requests
+            ),
+            tokens_per_minute=settings.embedding_model_tokens_per_minute.get(
+                model.name, settings.embedding_tokens_per_minute
+            ),
+        )
+
+    return rate_limiters[model.name]
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from intric.ai_models.model_enums import ModelFamily
 from intric.embedding_models.infrastructure.adapters.base import EmbeddingModelAdapter
@@ -6,15 +6,31 @@ from intric.embedding_models.infrastructure.adapters.e5_embeddings import E5Adap
 from intric.embedding_models.infrastructure.adapters.openai_embeddings import (
     OpenAIEmbeddingAdapter,
 )
+from intric.embedding_models.infrastructure.query_embedding_cache import (
+    QueryEmbeddingCache,
+    query_embedding_cache,
+)
 from intric.files.chunk_embedding_list import ChunkEmbeddingList
-from intric.info_blobs.info_blob import InfoBlobChunk
+from intric.info_blobs.info_blob import InfoBlobChunk, get_chunk_text_hash
+from intric.main.logging import get_logger
 
 if TYPE_CHECKING:
     from intric.embedding_models.domain.embedding_model import EmbeddingModel
+    from intric.info_blobs.info_blob_chunk_repo import InfoBlobChunkRepo
+
+logger = get_logger(__name__)
+
+CACHE_LOOKUP_BATCH_SIZE = 1000
 
 
 class CreateEmbeddingsService:
-    def __init__(self):
+    def __init__(
+        self,
+        info_blob_chunk_repo: Optional["InfoBlobChunkRepo"] = None,
+        query_embedding_cache: Optional[QueryEmbeddingCache] = query_embedding_cache,
+    ):
+        self.chunk_repo = info_blob_chunk_repo
+        self.query_embedding_cache = query_embedding_cache
         self._adapters = {
             ModelFamily.OPEN_AI: OpenAIEmbeddingAdapter,
             ModelFamily.E5: E5Adapter,
@@ -27,18 +43,81 @@ class CreateEmbeddingsService:
 
         return adapter_class(model)
 
+    async def _get_cached_embeddings(
+        self,
+        model: "EmbeddingModel",
+        chunks: list[InfoBlobChunk],
+        text_hashes: list[str],
+    ) -> dict[str, list[float]]:
+        if self.chunk_repo is None or not chunks:
+            return {}
+
+        unique_text_hashes = list(set(text_hashes))
+
+        cached_embeddings = {}
+        for i in range(0, len(unique_text_hashes), CACHE_LOOKUP_BATCH_SIZE):
+            cached_embeddings |= await self.chunk_repo.get_embeddings_by_text_hash(
+                unique_text_hashes[i : i + CACHE_LOOKUP_BATCH_SIZE],
+                embedding_model_id=model.id,
+                tenant_id=chunks[0].tenant_id,
+            )
+
+        return cached_embeddings
+
     async def get_embeddings(
         self,
         model: "EmbeddingModel",
         chunks: list[InfoBlobChunk],
     ) -> ChunkEmbeddingList:
         adapter = self._get_adapter(model)
-        return await adapter.get_embeddings(chunks)
+
+        text_hashes = [get_chunk_text_hash(chunk.text) for chunk in chunks]
+        cached_embeddings = await self._get_cached_embeddings(
+            model=model, chunks=chunks, text_hashes=text_hashes
+        )
+        if not cached_embeddings:
+            return await adapter.get_embeddings(chunks)
+
+        chunks_to_embed = [
+            chunk
+            for chunk, text_hash in zip(chunks, text_hashes)
+            if text_hash not in cached_embeddings
+        ]
+        logger.debug(
+            f"Reusing embeddings for {len(chunks) - len(chunks_to_embed)} of {len(chunks)} chunks"
+        )
+
+        if chunks_to_embed:
+            new_embeddings = iter(await adapter.get_embeddings(chunks_to_embed))
+        else:
+            new_embeddings = iter(())
+
+        # Reassemble in the original chunk order
+        chunk_embedding_list = ChunkEmbeddingList(capacity=len(chunks))
+        for chunk, text_hash in zip(chunks, text_hashes):
+            embedding = cached_embeddings.get(text_hash)
+            if embedding is None:
+                _, embedding = next(new_embeddings)
+
+            chunk_embedding_list.add([chunk], [embedding])
+
+        return chunk_embedding_list
 
     async def get_embedding_for_query(
         self,
         model: "EmbeddingModel",
         query: str,
     ) -> list[float]:
+        if self.query_embedding_cache is not None:
+            embedding = await self.query_embedding_cache.get(model=model, query=query)
+            if embedding is not None:
+                return embedding
+
         adapter = self._get_adapter(model)
-        return await adapter.get_embedding_for_query(query)
+        embedding = await adapter.get_embedding_for_query(query)
+
+        if self.query_embedding_cache is not None:
+            await self.query_embedding_cache.set(model=model, query=query, embedding=embedding)
+            logger.debug(f"Query embedding cache: {self.query_embedding_cache.stats()}")
+
+        return embedding
@@ -1,15 +1,19 @@
+import asyncio
+import re
 import time
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Iterator, Optional
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from pydantic_settings import BaseSettings
 
-from intric.completion_models.infrastructure.context_builder import count_tokens
+from intric.completion_models.infrastructure.token_counter import (
+    count_tokens,
+    count_tokens_batch,
+)
 from intric.files.chunk_embedding_list import ChunkEmbeddingList
 from intric.info_blobs.info_blob import (
     InfoBlobChunk,
     InfoBlobChunkInDBWithScore,
-    InfoBlobChunkWithEmbedding,
     InfoBlobInDB,
 )
 from intric.info_blobs.info_blob_chunk_repo import InfoBlobChunkRepo
@@ -20,6 +24,8 @@ from intric.main.logging import get_logger
 from intric.users.user import UserInDB
 
 if TYPE_CHECKING:
+    from uuid import UUID
+
     from intric.collections.domain.collection import Collection
     from intric.embedding_models.domain.embedding_model import EmbeddingModel
     from intric.embedding_models.infrastructure.create_embeddings_service import (
@@ -37,6 +43,20 @@ class ChunkSettings(BaseSettings):
 
 settings = ChunkSettings()
 
+# Constant of reciprocal rank fusion, dampens the weight of the top ranks
+RRF_K = 60
+
+# Words, including words joined by dashes, slashes, dots or colons like X-123
+EXACT_TERM_PATTERN = r"\w+(?:[-/.:]\w+)*"
+
+# Characters of text split into chunks at a time
+SECTION_LENGTH = 100_000
+
+# Chunks embedded and added at a time
+EMBEDDING_BATCH_SIZE = 1000
+
+SECTION_SEPARATORS = ["\n\n", "\n", " "]
+
 
 def autocut(y_values: list[float], cutoff: int = 2) -> int:
     # Written by GPT-4, fact-checked by GPT-4
@@ -71,6 +91,51 @@ def autocut(y_values: list[float], cutoff: int = 2) -> int:
     return len(y_values)
 
 
+def reciprocal_rank_fusion(
+    *results: list[InfoBlobChunkInDBWithScore], k: int = RRF_K
+) -> list[InfoBlobChunkInDBWithScore]:
+    """Fuses ranked lists of chunks into one, ordered by the sum of 1 / (k + rank)
+    over the lists each chunk appears in. The score of the fused chunks is the
+    fused score."""
+    fused_scores = {}
+    chunks_by_id = {}
+
+    for result in results:
+        for rank, chunk in enumerate(result, start=1):
+            fused_scores[chunk.id] = fused_scores.get(chunk.id, 0) + 1 / (k + rank)
+            chunks_by_id.setdefault(chunk.id, chunk)
+
+    return [
+        chunks_by_id[chunk_id].model_copy(update={"score": score})
+        for chunk_id, score in sorted(fused_scores.items(), key=lambda item: item[1], reverse=True)
+    ]
+
+
+def iter_sections(text: str, max_length: int = SECTION_LENGTH) -> Iterator[str]:
+    """Split the text into sections of at most max length characters, at a
+    paragraph, line or word boundary where there is one."""
+    start = 0
+    while len(text) - start > max_length:
+        end = start + max_length
+        for separator in SECTION_SEPARATORS:
+            boundary = text.rfind(separator, start + 1, end)
+            if boundary != -1:
+                end = boundary
+                break
+
+        yield text[start:end]
+        start = end
+
+    if start < len(text):
+        yield text[start:]
+
+
+def get_exact_terms(search_string: str) -> list[str]:
+    """Get the terms with digits, such as product codes, case numbers and dates."""
+    terms = re.findall(EXACT_TERM_PATTERN, search_string)
+    return list(dict.fromkeys(term for term in terms if any(c.isdigit() for c in term)))
+
+
 class Datastore:
     def __init__(
         self,
@@ -83,61 +148,78 @@ class Datastore:
         self.chunk_repo = info_blob_chunk_repo
         self.create_embeddings_service = create_embeddings_service
 
-    def _chunk_text(self, info_blob: InfoBlobInDB):
+    def _chunk_section(self, info_blob: InfoBlobInDB, section: str, first_chunk_no: int):
         splitter = RecursiveCharacterTextSplitter(
             chunk_size=settings.chunk_size,
             chunk_overlap=settings.chunk_overlap,
             length_function=count_tokens,
         )
 
+        texts = [
+            (i, chunk.strip())
+            for i, chunk in enumerate(splitter.split_text(section), start=first_chunk_no)
+            if chunk.strip()
+        ]
+        tokens_of_texts = count_tokens_batch([text for _, text in texts])
+        source_id = info_blob.group_id or info_blob.website_id or info_blob.integration_knowledge_id
+
         info_blob_chunks = [
             InfoBlobChunk(
                 chunk_no=i,
-                text=chunk.strip(),
+                text=text,
                 info_blob_id=info_blob.id,
                 tenant_id=self.user.tenant_id,
+                source_id=source_id,
+                num_tokens=num_tokens,
             )
-            for i, chunk in enumerate(splitter.split_text(info_blob.text))
-            if chunk.strip()
+            for (i, text), num_tokens in zip(texts, tokens_of_texts)
         ]
 
-        return info_blob_chunks
+        return info_blob_chunks, first_chunk_no + len(texts)
 
-    async def _add(self, chunk_embedding_list: ChunkEmbeddingList, batch_size: int = 100):
-        chunks = []
-        for chunk, embedding in chunk_embedding_list:
-            chunks.append(
-                InfoBlobChunkWithEmbedding(
-                    **chunk.model_dump(exclude_none=True), embedding=embedding
-                )
-            )
+    def _chunk_text(
+        self, info_blob: InfoBlobInDB, batch_size: int = EMBEDDING_BATCH_SIZE
+    ) -> Iterator[list[InfoBlobChunk]]:
+        """Yield the chunks of the text in batches of at least batch size chunks,
+        except the last, splitting one section of the text at a time."""
+        batch = []
+        chunk_no = 0
+        for section in iter_sections(info_blob.text, max_length=SECTION_LENGTH):
+            info_blob_chunks, chunk_no = self._chunk_section(info_blob, section, chunk_no)
+            batch.extend(info_blob_chunks)
 
-            if len(chunks) >= batch_size:
-                logger.debug(f"Adding {len(chunks)} chunks to datastore.")
-                await self.chunk_repo.add(chunks)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
 
-                chunks.clear()
+        if batch:
+            yield batch
 
-        # Last batch
-        if chunks:
-            logger.debug(f"Last batch. Adding {len(chunks)} chunks to datastore.")
-            await self.chunk_repo.add(chunks)
+    async def _add(self, chunk_embedding_list: ChunkEmbeddingList, batch_size: int = 1000):
+        chunks = chunk_embedding_list.chunks
+        embeddings = chunk_embedding_list.embeddings
 
-    async def add(self, info_blob: InfoBlobInDB, embedding_model: "EmbeddingModel"):
-        logger.debug("Chunking text.")
-        info_blob_chunks = self._chunk_text(info_blob)
+        for start in range(0, len(chunks), batch_size):
+            end = start + batch_size
+            logger.debug(f"Adding {len(chunks[start:end])} chunks to datastore.")
+            await self.chunk_repo.add(chunks[start:end], embeddings[start:end])
 
-        if not info_blob_chunks:
-            logger.warning(f"Info Blob {info_blob.id} did not yield any chunks after splitting.")
-            return
+    async def add(self, info_blob: InfoBlobInDB, embedding_model: "EmbeddingModel"):
+        # Embed and add a batch of chunks before the rest of the text is split,
+        # so that only one batch of embeddings is held in memory at a time
+        num_chunks = 0
+        for info_blob_chunks in self._chunk_text(info_blob):
+            logger.debug(f"Embedding {len(info_blob_chunks)} info-blob chunks.")
+            chunk_embedding_list = await self.create_embeddings_service.get_embeddings(
+                model=embedding_model, chunks=info_blob_chunks
+            )
 
-        logger.debug(f"Embedding {len(info_blob_chunks)} info-blob chunks.")
-        chunk_embedding_list = await self.create_embeddings_service.get_embeddings(
-            model=embedding_model, chunks=info_blob_chunks
-        )
+            logger.debug(f"Adding {len(info_blob_chunks)} info-blob chunks to datastore.")
+            await self._add(chunk_embedding_list)
+            num_chunks += len(info_blob_chunks)
 
-        logger.debug(f"Adding {len(info_blob_chunks)} info-blob chunks to datastore.")
-        await self._add(chunk_embedding_list)
+        if not num_chunks:
+            logger.warning(f"Info Blob {info_blob.id} did not yield any chunks after splitting.")
 
     async def semantic_search(
         self,
@@ -179,3 +261,90 @@ class Datastore:
             return semantic_results[:cut_point]
 
         return semantic_results
+
+    async def _keyword_search(
+        self,
+        search_string: str,
+        group_ids: list["UUID"],
+        website_ids: list["UUID"],
+        integration_knowledge_ids: list["UUID"],
+        num_chunks: int,
+    ) -> list[InfoBlobChunkInDBWithScore]:
+        search_params = dict(
+            group_ids=group_ids,
+            website_ids=website_ids,
+            integration_knowledge_ids=integration_knowledge_ids,
+            limit=num_chunks,
+        )
+
+        results = await self.chunk_repo.keyword_search(search_string, **search_params)
+        if results:
+            return results
+
+        # Chunks rarely contain every word of a question, but should still be found
+        # on the codes and numbers in it
+        exact_terms = get_exact_terms(search_string)
+        if not exact_terms:
+            return []
+
+        return await self.chunk_repo.keyword_search(" or ".join(exact_terms), **search_params)
+
+    async def hybrid_search(
+        self,
+        search_string: str,
+        embedding_model: "EmbeddingModel",
+        collections: list["Collection"] = [],
+        websites: list["Website"] = [],
+        integration_knowledge_list: list[IntegrationKnowledge] = [],
+        num_chunks: Optional[int] = 30,
+        autocut_cutoff: Optional[int] = None,
+        keyword_search_string: Optional[str] = None,
+    ) -> list[InfoBlobChunkInDBWithScore]:
+        """Combines full text search and semantic search with reciprocal rank fusion.
+
+        The full text search runs on `keyword_search_string` if given, for example
+        only the last question of a conversation, and on `search_string` otherwise.
+        """
+        group_ids = [group.id for group in collections]
+        website_ids = [website.id for website in websites]
+        integration_knowledge_ids = [i.id for i in integration_knowledge_list]
+        num_chunks = num_chunks or 30
+
+        start = time.time()
+        # The keyword search does not need the embedding, run it while embedding.
+        # The searches themselves share the database session, so they run in turn.
+        search_string_embedding, keyword_results = await asyncio.gather(
+            self.create_embeddings_service.get_embedding_for_query(
+                model=embedding_model, query=search_string
+            ),
+            self._keyword_search(
+                keyword_search_string or search_string,
+                group_ids=group_ids,
+                website_ids=website_ids,
+                integration_knowledge_ids=integration_knowledge_ids,
+                num_chunks=num_chunks,
+            ),
+        )
+        step_1 = time.time()
+        semantic_results = await self.chunk_repo.semantic_search(
+            search_string_embedding,
+            group_ids=group_ids,
+            website_ids=website_ids,
+            integration_knowledge_ids=integration_knowledge_ids,
+            limit=num_chunks,
+        )
+        end = time.time()
+
+        logger.debug(
+            f"Time to get hybrid results: Embed and keyword step: {step_1 - start},"
+            f" Search step: {end - step_1}, Total: {end - start},"
+            f" Keyword results: {len(keyword_results)}"
+        )
+
+        results = reciprocal_rank_fusion(semantic_results, keyword_results)[:num_chunks]
+
+        if autocut_cutoff is not None:
+            cut_point = autocut([res.score for res in results], autocut_cutoff)
+            return results[:cut_point]
+
+        return results
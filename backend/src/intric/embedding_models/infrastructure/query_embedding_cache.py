@@ -0,0 +1,138 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from intric.main.config import get_settings
+from intric.main.logging import get_logger
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+    from intric.embedding_models.domain.embedding_model import EmbeddingModel
+
+logger = get_logger(__name__)
+
+REDIS_KEY_PREFIX = "query_embedding"
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU cache of query embeddings with a time to live.
+
+    Entries are kept in process, and optionally in Redis so that they are
+    shared between API replicas. Redis failures are logged and treated as
+    misses, the cache never fails a search.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int, redis_client: Optional["Redis"] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.redis_client = redis_client
+
+        self._entries: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(model: "EmbeddingModel", query: str) -> str:
+        query_hash = hashlib.sha256(query.encode()).hexdigest()
+        return f"{REDIS_KEY_PREFIX}:{model.id}:{query_hash}"
+
+    def _get_local(self, key: str) -> Optional[list[float]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, embedding = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return embedding
+
+    def _set_local(self, key: str, embedding: list[float]):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, embedding)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def _get_redis(self, key: str) -> Optional[list[float]]:
+        try:
+            value = await self.redis_client.get(key)
+        except Exception:
+            logger.exception("Could not read query embedding from redis")
+            return None
+
+        if value is None:
+            return None
+
+        return np.frombuffer(value, dtype=np.float32).tolist()
+
+    async def _set_redis(self, key: str, embedding: list[float]):
+        try:
+            value = np.asarray(embedding, dtype=np.float32).tobytes()
+            await self.redis_client.set(key, value, ex=self.ttl_seconds)
+        except Exception:
+            logger.exception("Could not write query embedding to redis")
+
+    async def get(self, model: "EmbeddingModel", query: str) -> Optional[list[float]]:
+        key = self._key(model, query)
+
+        embedding = self._get_local(key)
+        if embedding is not None:
+            self.hits += 1
+            return embedding
+
+        if self.redis_client is not None:
+            embedding = await self._get_redis(key)
+            if embedding is not None:
+                self.redis_hits += 1
+                self._set_local(key, embedding)
+                return embedding
+
+        self.misses += 1
+        return None
+
+    async def set(self, model: "EmbeddingModel", query: str, embedding: list[float]):
+        key = self._key(model, query)
+
+        self._set_local(key, embedding)
+
+        if self.redis_client is not None:
+            await self._set_redis(key, embedding)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        self._entries.clear()
+
+
+def _create_query_embedding_cache():
+    settings = get_settings()
+
+    redis_client = None
+    if settings.using_redis_query_embedding_cache:
+        from intric.worker.redis import r
+
+        redis_client = r
+
+    return QueryEmbeddingCache(
+        max_size=settings.query_embedding_cache_size,
+        ttl_seconds=settings.query_embedding_cache_ttl,
+        redis_client=redis_client,
+    )
+
+
+query_embedding_cache = _create_query_embedding_cache()
@@ -4,8 +4,9 @@ import asyncio
 import tempfile
 import wave
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator
+from typing import IO, Iterator, Optional
 
 import audioread
 import numpy as np
@@ -19,6 +20,9 @@ logger = get_logger(__name__)
 
 FRAMES = 32768  # Number of frames in one mebibyte
 
+# Length of the frames compared when looking for silence
+SILENCE_FRAME_SECONDS = 0.1
+
 
 # TODO: When we support video, remove the video mimetypes
 class AudioMimeTypes(MimeTypesBase):
@@ -59,66 +63,144 @@ async def to_wav(filepath: str):
         tmp_file.close()
 
 
-class AudioFile:
-    def __init__(self, path_to_file: str):
-        self.path = Path(path_to_file)
-        self.info = sf.info(path_to_file)
+@dataclass
+class AudioSegment:
+    path: Path
+    start_seconds: float
+    end_seconds: float
 
-    def _gen_file(self):
-        for block in sf.blocks(self.path, blocksize=FRAMES):
-            yield block
 
-    def _write_to_file(self, gen: Iterator[np.ndarray], max_size: int):
-        frames_in_file = 0
-        temp_file = tempfile.NamedTemporaryFile(suffix=".mp3")
-        soundfile = SoundFile(
-            temp_file,
+class _SegmentWriter:
+    def __init__(self, samplerate: int, start_frame: int):
+        self.start_frame = start_frame
+        self.frames = 0
+        self.temp_file = tempfile.NamedTemporaryFile(suffix=".mp3")
+        self.soundfile = SoundFile(
+            self.temp_file,
             mode="w",
-            samplerate=self.info.samplerate,
+            samplerate=samplerate,
             channels=1,
             format="mp3",
         )
-        for block in gen:
-            if self.info.channels == 2:
-                # Make mono by averageing the two channels
-                data = np.sum(block, axis=1) / 2
-            else:
-                data = block
 
-            frames_in_file += len(data)
-            soundfile.write(data)
-            soundfile.flush()
+    def write(self, data: np.ndarray):
+        self.soundfile.write(data)
+        self.frames += len(data)
 
-            if frames_in_file > max_size:
-                return temp_file, False
+    def close(self):
+        # Closing the sound file finishes the mp3, the temporary file stays open
+        self.soundfile.close()
 
-        return temp_file, True
 
-    def _split_file(self, seconds: int):
-        max_size = self.info.samplerate * seconds
-        temp_files = []
-        gen = self._gen_file()
-        done = False
-        while not done:
-            file, done = self._write_to_file(gen, max_size)
-            temp_files.append(file)
+class AudioFile:
+    def __init__(self, path_to_file: str):
+        self.path = Path(path_to_file)
+        self.info = sf.info(path_to_file)
 
-        return temp_files
+    def _gen_file(self, blocksize: int = FRAMES) -> Iterator[np.ndarray]:
+        for block in sf.blocks(self.path, blocksize=blocksize, always_2d=True):
+            # Make mono by averaging the channels
+            yield block.mean(axis=1)
+
+    def _quietest_frame(self, data: np.ndarray, start: int, end: int) -> int:
+        """Get the middle of the quietest tenth of a second between start and end."""
+        frame_length = max(1, int(self.info.samplerate * SILENCE_FRAME_SECONDS))
+        num_frames = (end - start) // frame_length
+        if num_frames < 2:
+            return end
+
+        frames = data[start : start + num_frames * frame_length].reshape(num_frames, frame_length)
+        quietest = int(np.argmin(np.mean(frames**2, axis=1)))
+
+        return start + quietest * frame_length + frame_length // 2
+
+    def _split_file(
+        self, seconds: int, silence_window_seconds: int = 0
+    ) -> Iterator[tuple[IO[bytes], AudioSegment]]:
+        """Split the file into mono mp3 segments of at most `seconds` each, in one
+        pass, yielding every segment as soon as it is written. With a silence
+        window, a segment ends at the quietest point of the last seconds before
+        the limit, so that words are not cut in half."""
+        samplerate = self.info.samplerate
+        max_frames = samplerate * seconds
+        window = min(samplerate * silence_window_seconds, max_frames // 2)
+
+        def finish(segment: _SegmentWriter):
+            segment.close()
+            return segment.temp_file, AudioSegment(
+                path=Path(segment.temp_file.name),
+                start_seconds=segment.start_frame / samplerate,
+                end_seconds=(segment.start_frame + segment.frames) / samplerate,
+            )
+
+        segment = _SegmentWriter(samplerate, start_frame=0)
+        # Frames held back until it is known which segment they belong to
+        pending = np.empty(0)
+
+        try:
+            # Blocks at least as long as the window keep the copying of pending frames low
+            for data in self._gen_file(blocksize=max(FRAMES, window)):
+                pending = np.concatenate([pending, data])
+
+                while segment.frames + len(pending) > max_frames:
+                    cut = max_frames - segment.frames
+                    if window:
+                        cut = self._quietest_frame(pending, max(0, cut - window), cut)
+
+                    segment.write(pending[:cut])
+                    pending = pending[cut:]
+
+                    finished = segment
+                    segment = None
+                    yield finish(finished)
+                    segment = _SegmentWriter(
+                        samplerate, start_frame=finished.start_frame + finished.frames
+                    )
+
+                num_to_write = len(pending) - window
+                if num_to_write > 0:
+                    segment.write(pending[:num_to_write])
+                    pending = pending[num_to_write:]
+
+            segment.write(pending)
+        except BaseException:
+            # Segments that were yielded are closed by the caller
+            if segment is not None:
+                segment.close()
+                segment.temp_file.close()
+            raise
+
+        yield finish(segment)
 
     @asynccontextmanager
-    async def asplit_file(self, seconds: int):
+    async def asplit_file(self, seconds: int, silence_window_seconds: Optional[int] = None):
+        """Split the file in a thread, giving an async iterator of the segments,
+        so that the first segments can be used while the rest are written."""
         logger.debug("Splitting the file")
 
-        temp_files = await asyncio.to_thread(self._split_file, seconds)
-        filepaths = [Path(f.name) for f in temp_files]
+        split_file = self._split_file(seconds, silence_window_seconds or 0)
+        temp_files = []
+
+        async def iter_segments():
+            while (item := await asyncio.to_thread(next, split_file, None)) is not None:
+                temp_file, segment = item
+                temp_files.append(temp_file)
+                yield segment
 
-        logger.debug("File was split in %s parts", len(filepaths))
+            logger.debug("File was split in %s parts", len(temp_files))
 
         try:
-            yield filepaths
+            yield iter_segments()
         finally:
-            for f in temp_files:
-                f.close()
+            try:
+                split_file.close()
+            except ValueError:
+                # Still running in its thread, the unfinished segment is removed when
+                # the generator is garbage collected
+                pass
+
+            for temp_file in temp_files:
+                temp_file.close()
 
     def delete(self):
         self.path.unlink()
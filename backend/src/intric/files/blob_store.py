@@ -0,0 +1,440 @@
+import abc
+import asyncio
+import hashlib
+import hmac
+import os
+import re
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+from urllib.parse import parse_qsl, quote, urlsplit
+
+import aiohttp
+from yarl import URL
+
+from intric.main.config import get_settings
+from intric.main.exceptions import NotFoundException
+from intric.main.logging import get_logger
+
+if TYPE_CHECKING:
+    from intric.files.file_models import File
+
+logger = get_logger(__name__)
+
+# Bytes read or sent at a time when streaming a blob
+CHUNK_SIZE = 1024 * 1024
+
+SHA256_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+S3_NAMESPACE = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+
+def _validate_checksum(checksum: str):
+    # The checksum is used as a path and as a key, it must be a sha256 hex digest
+    if not SHA256_PATTERN.fullmatch(checksum):
+        raise ValueError(f"Not a sha256 checksum: {checksum!r}")
+
+
+class BlobStore(abc.ABC):
+    """Content addressed store of file blobs, keyed on their sha256 checksum.
+
+    Files with the same content share one blob, whoever uploaded them. Blobs
+    are never deleted when a file is, since other files can have the same
+    content, but by `delete_unreferenced_blobs` of the data retention job.
+    """
+
+    @abc.abstractmethod
+    async def put(self, checksum: str, data: bytes):
+        """Store the data under its checksum. Storing data that is already
+        stored marks it as recently used."""
+
+    @abc.abstractmethod
+    async def size(self, checksum: str) -> Optional[int]:
+        """Get the size of the blob, or None if there is no such blob."""
+
+    @abc.abstractmethod
+    async def stored_at(self, checksum: str) -> Optional[datetime]:
+        """Get when the blob was last stored, or None if there is no such blob."""
+
+    @abc.abstractmethod
+    def stream(
+        self, checksum: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream the bytes from start to end, inclusive, raising
+        NotFoundException if there is no such blob."""
+
+    @abc.abstractmethod
+    def list_checksums(self, stored_before: datetime) -> AsyncIterator[str]:
+        """List the checksums of the blobs last stored before the time."""
+
+    @abc.abstractmethod
+    async def delete(self, checksum: str):
+        pass
+
+    async def get(self, checksum: str) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(checksum)])
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs in a directory, two levels of subdirectories deep so that no
+    directory holds too many files. Can be shared by replicas over a network
+    file system."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def _blob_path(self, checksum: str) -> Path:
+        _validate_checksum(checksum)
+        return self.path / checksum[:2] / checksum[2:4] / checksum
+
+    def _put(self, checksum: str, data: bytes):
+        blob_path = self._blob_path(checksum)
+
+        if blob_path.exists():
+            os.utime(blob_path)
+            return
+
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Written next to the blob and renamed, so that a blob is never seen half written
+        temp_path = blob_path.with_name(f"{checksum}.{uuid.uuid4().hex}.tmp")
+        try:
+            temp_path.write_bytes(data)
+            os.replace(temp_path, blob_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    async def put(self, checksum: str, data: bytes):
+        await asyncio.to_thread(self._put, checksum, data)
+
+    async def size(self, checksum: str) -> Optional[int]:
+        try:
+            return (await asyncio.to_thread(self._blob_path(checksum).stat)).st_size
+        except FileNotFoundError:
+            return None
+
+    async def stored_at(self, checksum: str) -> Optional[datetime]:
+        try:
+            modified = (await asyncio.to_thread(self._blob_path(checksum).stat)).st_mtime
+        except FileNotFoundError:
+            return None
+
+        return datetime.fromtimestamp(modified, tz=timezone.utc)
+
+    async def stream(
+        self, checksum: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        try:
+            file = await asyncio.to_thread(open, self._blob_path(checksum), "rb")
+        except FileNotFoundError:
+            raise NotFoundException("File content not found")
+
+        try:
+            await asyncio.to_thread(file.seek, start)
+            remaining = None if end is None else end - start + 1
+
+            while remaining is None or remaining > 0:
+                size = CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining)
+                chunk = await asyncio.to_thread(file.read, size)
+                if not chunk:
+                    break
+
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            file.close()
+
+    def _list_checksums(self, stored_before: datetime) -> list[str]:
+        timestamp = stored_before.timestamp()
+        checksums = []
+
+        for directory, _, names in os.walk(self.path):
+            for name in names:
+                if not SHA256_PATTERN.fullmatch(name):
+                    continue
+
+                try:
+                    modified = os.stat(os.path.join(directory, name)).st_mtime
+                except FileNotFoundError:
+                    continue
+
+                if modified < timestamp:
+                    checksums.append(name)
+
+        return checksums
+
+    async def list_checksums(self, stored_before: datetime) -> AsyncIterator[str]:
+        for checksum in await asyncio.to_thread(self._list_checksums, stored_before):
+            yield checksum
+
+    async def delete(self, checksum: str):
+        await asyncio.to_thread(self._blob_path(checksum).unlink, missing_ok=True)
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def sign_v4(
+    method: str,
+    url: str,
+    headers: dict[str, str],
+    *,
+    payload_hash: str,
+    access_key_id: str,
+    secret_access_key: str,
+    region: str,
+    service: str = "s3",
+    now: Optional[datetime] = None,
+) -> dict[str, str]:
+    """Sign a request with AWS Signature Version 4, returning the headers to
+    send, the Authorization header included. The path of the url must be URI
+    encoded already."""
+    now = now or datetime.now(timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date = now.strftime("%Y%m%d")
+
+    parts = urlsplit(url)
+    headers = headers | {
+        "host": parts.netloc,
+        "x-amz-content-sha256": payload_hash,
+        "x-amz-date": amz_date,
+    }
+
+    query = sorted(
+        (quote(name, safe="-_.~"), quote(value, safe="-_.~"))
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+    )
+    canonical_headers = sorted(
+        (name.lower(), " ".join(value.split())) for name, value in headers.items()
+    )
+    signed_headers = ";".join(name for name, _ in canonical_headers)
+
+    canonical_request = "\n".join(
+        [
+            method,
+            parts.path or "/",
+            "&".join(f"{name}={value}" for name, value in query),
+            "".join(f"{name}:{value}\n" for name, value in canonical_headers),
+            signed_headers,
+            payload_hash,
+        ]
+    )
+
+    scope = f"{date}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ]
+    )
+
+    signing_key = _hmac(
+        _hmac(_hmac(_hmac(f"AWS4{secret_access_key}".encode(), date), region), service),
+        "aws4_request",
+    )
+    signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    headers["Authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key_id}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+
+    return headers
+
+
+class S3BlobStore(BlobStore):
+    """Blobs in a bucket of S3 or an S3 compatible store such as MinIO, with
+    path style urls. The payload hash of an upload is the checksum, so the
+    store itself verifies that a blob has the content of its key."""
+
+    def __init__(
+        self,
+        *,
+        endpoint_url: str,
+        bucket: str,
+        region: str,
+        access_key_id: str,
+        secret_access_key: str,
+        prefix: str = "blobs/",
+    ):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.region = region
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.prefix = prefix
+
+    def _key(self, checksum: str) -> str:
+        _validate_checksum(checksum)
+        return f"{self.prefix}{checksum}"
+
+    def _url(self, key: str = "", query: str = "") -> str:
+        url = f"{self.endpoint_url}/{quote(self.bucket)}"
+        if key:
+            url += f"/{quote(key)}"
+        if query:
+            url += f"?{query}"
+
+        return url
+
+    def _request(
+        self,
+        session: aiohttp.ClientSession,
+        method: str,
+        url: str,
+        headers: Optional[dict[str, str]] = None,
+        data: Optional[bytes] = None,
+        payload_hash: str = EMPTY_SHA256,
+    ):
+        headers = sign_v4(
+            method,
+            url,
+            headers or {},
+            payload_hash=payload_hash,
+            access_key_id=self.access_key_id,
+            secret_access_key=self.secret_access_key,
+            region=self.region,
+        )
+
+        # Sent exactly as signed, without being quoted again
+        return session.request(method, URL(url, encoded=True), headers=headers, data=data)
+
+    async def put(self, checksum: str, data: bytes):
+        # Uploading a blob again refreshes its last modified time, which keeps it
+        # from being deleted as unreferenced while a new file refers to it
+        url = self._url(self._key(checksum))
+
+        async with aiohttp.ClientSession() as session:
+            async with self._request(
+                session, "PUT", url, data=data, payload_hash=checksum
+            ) as response:
+                response.raise_for_status()
+
+    async def size(self, checksum: str) -> Optional[int]:
+        url = self._url(self._key(checksum))
+
+        async with aiohttp.ClientSession() as session:
+            async with self._request(session, "HEAD", url) as response:
+                if response.status == 404:
+                    return None
+
+                response.raise_for_status()
+                return response.content_length
+
+    async def stored_at(self, checksum: str) -> Optional[datetime]:
+        url = self._url(self._key(checksum))
+
+        async with aiohttp.ClientSession() as session:
+            async with self._request(session, "HEAD", url) as response:
+                if response.status == 404:
+                    return None
+
+                response.raise_for_status()
+                return parsedate_to_datetime(response.headers["Last-Modified"])
+
+    async def stream(
+        self, checksum: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        url = self._url(self._key(checksum))
+        if end is not None and end < start:
+            # Nothing to read, an empty blob
+            return
+
+        headers = {}
+        if start or end is not None:
+            headers["range"] = f"bytes={start}-{'' if end is None else end}"
+
+        async with aiohttp.ClientSession() as session:
+            async with self._request(session, "GET", url, headers) as response:
+                if response.status == 404:
+                    raise NotFoundException("File content not found")
+
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    yield chunk
+
+    async def list_checksums(self, stored_before: datetime) -> AsyncIterator[str]:
+        continuation_token = None
+
+        async with aiohttp.ClientSession() as session:
+            while True:
+                query = f"list-type=2&prefix={quote(self.prefix, safe='')}"
+                if continuation_token is not None:
+                    query += f"&continuation-token={quote(continuation_token, safe='')}"
+
+                url = self._url(query=query)
+                async with self._request(session, "GET", url) as response:
+                    response.raise_for_status()
+                    root = ET.fromstring(await response.read())
+
+                for contents in root.iter(f"{S3_NAMESPACE}Contents"):
+                    checksum = contents.findtext(f"{S3_NAMESPACE}Key")[len(self.prefix) :]
+                    last_modified = datetime.fromisoformat(
+                        contents.findtext(f"{S3_NAMESPACE}LastModified").replace("Z", "+00:00")
+                    )
+
+                    if SHA256_PATTERN.fullmatch(checksum) and last_modified < stored_before:
+                        yield checksum
+
+                if root.findtext(f"{S3_NAMESPACE}IsTruncated") != "true":
+                    return
+
+                continuation_token = root.findtext(f"{S3_NAMESPACE}NextContinuationToken")
+
+    async def delete(self, checksum: str):
+        url = self._url(self._key(checksum))
+
+        async with aiohttp.ClientSession() as session:
+            async with self._request(session, "DELETE", url) as response:
+                if response.status != 404:
+                    response.raise_for_status()
+
+
+async def load_blobs(files: list["File"], store: Optional[BlobStore] = None):
+    """Load the blobs of the files that are kept in the blob store, for the
+    code that needs the content of images and audio in memory."""
+    store = store or blob_store
+    files = [file for file in files if file.blob_in_store and file.blob is None]
+    if not files:
+        return
+
+    if store is None:
+        raise NotFoundException("File content not found, the blob store is not configured")
+
+    start = time.perf_counter()
+    blobs = await asyncio.gather(*[store.get(file.checksum) for file in files])
+    for file, blob in zip(files, blobs):
+        file.blob = blob
+
+    logger.debug(f"Loaded {len(files)} blobs in {time.perf_counter() - start:.3f} s")
+
+
+def _create_blob_store() -> Optional[BlobStore]:
+    settings = get_settings()
+
+    match settings.blob_store:
+        case "local":
+            return LocalBlobStore(settings.blob_store_path)
+        case "s3":
+            return S3BlobStore(
+                endpoint_url=settings.blob_store_s3_endpoint_url,
+                bucket=settings.blob_store_s3_bucket,
+                region=settings.blob_store_s3_region,
+                access_key_id=settings.blob_store_s3_access_key_id,
+                secret_access_key=settings.blob_store_s3_secret_access_key,
+            )
+        case _:
+            return None
+
+
+blob_store = _create_blob_store()
@@ -1,34 +1,88 @@
 import tempfile
 from collections.abc import Iterator
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy as np
 
 from intric.info_blobs.info_blob import InfoBlobChunk
 from intric.main.exceptions import ChunkEmbeddingMisMatchException
 
+# Buffers larger than this are memory-mapped to a temporary file
+MEMMAP_THRESHOLD_BYTES = 256 * 1024 * 1024
+
+# Rows allocated when the number of chunks is not known up front
+DEFAULT_CAPACITY = 64
+
 
 class ChunkEmbeddingList:
-    def __init__(self):
-        self._file = tempfile.TemporaryFile()
-        self._chunks = []
+    """Chunks with their embeddings, stored as rows of one float32 matrix.
+
+    The matrix is allocated with the first embeddings, sized for `capacity`
+    chunks when it is known, and grown by doubling otherwise. Iterating yields
+    views of the rows, nothing is copied.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        self._capacity = capacity
+        self._buffer: Optional[np.ndarray] = None
+        self._chunks: list[InfoBlobChunk] = []
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    @property
+    def chunks(self) -> list[InfoBlobChunk]:
+        return self._chunks
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """The embeddings added so far, as a view of the matrix."""
+        if self._buffer is None:
+            return np.empty((0, 0), dtype=np.float32)
+
+        return self._buffer[: len(self._chunks)]
+
+    @staticmethod
+    def _allocate(rows: int, dimensions: int) -> np.ndarray:
+        if rows * dimensions * 4 > MEMMAP_THRESHOLD_BYTES:
+            # The temporary file is deleted when the memory map is
+            return np.memmap(
+                tempfile.TemporaryFile(), dtype=np.float32, mode="w+", shape=(rows, dimensions)
+            )
 
-    def add(self, chunks: list[InfoBlobChunk], embeddings: list[list[float]]):
+        return np.empty((rows, dimensions), dtype=np.float32)
+
+    def _reserve(self, rows: int, dimensions: int):
+        if self._buffer is None:
+            capacity = max(rows, self._capacity or DEFAULT_CAPACITY)
+            self._buffer = self._allocate(capacity, dimensions)
+            return
+
+        if self._buffer.shape[1] != dimensions:
+            raise ChunkEmbeddingMisMatchException(
+                f"Embedding dimension: {dimensions}, expected: {self._buffer.shape[1]}"
+            )
+
+        if rows > len(self._buffer):
+            buffer = self._allocate(max(rows, 2 * len(self._buffer)), dimensions)
+            buffer[: len(self._chunks)] = self.embeddings
+            self._buffer = buffer
+
+    def add(self, chunks: list[InfoBlobChunk], embeddings: list[list[float]] | np.ndarray):
         if len(chunks) != len(embeddings):
             raise ChunkEmbeddingMisMatchException(
                 f"Number of chunks: {len(chunks)}, Number of embeddings: {len(embeddings)}"
             )
 
-        self._chunks.extend(chunks)
-
-        for embedding in embeddings:
-            np.save(self._file, embedding)
+        if not chunks:
+            return
 
-    def __iter__(self) -> Iterator[Tuple[InfoBlobChunk, list[float]]]:
-        self._file.seek(0)
-        for chunk in self._chunks:
-            embedding = np.load(self._file)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        start = len(self._chunks)
+        self._reserve(start + len(chunks), embeddings.shape[1])
 
-            yield chunk, embedding
+        self._buffer[start : start + len(chunks)] = embeddings
+        self._chunks.extend(chunks)
 
-        self._file.close()
+    def __iter__(self) -> Iterator[Tuple[InfoBlobChunk, np.ndarray]]:
+        return zip(self._chunks, self.embeddings)
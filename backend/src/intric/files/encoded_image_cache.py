@@ -0,0 +1,78 @@
+import base64
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+
+from intric.main.config import get_settings
+
+if TYPE_CHECKING:
+    from intric.files.file_models import File
+
+
+class EncodedImageCache:
+    """Least recently used cache of base64 encoded images, keyed by checksum.
+
+    Images are sent to the models with every later question of the conversation
+    they are part of, so the same image is encoded over and over. Files with the
+    same checksum have the same content, and share the encoding.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._nbytes = 0
+
+    def __contains__(self, checksum: str) -> bool:
+        return checksum in self._entries
+
+    def get(self, checksum: str) -> Optional[str]:
+        encoded = self._entries.get(checksum)
+        if encoded is not None:
+            self._entries.move_to_end(checksum)
+
+        return encoded
+
+    def put(self, checksum: str, encoded: str):
+        if len(encoded) > self.max_bytes:
+            return
+
+        if checksum in self._entries:
+            self._entries.move_to_end(checksum)
+            return
+
+        self._entries[checksum] = encoded
+        self._nbytes += len(encoded)
+
+        while self._nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._nbytes -= len(evicted)
+
+    def encode(self, file: "File") -> str:
+        if file.encoded_blob is not None:
+            return file.encoded_blob
+
+        encoded = self.get(file.checksum)
+        if encoded is not None:
+            return encoded
+
+        if file.blob is None:
+            raise ValueError(f"The content of {file.name} is not loaded")
+
+        encoded = base64.b64encode(file.blob).decode("utf-8")
+        self.put(file.checksum, encoded)
+
+        return encoded
+
+    def stats(self) -> dict[str, int]:
+        return {"images": len(self._entries), "bytes": self._nbytes}
+
+    def clear(self):
+        self._entries.clear()
+        self._nbytes = 0
+
+
+def _create_encoded_image_cache() -> EncodedImageCache:
+    return EncodedImageCache(max_bytes=get_settings().encoded_image_cache_max_bytes)
+
+
+encoded_image_cache = _create_encoded_image_cache()
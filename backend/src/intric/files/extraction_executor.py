@@ -0,0 +1,136 @@
+import asyncio
+import multiprocessing
+import weakref
+from typing import Any, Callable, Optional
+
+from intric.main.config import get_settings
+from intric.main.exceptions import ExtractionFailedException
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Imported once by the fork server, so that the jobs forked from it start fast
+PRELOADED_MODULES = [
+    "intric.files.extraction_executor",
+    "intric.files.text",
+    "intric.integration.infrastructure.content_service.utils",
+]
+
+
+def _set_memory_limit(memory_limit: Optional[int]):
+    if memory_limit is None:
+        return
+
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return
+
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _run_job(connection, memory_limit: Optional[int], func: Callable, args: tuple, kwargs: dict):
+    try:
+        _set_memory_limit(memory_limit)
+        result = (True, func(*args, **kwargs))
+    except MemoryError:
+        result = (False, ExtractionFailedException("Extraction ran out of memory"))
+    except BaseException as e:
+        result = (False, e)
+
+    try:
+        connection.send(result)
+    except Exception as e:
+        # The exception could not be pickled
+        connection.send((False, ExtractionFailedException(repr(e))))
+    finally:
+        connection.close()
+
+
+class ExtractionExecutor:
+    """Runs extraction of documents in separate processes.
+
+    Parsing a large document is CPU bound and would block the event loop, and
+    malformed documents can make parsers run away in time or memory. Every job
+    runs in a process of its own, forked from a fork server that has the
+    parsers imported already. A job is killed when it runs longer than the
+    timeout, and fails with a MemoryError when it allocates more than the
+    memory limit. The function and its arguments must be picklable.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        timeout_seconds: float,
+        memory_limit: Optional[int] = None,
+    ):
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit = memory_limit
+
+        # asyncio primitives are bound to the event loop they are first used in,
+        # so keep one semaphore per loop
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+        self._context = multiprocessing.get_context("forkserver")
+        self._context.set_forkserver_preload(PRELOADED_MODULES)
+
+    def _run_in_process(self, func: Callable, args: tuple, kwargs: dict):
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_run_job, args=(sender, self.memory_limit, func, args, kwargs), daemon=True
+        )
+
+        process.start()
+        sender.close()
+
+        try:
+            if not receiver.poll(self.timeout_seconds):
+                raise ExtractionFailedException(
+                    f"Extraction did not finish within {self.timeout_seconds} seconds"
+                )
+
+            try:
+                succeeded, result = receiver.recv()
+            except EOFError:
+                process.join()
+                # Killed by the operating system, typically for running out of memory
+                raise ExtractionFailedException(
+                    f"Extraction process exited with code {process.exitcode}"
+                )
+        finally:
+            if process.is_alive():
+                process.kill()
+            process.join()
+            receiver.close()
+
+        if not succeeded:
+            raise result
+
+        return result
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_workers)
+
+        return self._semaphores[loop]
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        async with self._get_semaphore():
+            return await asyncio.to_thread(self._run_in_process, func, args, kwargs)
+
+
+def _create_extraction_executor():
+    settings = get_settings()
+
+    return ExtractionExecutor(
+        max_workers=settings.extraction_max_workers,
+        timeout_seconds=settings.extraction_timeout,
+        memory_limit=settings.extraction_memory_limit,
+    )
+
+
+extraction_executor = _create_extraction_executor()
@@ -1,8 +1,9 @@
 from enum import Enum
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, model_validator
+import sqlalchemy as sa
+from pydantic import BaseModel, Field, model_validator
 
 from intric.main.models import InDB
 
@@ -30,11 +31,16 @@ class FileBase(BaseModel):
 class FileBaseWithContent(FileBase):
     text: Optional[str] = None
     blob: Optional[bytes] = None
+    # The blob is in the blob store, under the checksum, instead of in the database
+    blob_in_store: bool = False
     transcription: Optional[str] = None
 
+    def _has_content(self) -> bool:
+        return self.text is not None or self.blob is not None or self.blob_in_store
+
     @model_validator(mode="after")
     def require_one_of_text_or_image(self) -> "FileBaseWithContent":
-        if self.text is None and self.blob is None:
+        if not self._has_content():
             raise ValueError("One of 'text' or 'blob' is required")
 
         return self
@@ -50,8 +56,33 @@ class FileCreate(FileBaseWithContent):
     tenant_id: UUID
 
 
+# The columns with the content of a file, as opposed to its metadata
+PAYLOAD_FIELDS = {"text", "blob", "transcription"}
+
+
 class File(InDB, FileCreate):
-    pass
+    # False when some of the payload was deferred when the file was loaded
+    payload_loaded: bool = Field(default=True, exclude=True)
+    # Base64 encoding of the blob, kept with the file while it is sent to a model
+    encoded_blob: Optional[str] = Field(default=None, exclude=True)
+
+    @model_validator(mode="before")
+    @classmethod
+    def omit_deferred_payload(cls, data: Any) -> Any:
+        """Validates rows loaded with deferred payload columns without them,
+        instead of loading the columns one row at a time."""
+        state = sa.inspect(data, raiseerr=False)
+        if state is None or not PAYLOAD_FIELDS & state.unloaded:
+            return data
+
+        return {
+            name: getattr(data, name)
+            for name in cls.model_fields
+            if name not in state.unloaded and hasattr(type(data), name)
+        } | {"payload_loaded": False}
+
+    def _has_content(self) -> bool:
+        return not self.payload_loaded or super()._has_content()
 
 
 class FilePublic(InDB):
@@ -1,16 +1,18 @@
+import asyncio
 import os
+from functools import partial
 from pathlib import Path
-from typing import Callable
+from typing import Awaitable, Callable
 
 from fastapi import UploadFile
 
 from intric.files.audio import AudioMimeTypes
+from intric.files.extraction_executor import ExtractionExecutor, extraction_executor
 from intric.files.file_models import FileBaseWithContent, FileType
 from intric.files.file_size_service import FileSizeService
 from intric.files.image import ImageExtractor, ImageMimeTypes
 from intric.files.text import TextExtractor
 from intric.main.config import get_settings
-from intric.main.exceptions import FileTooLargeException
 
 
 def bytes_extractor(filepath: Path, _: str):
@@ -24,27 +26,27 @@ class FileProtocol:
         file_size_service: FileSizeService,
         text_extractor: TextExtractor,
         image_extractor: ImageExtractor,
+        extraction_executor: ExtractionExecutor = extraction_executor,
     ):
         self.file_size_service = file_size_service
         self.text_extractor = text_extractor
         self.image_extractor = image_extractor
+        self.extraction_executor = extraction_executor
 
     async def _get_content(
         self,
         upload_file: UploadFile,
         file_type: FileType,
         max_size: int,
-        extractor: Callable[[Path, str], str | bytes],
+        extractor: Callable[[Path, str], Awaitable[str | bytes]],
     ):
-        if self.file_size_service.is_too_large(upload_file.file, max_size=max_size):
-            raise FileTooLargeException()
-
-        filepath = await self.file_size_service.save_file_to_disk(upload_file.file)
-        filepath = Path(filepath)
+        # Size checked, hashed and copied to disk in one pass over the upload
+        ingested = await self.file_size_service.ingest(
+            upload_file.file, max_size=max_size, mimetype=upload_file.content_type
+        )
 
         try:
-            content = extractor(filepath, upload_file.content_type)
-            checksum = self.file_size_service.get_file_checksum(filepath)
+            content = await extractor(ingested.filepath, ingested.mimetype)
 
             if isinstance(content, str):
                 size = len(content.encode("utf-8"))
@@ -52,25 +54,26 @@ class FileProtocol:
                 size = len(content)
 
             return self._create_file_base(
-                upload_file, file_type, content, checksum, size
+                upload_file.filename, ingested.mimetype, file_type, content, ingested.checksum, size
             )
         finally:
-            os.remove(filepath)
+            os.remove(ingested.filepath)
 
     def _create_file_base(
         self,
-        upload_file: UploadFile,
+        filename: str,
+        mimetype: str,
         file_type: FileType,
         content: str | bytes,
         checksum: str,
         size: int,
     ) -> FileBaseWithContent:
         file_base_kwargs = {
-            "name": upload_file.filename,
+            "name": filename,
             "checksum": checksum,
             "size": size,
             "file_type": file_type,
-            "mimetype": upload_file.content_type,
+            "mimetype": mimetype,
         }
 
         if file_type == FileType.TEXT:
@@ -85,7 +88,8 @@ class FileProtocol:
             upload_file,
             file_type=FileType.TEXT,
             max_size=get_settings().upload_file_to_session_max_size,
-            extractor=self.text_extractor.extract,
+            # Documents are parsed in a separate process, off the event loop
+            extractor=partial(self.extraction_executor.run, self.text_extractor.extract),
         )
 
     async def image_to_domain(self, upload_file: UploadFile):
@@ -93,7 +97,7 @@ class FileProtocol:
             upload_file,
             file_type=FileType.IMAGE,
             max_size=get_settings().upload_image_to_session_max_size,
-            extractor=self.image_extractor.extract,
+            extractor=partial(asyncio.to_thread, self.image_extractor.extract),
         )
 
     async def audio_to_domain(self, upload_file: UploadFile):
@@ -101,7 +105,7 @@ class FileProtocol:
             upload_file,
             file_type=FileType.AUDIO,
             max_size=get_settings().transcription_max_file_size,
-            extractor=bytes_extractor,
+            extractor=partial(asyncio.to_thread, bytes_extractor),
         )
 
     async def to_domain(self, upload_file: UploadFile):
@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID
 
 import sqlalchemy as sa
@@ -6,17 +7,37 @@ from sqlalchemy.orm import defer
 from intric.database.database import AsyncSession
 from intric.database.repositories.base import BaseRepositoryDelegate
 from intric.database.tables.files_table import Files
+from intric.files.blob_store import BlobStore, blob_store
 from intric.files.file_models import File, FileCreate, FileInfo
 
 
+def defer_payload(include_text: bool = False) -> list:
+    """Load options that leave out the content of files.
+
+    Rows loaded like this validate as files without their payload, which is
+    loaded on demand with `FileRepository.get_blobs` and `load_blobs`.
+    """
+    options = [defer(Files.blob, raiseload=True), defer(Files.transcription, raiseload=True)]
+    if not include_text:
+        options.append(defer(Files.text, raiseload=True))
+
+    return options
+
+
 class FileRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, blob_store: Optional[BlobStore] = blob_store):
         self._delegate = BaseRepositoryDelegate(
             session=session, table=Files, in_db_model=File
         )
         self.session = session
+        self.blob_store = blob_store
 
     async def add(self, file: FileCreate) -> File:
+        if self.blob_store is not None and file.blob is not None:
+            # Stored before the row is, so that a file never refers to a missing blob
+            await self.blob_store.put(file.checksum, file.blob)
+            file = file.model_copy(update={"blob": None, "blob_in_store": True})
+
         return await self._delegate.add(file)
 
     async def get_list_by_id_and_user(
@@ -51,19 +72,20 @@ class FileRepository:
     async def delete(self, id: UUID) -> File:
         return await self._delegate.delete(id)
 
+    async def get_blobs(self, ids: list[UUID]) -> dict[UUID, bytes]:
+        """Blobs of the files that keep them in the database, by file id."""
+        stmt = sa.select(Files.id, Files.blob).where(Files.id.in_(ids), Files.blob.is_not(None))
+        rows = await self.session.execute(stmt)
+
+        return {id: blob for id, blob in rows}
+
     async def update(self, file: File) -> File:
-        return await self._delegate.update(file)
+        # A blob loaded from the blob store stays there
+        exclude = {"blob"} if file.blob_in_store else set()
+        return await self._delegate.update(file, exclude=exclude)
 
     async def get_file_infos(self, ids: list[UUID]) -> list[FileInfo]:
-        stmt = (
-            sa.select(Files)
-            .where(Files.id.in_(ids))
-            .options(
-                defer(Files.text, raiseload=True),
-                defer(Files.blob, raiseload=True),
-                defer(Files.transcription, raiseload=True),
-            )
-        )
+        stmt = sa.select(Files).where(Files.id.in_(ids)).options(*defer_payload())
 
         files_in_db = await self.session.scalars(stmt)
 
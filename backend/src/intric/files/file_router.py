@@ -1,6 +1,6 @@
-import io
 import re
 import time
+from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Header, Query, Request, Response, UploadFile
@@ -28,6 +28,39 @@ from intric.server.protocol import responses
 
 router = APIRouter()
 
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+# Bytes sent at a time when streaming content held in memory
+CHUNK_SIZE = 1024 * 1024
+
+
+def _parse_range(range_header: str, total_size: int) -> Optional[tuple[int, int]]:
+    """Get the first and last byte of a single `bytes=` range, clamped to the
+    size, or None if the header is not such a range. Raises ValueError if the
+    range is not satisfiable."""
+    range_match = RANGE_PATTERN.fullmatch(range_header.strip())
+    if range_match is None or range_match.groups() == ("", ""):
+        return None
+
+    first, last = range_match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), total_size - 1) if last else total_size - 1
+    else:
+        # The last bytes of the content, for example bytes=-500
+        start = max(total_size - int(last), 0)
+        end = total_size - 1 if int(last) else -1
+
+    if start >= total_size or start > end:
+        raise ValueError("Range not satisfiable")
+
+    return start, end
+
+
+async def _iter_bytes(content: bytes, start: int, end: int):
+    for offset in range(start, end + 1, CHUNK_SIZE):
+        yield content[offset : min(offset + CHUNK_SIZE, end + 1)]
+
 
 @router.post(
     "/", response_model=FilePublic, responses=responses.get_responses([415, 413])
@@ -162,18 +195,30 @@ async def download_file_signed(
     file_repo = container.file_repo()
     file = await file_repo.get_by_id(file_id=payload["file_id"])
 
-    if file.text is None and file.blob is None:
+    if file.text is None and file.blob is None and not file.blob_in_store:
         raise NotFoundException(detail="File content not found")
 
-    content_bytes = None
     if file.file_type == FileType.TEXT and file.text:
         content_bytes = file.text.encode("utf-8")
-    elif file.blob:
+        total_size = len(content_bytes)
+    elif file.blob is not None:
         content_bytes = file.blob
+        total_size = len(content_bytes)
+    elif file.blob_in_store and file_repo.blob_store is not None:
+        # Streamed from the blob store, never held in memory as a whole
+        content_bytes = None
+        total_size = await file_repo.blob_store.size(file.checksum)
+        if total_size is None:
+            raise NotFoundException(detail="File content not found")
     else:
         return Response(status_code=404, content="File content not found")
 
-    total_size = len(content_bytes)
+    def stream_content(start: int, end: int):
+        if content_bytes is None:
+            return file_repo.blob_store.stream(file.checksum, start, end)
+
+        return _iter_bytes(content_bytes, start, end)
+
     headers = {
         "Content-Disposition": f"{content_disposition.value}; filename=\"{file.name}\"",
         "Accept-Ranges": "bytes",
@@ -181,49 +226,38 @@ async def download_file_signed(
 
     # Handle range request
     if range:
-        # Only allow range requests for audio files
-        if file.file_type != FileType.AUDIO:
-            raise BadRequestException("Range is only allowed for audio files")
+        # Only allow range requests for audio and images
+        if file.file_type not in (FileType.AUDIO, FileType.IMAGE):
+            raise BadRequestException("Range is only allowed for audio and image files")
 
         try:
-            range_match = re.match(r'bytes=(\d+)-(\d*)', range)
-            if range_match:
-                start = int(range_match.group(1))
-                end = (
-                    int(range_match.group(2))
-                    if range_match.group(2)
-                    else total_size - 1
-                )
-
-                # Validate range
-                if start >= total_size or end >= total_size or start > end:
-                    return Response(
-                        status_code=416,  # Range Not Satisfiable
-                        headers={"Content-Range": f"bytes */{total_size}"},
-                    )
-
-                # Create partial response
-                content = io.BytesIO(content_bytes[start : end + 1])
-
-                headers.update(
-                    {
-                        "Content-Range": f"bytes {start}-{end}/{total_size}",
-                        "Content-Length": str(end - start + 1),
-                    }
-                )
-
-                return StreamingResponse(
-                    content,
-                    status_code=206,  # Partial Content
-                    media_type=file.mimetype,
-                    headers=headers,
-                )
-        except Exception:
-            # If range parsing fails, fall back to full content
-            pass
+            byte_range = _parse_range(range, total_size)
+        except ValueError:
+            return Response(
+                status_code=416,  # Range Not Satisfiable
+                headers={"Content-Range": f"bytes */{total_size}"},
+            )
+
+        # If the range can not be parsed, fall back to full content
+        if byte_range is not None:
+            start, end = byte_range
+            headers.update(
+                {
+                    "Content-Range": f"bytes {start}-{end}/{total_size}",
+                    "Content-Length": str(end - start + 1),
+                }
+            )
+
+            return StreamingResponse(
+                stream_content(start, end),
+                status_code=206,  # Partial Content
+                media_type=file.mimetype,
+                headers=headers,
+            )
 
     # Return full content if range is not specified or invalid
     headers["Content-Length"] = str(total_size)
-    content = io.BytesIO(content_bytes)
 
-    return StreamingResponse(content, media_type=file.mimetype, headers=headers)
+    return StreamingResponse(
+        stream_content(0, total_size - 1), media_type=file.mimetype, headers=headers
+    )
@@ -34,7 +34,7 @@ class FileService:
         mimetype: str = "image/jpeg",
     ):
         """Create a file from raw image bytes returned by an AI model."""
-        checksum = hashlib.md5(image_data).hexdigest()
+        checksum = hashlib.sha256(image_data).hexdigest()
         size = len(image_data)
 
         file_base = FileBaseWithContent(
@@ -103,7 +103,7 @@ class FileService:
         if file.user_id != self.user.id:
             raise UnauthorizedException()
 
-        if file.text is None and file.blob is None:
+        if file.text is None and file.blob is None and not file.blob_in_store:
             raise NotFoundException(detail="File content not found")
 
         return file
@@ -116,7 +116,7 @@ class FileService:
         """
         file = await self.repo.get_by_id(file_id=file_id)
 
-        if file.text is None and file.blob is None:
+        if file.text is None and file.blob is None and not file.blob_in_store:
             raise NotFoundException(detail="File content not found")
 
         return file
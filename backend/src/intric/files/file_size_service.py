@@ -1,43 +1,72 @@
 import asyncio
 import hashlib
-import os
-import shutil
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
-from tempfile import SpooledTemporaryFile
-from typing import IO
+from typing import IO, Optional
+
+import magic
+
+from intric.main.exceptions import FileTooLargeException
 
 TMP_DIR = "/tmp/"
 
+CHUNK_SIZE = 1024 * 1024
+
+# Declared mimetypes that say nothing about the content, which is sniffed instead
+GENERIC_MIMETYPES = {None, "", "application/octet-stream"}
+
+
+@dataclass
+class IngestedFile:
+    filepath: Path
+    size: int
+    checksum: str
+    mimetype: Optional[str]
+
 
 class FileSizeService:
     @staticmethod
-    async def save_file_to_disk(file: SpooledTemporaryFile):
-        destination = os.path.join(TMP_DIR, uuid.uuid4().hex)
-        destination_path = Path(destination)
+    def _ingest(
+        file: IO, max_size: int, mimetype: Optional[str], destination: Path
+    ) -> IngestedFile:
+        h = hashlib.sha256()
+        size = 0
+
+        with destination.open("wb") as buffer:
+            while chunk := file.read(CHUNK_SIZE):
+                if size == 0 and mimetype in GENERIC_MIMETYPES:
+                    mimetype = magic.from_buffer(chunk, mime=True)
+
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLargeException("File too large.")
+
+                h.update(chunk)
+                buffer.write(chunk)
+
+        return IngestedFile(
+            filepath=destination, size=size, checksum=h.hexdigest(), mimetype=mimetype
+        )
+
+    async def ingest(self, file: IO, max_size: int, mimetype: Optional[str] = None) -> IngestedFile:
+        """Copies an upload to disk in one pass over it.
+
+        The size limit is enforced, the sha256 checksum computed and the
+        mimetype sniffed, when the declared one is missing or generic, while
+        the file is copied. The upload is closed, and nothing is left on disk
+        when it is too large.
+        """
+        destination = Path(TMP_DIR) / uuid.uuid4().hex
 
         try:
-            with destination_path.open("wb") as buffer:
-                await asyncio.to_thread(shutil.copyfileobj, file, buffer)
+            return await asyncio.to_thread(self._ingest, file, max_size, mimetype, destination)
+        except BaseException:
+            destination.unlink(missing_ok=True)
+            raise
         finally:
             file.close()
 
-        return destination
-
-    @staticmethod
-    def is_too_large(file: IO, max_size: int):
-        real_file_size = 0
-        for chunk in file:
-            real_file_size += len(chunk)
-            if real_file_size > max_size:
-                return True
-
-        # return the pointer back to the starting point so that
-        # the next read starts from the starting point
-        file.seek(0)
-
-        return False
-
     @staticmethod
     def get_file_checksum(filepath: Path):
         """Taken from https://stackoverflow.com/a/44873382"""
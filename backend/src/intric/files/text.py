@@ -1,5 +1,6 @@
 from enum import Enum
 from pathlib import Path
+from typing import Iterator
 
 import magic
 import pptx
@@ -56,11 +57,16 @@ class TextExtractor:
         )
 
     @staticmethod
-    def extract_from_pdf(filepath: Path) -> str:
+    def extract_pages_from_pdf(filepath: Path) -> Iterator[str]:
+        """Yield the text of one page at a time, the pages are parsed as they
+        are reached."""
         reader = PdfReader(filepath)
-        extracted_text = " ".join([page.extract_text() for page in reader.pages])
-        sanitized_text = TextSanitizer.sanitize(extracted_text)
-        return sanitized_text
+        for page in reader.pages:
+            yield TextSanitizer.sanitize(page.extract_text())
+
+    @classmethod
+    def extract_from_pdf(cls, filepath: Path) -> str:
+        return " ".join(cls.extract_pages_from_pdf(filepath))
 
     @staticmethod
     def extract_from_docx(filepath: Path) -> str:
@@ -68,19 +74,23 @@ class TextExtractor:
             return docx_content.text
 
     @staticmethod
-    def extract_from_pptx(filepath: Path) -> str:
-        # Extract text from pptx using python-pptx
-        extracted_text = ""
+    def extract_slides_from_pptx(filepath: Path) -> Iterator[str]:
+        """Yield the text of one slide at a time, a line per text frame."""
         presentation = pptx.Presentation(filepath)
         for slide in presentation.slides:
+            parts = []
             for shape in slide.shapes:
                 if shape.has_text_frame:
                     for paragraph in shape.text_frame.paragraphs:
                         for run in paragraph.runs:
-                            extracted_text += run.text + " "
-                    extracted_text += "\n"
+                            parts.append(run.text + " ")
+                    parts.append("\n")
 
-        return extracted_text
+            yield "".join(parts)
+
+    @classmethod
+    def extract_from_pptx(cls, filepath: Path) -> str:
+        return "".join(cls.extract_slides_from_pptx(filepath))
 
     def extract(self, filepath: Path, mimetype: str | None = None) -> str:
         mimetype = mimetype or magic.from_file(filepath, mime=True)
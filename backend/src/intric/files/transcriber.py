@@ -1,59 +1,175 @@
 # MIT License
 
+import asyncio
 import tempfile
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
+from intric.database.transaction import unit_of_work
 from intric.files import audio
 from intric.files.audio import AudioMimeTypes
+from intric.files.blob_store import load_blobs
 from intric.files.file_models import File
+from intric.files.file_size_service import FileSizeService
+from intric.main.config import get_settings
+from intric.main.logging import get_logger
 from intric.transcription_models.infrastructure.adapters.whisper import (
     OpenAISTTModelAdapter,
 )
 
 if TYPE_CHECKING:
     from intric.files.file_repo import FileRepository
+    from intric.files.transcription_cache_repo import TranscriptionCacheRepository
     from intric.transcription_models.domain.transcription_model import (
         TranscriptionModel,
     )
+    from intric.users.user import UserInDB
+
+logger = get_logger(__name__)
 
 
 class Transcriber:
-    def __init__(self, file_repo: "FileRepository"):
+    def __init__(
+        self,
+        file_repo: "FileRepository",
+        user: Optional["UserInDB"] = None,
+        transcription_cache_repo: Optional["TranscriptionCacheRepository"] = None,
+    ):
         self.file_repo = file_repo
+        self.user = user
+        self.transcription_cache_repo = transcription_cache_repo
+
+    def _uses_cache(self) -> bool:
+        return (
+            self.transcription_cache_repo is not None
+            and self.user is not None
+            and get_settings().transcription_cache_days is not None
+        )
+
+    async def _get_cached_transcription(
+        self, checksum: str, transcription_model: "TranscriptionModel"
+    ) -> Optional[str]:
+        if not self._uses_cache():
+            return None
+
+        async with unit_of_work(self.transcription_cache_repo.session, savepoint=False):
+            transcription = await self.transcription_cache_repo.get(
+                tenant_id=self.user.tenant_id,
+                checksum=checksum,
+                transcription_model_id=transcription_model.id,
+            )
+        if transcription is not None:
+            logger.debug(f"Reusing the transcription of audio {checksum}")
+
+        return transcription
+
+    async def _cache_transcription(
+        self,
+        checksum: str,
+        transcription_model: "TranscriptionModel",
+        transcription: str,
+        retention_days: Optional[int],
+    ):
+        if not self._uses_cache():
+            return
+
+        # Not kept longer than the data it was transcribed from
+        days = get_settings().transcription_cache_days
+        if retention_days is not None:
+            days = min(days, retention_days)
+
+        if days <= 0:
+            return
+
+        async with unit_of_work(self.transcription_cache_repo.session, savepoint=False):
+            await self.transcription_cache_repo.add(
+                tenant_id=self.user.tenant_id,
+                checksum=checksum,
+                transcription_model_id=transcription_model.id,
+                transcription=transcription,
+                expires_at=datetime.now(timezone.utc) + timedelta(days=days),
+            )
 
-    async def transcribe(self, file: File, transcription_model: "TranscriptionModel"):
-        if file.blob is None or not AudioMimeTypes.has_value(file.mimetype):
+    async def _transcribe(
+        self,
+        *,
+        filepath: Path,
+        checksum: str,
+        transcription_model: "TranscriptionModel",
+        retention_days: Optional[int],
+    ) -> str:
+        adapter = OpenAISTTModelAdapter(model=transcription_model)
+        async with audio.to_wav(filepath) as wav_file:
+            transcription = await adapter.get_text_from_file(wav_file)
+
+        await self._cache_transcription(
+            checksum, transcription_model, transcription, retention_days=retention_days
+        )
+
+        return transcription
+
+    async def transcribe(
+        self,
+        file: File,
+        transcription_model: "TranscriptionModel",
+        retention_days: Optional[int] = None,
+    ):
+        has_blob = file.blob is not None or file.blob_in_store
+        if not has_blob or not AudioMimeTypes.has_value(file.mimetype):
             raise ValueError("File needs to be an audio file")
 
         # If file already has a transcription, return it
         if file.transcription:
             return file.transcription
 
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                temp_file.write(file.blob)
-                temp_file_path = Path(temp_file.name)
+        result = await self._get_cached_transcription(file.checksum, transcription_model)
 
-            result = await self.transcribe_from_filepath(
-                filepath=temp_file_path, transcription_model=transcription_model
-            )
+        if result is None:
+            await load_blobs([file])
+
+            try:
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
+                    temp_file.write(file.blob)
+                    temp_file_path = Path(temp_file.name)
+
+                result = await self._transcribe(
+                    filepath=temp_file_path,
+                    checksum=file.checksum,
+                    transcription_model=transcription_model,
+                    retention_days=retention_days,
+                )
+            finally:
+                temp_file_path.unlink()  # Clean up the temporary file
 
-            # Store the transcription in the file object
-            file.transcription = result
+        # Store the transcription in the file object
+        file.transcription = result
 
-            # If we have a repository, update the file in the database
-            if self.file_repo:
-                await self.file_repo.update(file)
-        finally:
-            temp_file_path.unlink()  # Clean up the temporary file
+        # If we have a repository, update the file in the database
+        if self.file_repo:
+            await self.file_repo.update(file)
 
         return result
 
     async def transcribe_from_filepath(
-        self, *, filepath: Path, transcription_model: "TranscriptionModel"
+        self,
+        *,
+        filepath: Path,
+        transcription_model: "TranscriptionModel",
+        retention_days: Optional[int] = None,
+        checksum: Optional[str] = None,
     ):
-        adapter = OpenAISTTModelAdapter(model=transcription_model)
+        # Computed when the file was uploaded, read the file again only without it
+        if checksum is None:
+            checksum = await asyncio.to_thread(FileSizeService.get_file_checksum, filepath)
 
-        async with audio.to_wav(filepath) as wav_file:
-            return await adapter.get_text_from_file(wav_file)
+        transcription = await self._get_cached_transcription(checksum, transcription_model)
+        if transcription is not None:
+            return transcription
+
+        return await self._transcribe(
+            filepath=filepath,
+            checksum=checksum,
+            transcription_model=transcription_model,
+            retention_days=retention_days,
+        )
@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
+
+from intric.database.database import AsyncSession
+from intric.database.tables.transcription_cache_table import TranscriptionCache
+
+
+class TranscriptionCacheRepository:
+    """Transcriptions of audio files, shared by the users of a tenant and looked
+    up on the checksum of the audio and the transcription model."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(
+        self, *, tenant_id: UUID, checksum: str, transcription_model_id: UUID
+    ) -> Optional[str]:
+        stmt = sa.select(TranscriptionCache.transcription).where(
+            TranscriptionCache.tenant_id == tenant_id,
+            TranscriptionCache.checksum == checksum,
+            TranscriptionCache.transcription_model_id == transcription_model_id,
+            TranscriptionCache.expires_at > sa.func.now(),
+        )
+
+        return await self.session.scalar(stmt)
+
+    async def add(
+        self,
+        *,
+        tenant_id: UUID,
+        checksum: str,
+        transcription_model_id: UUID,
+        transcription: str,
+        expires_at: datetime,
+    ):
+        stmt = insert(TranscriptionCache).values(
+            tenant_id=tenant_id,
+            checksum=checksum,
+            transcription_model_id=transcription_model_id,
+            transcription=transcription,
+            expires_at=expires_at,
+        )
+        # Replaces an entry that has expired but is not deleted yet
+        stmt = stmt.on_conflict_do_update(
+            constraint="transcription_cache_tenant_checksum_model_unique",
+            set_={"transcription": transcription, "expires_at": expires_at},
+        )
+
+        await self.session.execute(stmt)
@@ -8,7 +8,7 @@ from typing import TYPE_CHECKING, Optional, Union
 
 from intric.ai_models.completion_models.completion_model import Completion, ResponseType
 from intric.assistants.api.assistant_models import AssistantResponse
-from intric.completion_models.infrastructure.context_builder import count_tokens
+from intric.completion_models.infrastructure.token_counter import count_tokens
 from intric.group_chat.domain.entities.group_chat import (
     GroupChat,
     GroupChatAssistant,
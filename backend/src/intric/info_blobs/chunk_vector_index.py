@@ -0,0 +1,328 @@
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import event
+
+from intric.main.config import get_settings
+from intric.main.logging import get_logger
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session, SessionTransaction
+
+logger = get_logger(__name__)
+
+REDIS_KEY_PREFIX = "chunk_vector_index"
+
+# Rows converted to float32 at a time when the matrix is stored as float16
+SEARCH_BLOCK_SIZE = 8192
+
+
+@dataclass
+class SourceMatrix:
+    """Normalized embeddings of the chunks of a source, one row per chunk.
+
+    A matrix without rows marks a source that is too large to keep in memory,
+    so that it is not counted again on every search.
+    """
+
+    ids: np.ndarray
+    matrix: Optional[np.ndarray]
+    version: int
+    expires_at: float
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + (self.matrix.nbytes if self.matrix is not None else 0)
+
+    @property
+    def is_indexed(self) -> bool:
+        return self.matrix is not None
+
+
+@dataclass
+class BuildLock:
+    """Lock of the build of one source, with the number of searches holding or
+    waiting for it, so that it is dropped once none are."""
+
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+
+class ChunkVectorIndex:
+    """In process brute force vector index of the chunks of hot sources.
+
+    The embeddings of a source are kept in memory and searched with NumPy, so
+    only the nearest chunks are fetched from the database. Sources are evicted
+    least recently used when the index grows beyond max bytes.
+
+    Every source has a version, which is bumped when chunks are added to or
+    deleted from it, once the transaction that changed it commits. With Redis
+    the versions are shared, so that a source is rebuilt in every process once
+    the worker has changed it. Entries also expire after a time to live, which
+    bounds how stale a source can get when it is changed without being
+    invalidated, for example by a cascading delete.
+    """
+
+    def __init__(
+        self,
+        max_chunks: int,
+        max_bytes: int,
+        ttl_seconds: int,
+        dtype: str = "float32",
+        redis_client: Optional["Redis"] = None,
+    ):
+        self.max_chunks = max_chunks
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.dtype = np.dtype(dtype)
+        self.redis_client = redis_client
+
+        self._entries: OrderedDict[tuple[UUID, int], SourceMatrix] = OrderedDict()
+        self._versions: dict[UUID, int] = {}
+        self._nbytes = 0
+
+        # Concurrent searches of a source that is not built yet build it once. asyncio
+        # primitives are bound to the event loop they are first used in, so the
+        # locks are kept per loop.
+        self._build_locks: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[tuple[UUID, int], BuildLock]
+        ] = weakref.WeakKeyDictionary()
+
+        # Writes of versions to redis started from commit hooks
+        self._tasks: set[asyncio.Task] = set()
+
+    @asynccontextmanager
+    async def build_lock(self, source_id: UUID, dimensions: int):
+        locks = self._build_locks.setdefault(asyncio.get_running_loop(), {})
+        key = (source_id, dimensions)
+        build_lock = locks.setdefault(key, BuildLock())
+
+        build_lock.users += 1
+        try:
+            async with build_lock.lock:
+                yield
+        finally:
+            build_lock.users -= 1
+            if build_lock.users == 0:
+                del locks[key]
+
+    @staticmethod
+    def _version_key(source_id: UUID) -> str:
+        return f"{REDIS_KEY_PREFIX}:version:{source_id}"
+
+    async def get_versions(self, source_ids: list[UUID]) -> Optional[dict[UUID, int]]:
+        """Get the current version of the sources, or None if they can not be
+        read, in which case the index should not be used."""
+        if self.redis_client is None:
+            return {source_id: self._versions.get(source_id, 0) for source_id in source_ids}
+
+        try:
+            values = await self.redis_client.mget(
+                [self._version_key(source_id) for source_id in source_ids]
+            )
+        except Exception:
+            logger.exception("Could not read vector index versions from redis")
+            return None
+
+        return {
+            source_id: int(value) if value is not None else 0
+            for source_id, value in zip(source_ids, values)
+        }
+
+    async def invalidate(self, source_ids: list[UUID]):
+        source_ids = self._bump_versions(source_ids)
+        await self._write_versions(source_ids)
+
+    async def invalidate_after_commit(self, session: "AsyncSession", source_ids: list[UUID]):
+        """Invalidate the sources once the transaction of the session commits.
+
+        Invalidated before the commit, a source could be rebuilt from the rows
+        as they were before the change, under the new version.
+        """
+        if not session.in_transaction():
+            await self.invalidate(source_ids)
+            return
+
+        sync_session = session.sync_session
+        if not event.contains(sync_session, "after_commit", self._after_commit):
+            event.listen(sync_session, "after_commit", self._after_commit)
+            event.listen(sync_session, "after_transaction_end", self._after_transaction_end)
+
+        sync_session.info.setdefault(self, set()).update(source_ids)
+
+    def _after_commit(self, session: "Session"):
+        # Released savepoints are committed too, wait for the transaction
+        if session.in_nested_transaction():
+            return
+
+        source_ids = self._bump_versions(session.info.pop(self, []))
+        if not source_ids:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        task = loop.create_task(self._write_versions(source_ids))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _after_transaction_end(self, session: "Session", transaction: "SessionTransaction"):
+        # Sources changed in a transaction that was rolled back are unchanged
+        if transaction.parent is None:
+            session.info.pop(self, None)
+
+    def _bump_versions(self, source_ids) -> list[UUID]:
+        source_ids = list(dict.fromkeys(source_id for source_id in source_ids if source_id))
+
+        for source_id in source_ids:
+            self._versions[source_id] = self._versions.get(source_id, 0) + 1
+            for key in [key for key in self._entries if key[0] == source_id]:
+                self._remove(key)
+
+        return source_ids
+
+    async def _write_versions(self, source_ids: list[UUID]):
+        if self.redis_client is not None and source_ids:
+            try:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for source_id in source_ids:
+                        pipe.incr(self._version_key(source_id))
+                    await pipe.execute()
+            except Exception:
+                logger.exception("Could not write vector index versions to redis")
+
+    def get(self, source_id: UUID, dimensions: int, version: int) -> Optional[SourceMatrix]:
+        key = (source_id, dimensions)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry.version != version or entry.expires_at < time.monotonic():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(
+        self,
+        source_id: UUID,
+        dimensions: int,
+        version: int,
+        ids: np.ndarray,
+        matrix: Optional[np.ndarray],
+    ) -> SourceMatrix:
+        key = (source_id, dimensions)
+        entry = SourceMatrix(
+            ids=ids,
+            matrix=matrix,
+            version=version,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+
+        if key in self._entries:
+            self._remove(key)
+
+        if entry.nbytes > self.max_bytes:
+            return entry
+
+        self._entries[key] = entry
+        self._nbytes += entry.nbytes
+
+        while self._nbytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+        return entry
+
+    def _remove(self, key: tuple[UUID, int]):
+        entry = self._entries.pop(key)
+        self._nbytes -= entry.nbytes
+
+    def build_matrix(self, embeddings: list) -> np.ndarray:
+        """Normalize the embeddings, so that the cosine similarity is the dot product."""
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2:
+            return matrix.reshape(0, 0).astype(self.dtype)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+
+        return matrix.astype(self.dtype, copy=False)
+
+    @staticmethod
+    def _similarities(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+        if matrix.dtype == np.float32:
+            return matrix @ query
+
+        # Matrix products of float16 are not done by BLAS, convert a block at a time
+        similarities = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), SEARCH_BLOCK_SIZE):
+            block = matrix[start : start + SEARCH_BLOCK_SIZE].astype(np.float32)
+            similarities[start : start + SEARCH_BLOCK_SIZE] = block @ query
+
+        return similarities
+
+    @classmethod
+    def search(
+        cls, sources: list[SourceMatrix], embedding: list[float], limit: int
+    ) -> list[tuple[UUID, float]]:
+        """Get the ids and cosine similarities of the nearest chunks of the sources."""
+        query = np.asarray(embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm > 0:
+            query = query / query_norm
+
+        sources = [source for source in sources if len(source.ids)]
+        if not sources:
+            return []
+
+        ids = np.concatenate([source.ids for source in sources])
+        similarities = np.concatenate(
+            [cls._similarities(source.matrix, query) for source in sources]
+        )
+
+        if len(similarities) > limit:
+            nearest = np.argpartition(-similarities, limit)[:limit]
+        else:
+            nearest = np.arange(len(similarities))
+        nearest = nearest[np.argsort(-similarities[nearest])]
+
+        return [(ids[i], float(similarities[i])) for i in nearest]
+
+    def stats(self) -> dict[str, int]:
+        return {"sources": len(self._entries), "bytes": self._nbytes}
+
+    def clear(self):
+        self._entries.clear()
+        self._nbytes = 0
+
+
+def _create_chunk_vector_index() -> Optional[ChunkVectorIndex]:
+    settings = get_settings()
+
+    if not settings.using_chunk_vector_index:
+        return None
+
+    from intric.worker.redis import r
+
+    return ChunkVectorIndex(
+        max_chunks=settings.chunk_vector_index_max_chunks,
+        max_bytes=settings.chunk_vector_index_max_bytes,
+        ttl_seconds=settings.chunk_vector_index_ttl,
+        dtype=settings.chunk_vector_index_dtype,
+        redis_client=r,
+    )
+
+
+chunk_vector_index = _create_chunk_vector_index()
@@ -1,13 +1,29 @@
+import hashlib
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, computed_field, model_validator
+from pydantic import BaseModel, Field, computed_field, model_validator
 
 from intric.groups_legacy.api.group_models import GroupInDBBase
 from intric.main.models import InDB
 from intric.websites.presentation.website_models import WebsiteInDBBase
 
 
+def get_chunk_text_hash(text: str) -> str:
+    # Normalize whitespace so that re-extracted documents with
+    # cosmetic differences still hit the same embedding
+    normalized_text = " ".join(text.split())
+    return hashlib.sha256(normalized_text.encode()).hexdigest()
+
+
+def get_chunk_size(text: str, dimensions: int) -> int:
+    # Size of chunk is number of bytes of text
+    # + embedding dimension * 4
+    # This is an empirically derived value which is not
+    # obvious as to why it provides a good estimation
+    return len(text.encode()) + dimensions * 4
+
+
 class InfoBlobBase(BaseModel):
     text: str
 
@@ -24,6 +40,9 @@ class InfoBlobMetadata(InfoBlobMetadataUpsertPublic):
 
 class InfoBlobAdd(InfoBlobBase, InfoBlobMetadataUpsertPublic):
     size: Optional[int] = None
+    content_hash: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
     user_id: UUID
     group_id: Optional[UUID] = None
     website_id: Optional[UUID] = None
@@ -64,6 +83,9 @@ class InfoBlobInDBNoText(InDB):
     user_id: UUID
     tenant_id: UUID
     size: int
+    content_hash: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
 
     group_id: Optional[UUID] = None
     website_id: Optional[UUID] = None
@@ -73,12 +95,12 @@ class InfoBlobInDBNoText(InDB):
     website: Optional[WebsiteInDBBase] = None
 
 
-class InfoBlobInDB(InfoBlobInDBNoText):
-    text: str
+class InfoBlobInDBNoTextWithScore(InfoBlobInDBNoText):
+    score: float
 
 
-class InfoBlobInDBWithScore(InfoBlobInDB):
-    score: float
+class InfoBlobInDB(InfoBlobInDBNoText):
+    text: str
 
 
 class InfoBlobAddPublic(InfoBlobBase):
@@ -114,6 +136,10 @@ class InfoBlobChunk(BaseModel):
     chunk_no: int
     info_blob_id: UUID
     tenant_id: UUID
+    source_id: Optional[UUID] = None
+
+    # Counted while chunking, used to pack embedding requests. Not stored.
+    num_tokens: Optional[int] = Field(default=None, exclude=True)
 
 
 class InfoBlobChunkWithEmbedding(InfoBlobChunk):
@@ -122,11 +148,12 @@ class InfoBlobChunkWithEmbedding(InfoBlobChunk):
     @computed_field
     @property
     def size(self) -> int:
-        # Size of chunk is number of bytes of text
-        # + embedding dimension * 4
-        # This is an empirically derived value which is not
-        # obvious as to why it provides a good estimation
-        return len(self.text.encode()) + len(self.embedding) * 4
+        return get_chunk_size(self.text, len(self.embedding))
+
+    @computed_field
+    @property
+    def text_hash(self) -> str:
+        return get_chunk_text_hash(self.text)
 
 
 class InfoBlobChunkInDB(InDB, InfoBlobChunkWithEmbedding):
@@ -1,52 +1,134 @@
+import asyncio
 from typing import Optional
 from uuid import UUID
 
+import numpy as np
 import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.orm import defer
 
 from intric.database.database import AsyncSession
 from intric.database.repositories.base import BaseRepositoryDelegate
-from intric.database.tables.info_blob_chunk_table import InfoBlobChunks
+from intric.database.tables.info_blob_chunk_table import (
+    EMBEDDING_INDEX_DIMENSIONS,
+    TEXT_SEARCH_CONFIG,
+    InfoBlobChunks,
+)
 from intric.database.tables.info_blobs_table import InfoBlobs
+from intric.info_blobs.chunk_vector_index import (
+    ChunkVectorIndex,
+    SourceMatrix,
+    chunk_vector_index,
+)
 from intric.info_blobs.info_blob import (
+    InfoBlobChunk,
     InfoBlobChunkInDB,
     InfoBlobChunkInDBWithScore,
-    InfoBlobChunkWithEmbedding,
+    get_chunk_size,
+    get_chunk_text_hash,
 )
+from intric.main.config import get_settings
+
+# Columns of the records copied by `add`, the rest have server defaults
+COPY_COLUMNS = [
+    "text",
+    "chunk_no",
+    "size",
+    "embedding",
+    "text_hash",
+    "info_blob_id",
+    "tenant_id",
+    "source_id",
+]
 
 
 class InfoBlobChunkRepo:
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        vector_index: Optional[ChunkVectorIndex] = chunk_vector_index,
+    ):
         self.delegate = BaseRepositoryDelegate(
             session=session, table=InfoBlobChunks, in_db_model=InfoBlobChunkInDB
         )
         self.session = session
+        self.vector_index = vector_index
 
     @staticmethod
-    def _filter_on_sources(
-        stmt: sa.Select,
+    def _get_source_ids(
         group_ids: list[UUID],
         website_ids: list[UUID],
         integration_knowledge_ids: list[UUID],
-    ):
-        return stmt.where(
-            sa.or_(
-                InfoBlobs.group_id.in_(group_ids),
-                InfoBlobs.website_id.in_(website_ids),
-                InfoBlobs.integration_knowledge_id.in_(integration_knowledge_ids),
+    ) -> list[UUID]:
+        return [*(group_ids or []), *(website_ids or []), *(integration_knowledge_ids or [])]
+
+    @staticmethod
+    def _filter_on_sources(stmt: sa.Select, source_ids: list[UUID]):
+        # The source ids are denormalized onto the chunks, so the filter can be
+        # applied by the index scan rather than after joining the info blobs
+        return stmt.where(InfoBlobChunks.source_id.in_(source_ids))
+
+    @staticmethod
+    def _to_chunks_with_score(rows) -> list[InfoBlobChunkInDBWithScore]:
+        return [
+            InfoBlobChunkInDBWithScore(
+                **chunk.to_dict(exclude=["embedding", "text_search"]),
+                score=score,
+                info_blob_title=info_blob_title,
             )
+            for chunk, score, info_blob_title in rows
+        ]
+
+    async def add(self, chunks: list[InfoBlobChunk], embeddings: np.ndarray):
+        """Insert chunks with their embeddings, given as rows of a matrix.
+
+        The rows are copied into the table in the binary format, embeddings
+        included, and nothing is returned.
+        """
+        dimensions = embeddings.shape[1]
+        records = [
+            (
+                chunk.text,
+                chunk.chunk_no,
+                get_chunk_size(chunk.text, dimensions),
+                embedding,
+                get_chunk_text_hash(chunk.text),
+                chunk.info_blob_id,
+                chunk.tenant_id,
+                chunk.source_id,
+            )
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
+
+        # COPY runs on the connection of the session, in its transaction
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            InfoBlobChunks.__tablename__, records=records, columns=COPY_COLUMNS
         )
 
-    async def add(
-        self, chunks: list[InfoBlobChunkWithEmbedding]
-    ) -> list[InfoBlobChunkInDB]:
+        await self._invalidate_vector_index(chunks)
+
+    async def get_embeddings_by_text_hash(
+        self,
+        text_hashes: list[str],
+        *,
+        embedding_model_id: UUID,
+        tenant_id: UUID,
+    ) -> dict[str, list[float]]:
         stmt = (
-            sa.insert(InfoBlobChunks)
-            .values([chunk.model_dump() for chunk in chunks])
-            .returning(InfoBlobChunks)
+            sa.select(InfoBlobChunks.text_hash, InfoBlobChunks.embedding)
+            .distinct(InfoBlobChunks.text_hash)
+            .join(InfoBlobs)
+            .where(InfoBlobChunks.text_hash.in_(text_hashes))
+            .where(InfoBlobChunks.tenant_id == tenant_id)
+            .where(InfoBlobs.embedding_model_id == embedding_model_id)
         )
 
-        return await self.delegate.get_models_from_query(stmt)
+        result = await self.session.execute(stmt)
+
+        return {text_hash: embedding for text_hash, embedding in result}
 
     async def delete_by_info_blob(self, info_blob_id: UUID):
         stmt = (
@@ -55,7 +137,151 @@ class InfoBlobChunkRepo:
             .returning(InfoBlobChunks)
         )
 
-        return await self.delegate.get_models_from_query(stmt)
+        chunks_in_db = await self.delegate.get_models_from_query(stmt)
+        await self._invalidate_vector_index(chunks_in_db)
+
+        return chunks_in_db
+
+    async def _invalidate_vector_index(self, chunks: list[InfoBlobChunk]):
+        if self.vector_index is not None:
+            await self.vector_index.invalidate_after_commit(
+                self.session, [chunk.source_id for chunk in chunks]
+            )
+
+    async def _get_source_matrix(
+        self, source_id: UUID, dimensions: int, version: int
+    ) -> SourceMatrix:
+        async with self.vector_index.build_lock(source_id, dimensions):
+            source_matrix = self.vector_index.get(source_id, dimensions, version)
+            if source_matrix is not None:
+                return source_matrix
+
+            if not await self._has_at_most_chunks([source_id], self.vector_index.max_chunks):
+                return self.vector_index.put(
+                    source_id, dimensions, version, ids=np.array([]), matrix=None
+                )
+
+            stmt = (
+                sa.select(InfoBlobChunks.id, InfoBlobChunks.embedding)
+                .where(InfoBlobChunks.source_id == source_id)
+                .where(sa.func.vector_dims(InfoBlobChunks.embedding) == dimensions)
+            )
+            rows = (await self.session.execute(stmt)).all()
+
+            ids = np.array([id for id, _ in rows], dtype=object)
+            matrix = await asyncio.to_thread(
+                self.vector_index.build_matrix, [embedding for _, embedding in rows]
+            )
+
+            return self.vector_index.put(source_id, dimensions, version, ids=ids, matrix=matrix)
+
+    async def _vector_index_search(
+        self, embedding: list[float], *, source_ids: list[UUID], limit: int
+    ) -> Optional[list[InfoBlobChunkInDBWithScore]]:
+        """Search the sources in the in process vector index. Returns None if a
+        source is too large for the index, or the versions can not be read."""
+        versions = await self.vector_index.get_versions(source_ids)
+        if versions is None:
+            return None
+
+        sources = []
+        for source_id in source_ids:
+            version = versions[source_id]
+            source_matrix = await self._get_source_matrix(source_id, len(embedding), version)
+
+            if not source_matrix.is_indexed:
+                return None
+
+            sources.append(source_matrix)
+
+        nearest = await asyncio.to_thread(self.vector_index.search, sources, embedding, limit)
+        if not nearest:
+            return []
+
+        stmt = (
+            sa.select(InfoBlobChunks, InfoBlobs.title)
+            .join(InfoBlobs)
+            .options(defer(InfoBlobChunks.embedding))
+            .where(InfoBlobChunks.id.in_([id for id, _ in nearest]))
+        )
+        chunks_by_id = {
+            chunk.id: (chunk, title) for chunk, title in await self.session.execute(stmt)
+        }
+
+        # Chunks deleted since the source was indexed are left out
+        return self._to_chunks_with_score(
+            (chunks_by_id[id][0], score, chunks_by_id[id][1])
+            for id, score in nearest
+            if id in chunks_by_id
+        )
+
+    async def _has_at_most_chunks(self, source_ids: list[UUID], max_chunks: int) -> bool:
+        # Counts no further than necessary, so this stays cheap for large sources
+        chunks = self._filter_on_sources(
+            sa.select(sa.literal(1)).select_from(InfoBlobChunks), source_ids
+        ).limit(max_chunks + 1)
+        stmt = sa.select(sa.func.count()).select_from(chunks.subquery())
+
+        return await self.session.scalar(stmt) <= max_chunks
+
+    def _semantic_search_stmt(
+        self, distance, *where, source_ids: list[UUID], limit: int
+    ) -> sa.Select:
+        # With an iterative index scan the nearest chunks are returned in roughly
+        # ascending distance, so they are found first and then sorted exactly
+        nearest_chunks = (
+            self._filter_on_sources(
+                sa.select(InfoBlobChunks.id, distance.label("distance")), source_ids
+            )
+            .where(*where)
+            .order_by(distance)
+            .limit(limit)
+            .cte("nearest_chunks")
+            .prefix_with("MATERIALIZED")
+        )
+
+        return (
+            sa.select(InfoBlobChunks, nearest_chunks.c.distance, InfoBlobs.title)
+            .join(nearest_chunks, nearest_chunks.c.id == InfoBlobChunks.id)
+            .join(InfoBlobs)
+            .options(defer(InfoBlobChunks.embedding))
+            .order_by(nearest_chunks.c.distance)
+        )
+
+    async def _exact_search(self, embedding: list[float], *, source_ids: list[UUID], limit: int):
+        distance = InfoBlobChunks.embedding.cosine_distance(embedding)
+        return (
+            await self.session.execute(
+                self._semantic_search_stmt(distance, source_ids=source_ids, limit=limit)
+            )
+        ).all()
+
+    async def _index_search(self, embedding: list[float], *, source_ids: list[UUID], limit: int):
+        settings = get_settings()
+        dimensions = len(embedding)
+
+        await self.session.execute(
+            sa.text(f"SET LOCAL hnsw.ef_search = {int(settings.hnsw_ef_search)}")
+        )
+        if settings.hnsw_iterative_scan:
+            await self.session.execute(sa.text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+            await self.session.execute(
+                sa.text(f"SET LOCAL hnsw.max_scan_tuples = {int(settings.hnsw_max_scan_tuples)}")
+            )
+
+        # Use the HNSW index of the dimension. The expressions must match the
+        # index exactly, and the dimension is inlined rather than bound so that
+        # the partial index can be used with prepared statements as well.
+        distance = sa.cast(InfoBlobChunks.embedding, Vector(dimensions)).cosine_distance(embedding)
+        stmt = self._semantic_search_stmt(
+            distance,
+            sa.func.vector_dims(InfoBlobChunks.embedding)
+            == sa.literal(dimensions, literal_execute=True),
+            source_ids=source_ids,
+            limit=limit,
+        )
+
+        return (await self.session.execute(stmt)).all()
 
     async def semantic_search(
         self,
@@ -66,68 +292,64 @@ class InfoBlobChunkRepo:
         integration_knowledge_ids: Optional[list[UUID]] = [],
         limit: int = 30,
     ) -> list[InfoBlobChunkInDBWithScore]:
-        # Postgres will sometimes think that a sequential scan of the whole table is
-        # preferable to an index scan, when it is not. This is because this particular
-        # table has a lot of data in TOAST tables, which postgres apparently fails
-        # to account for when planning the query.
-        #
-        # The solution below is a crude one, and we should revisit this at some point
-        # in the future. This should also be the first place we look at if something
-        # is slow. Note the "LOCAL", ensuring that we only punish sequential scans for
-        # this particular session. This might make all future queries in this transaction
-        # not be able to run sequential, but we will see if that is an issue.
-        #
-        # Reference: https://github.com/pgvector/pgvector/issues/662
-        # TODO: Solve this issue in a more elegant way.
-
-        await self.session.execute(sa.text("SET LOCAL enable_seqscan = off;"))
+        source_ids = self._get_source_ids(group_ids, website_ids, integration_knowledge_ids)
 
-        stmt = (
-            sa.select(
-                InfoBlobChunks,
-                InfoBlobChunks.embedding.cosine_distance(embedding),
-                InfoBlobs.title,
-            )
-            .join(InfoBlobs)
-            .options(defer(InfoBlobChunks.embedding))
-            .order_by(InfoBlobChunks.embedding.cosine_distance(embedding))
-            .limit(limit)
-        )
+        if self.vector_index is not None and source_ids:
+            chunks = await self._vector_index_search(embedding, source_ids=source_ids, limit=limit)
+            if chunks is not None:
+                return chunks
 
-        stmt = self._filter_on_sources(
-            stmt,
-            group_ids,
-            website_ids,
-            integration_knowledge_ids=integration_knowledge_ids,
-        )
+        exact_search_max_chunks = get_settings().exact_search_max_chunks
 
-        chunks_in_db = await self.session.execute(stmt)
+        if len(embedding) not in EMBEDDING_INDEX_DIMENSIONS or (
+            exact_search_max_chunks
+            and await self._has_at_most_chunks(source_ids, exact_search_max_chunks)
+        ):
+            # Small sources are searched exactly through the source index, which
+            # is both faster and more accurate than the vector index
+            chunks_in_db = await self._exact_search(embedding, source_ids=source_ids, limit=limit)
+        else:
+            chunks_in_db = await self._index_search(embedding, source_ids=source_ids, limit=limit)
 
-        chunks_with_score = [
-            InfoBlobChunkInDBWithScore(
-                **chunk[0].to_dict(exclude="embedding"),
-                score=1 - chunk[1],
-                info_blob_title=chunk[2],
-            )
-            for chunk in chunks_in_db
-        ]
+            # The index scan gives up after max scan tuples, so sources that are a
+            # tiny part of the table can still get fewer results than asked for
+            if len(chunks_in_db) < limit:
+                chunks_in_db = await self._exact_search(
+                    embedding, source_ids=source_ids, limit=limit
+                )
 
-        return chunks_with_score
+        return self._to_chunks_with_score(
+            (chunk, 1 - distance, info_blob_title)
+            for chunk, distance, info_blob_title in chunks_in_db
+        )
 
     async def keyword_search(
         self,
         search_string: str,
         *,
-        group_ids: Optional[list[UUID]] = None,
+        group_ids: Optional[list[UUID]] = [],
+        website_ids: Optional[list[UUID]] = [],
+        integration_knowledge_ids: Optional[list[UUID]] = [],
         limit: int = 30,
-    ):
+    ) -> list[InfoBlobChunkInDBWithScore]:
+        # websearch_to_tsquery requires every term to be present, unless the
+        # search string says otherwise with "or", and never fails on user input
+        query = sa.func.websearch_to_tsquery(sa.cast(TEXT_SEARCH_CONFIG, REGCONFIG), search_string)
+        rank = sa.func.ts_rank_cd(InfoBlobChunks.text_search, query)
+
         stmt = (
-            sa.select(InfoBlobChunks)
-            .filter(InfoBlobChunks.text.match(search_string))
+            sa.select(InfoBlobChunks, rank, InfoBlobs.title)
+            .join(InfoBlobs)
+            .options(defer(InfoBlobChunks.embedding))
+            .where(InfoBlobChunks.text_search.op("@@")(query))
+            .order_by(rank.desc())
             .limit(limit)
         )
 
-        if group_ids is not None:
-            stmt = self._filter_on_sources(stmt, group_ids)
+        stmt = self._filter_on_sources(
+            stmt, self._get_source_ids(group_ids, website_ids, integration_knowledge_ids)
+        )
+
+        chunks_in_db = await self.session.execute(stmt)
 
-        return await self.delegate.get_models_from_query(stmt)
+        return self._to_chunks_with_score(chunks_in_db)
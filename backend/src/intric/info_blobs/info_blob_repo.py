@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID
 
 import sqlalchemy as sa
@@ -11,6 +12,7 @@ from intric.database.tables.info_blobs_table import InfoBlobs
 from intric.database.tables.integration_table import IntegrationKnowledge
 from intric.database.tables.users_table import Users
 from intric.database.tables.websites_table import Websites
+from intric.info_blobs.chunk_vector_index import ChunkVectorIndex, chunk_vector_index
 from intric.info_blobs.info_blob import (
     InfoBlobAdd,
     InfoBlobAddToDB,
@@ -21,7 +23,11 @@ from intric.info_blobs.info_blob import (
 
 
 class InfoBlobRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        vector_index: Optional[ChunkVectorIndex] = chunk_vector_index,
+    ):
         self.delegate = BaseRepositoryDelegate(
             session,
             InfoBlobs,
@@ -34,6 +40,7 @@ class InfoBlobRepository:
             ],
         )
         self.session = session
+        self.vector_index = vector_index
 
     async def _get_group(self, group_id: UUID):
         stmt = sa.select(CollectionsTable).where(CollectionsTable.id == group_id)
@@ -118,23 +125,84 @@ class InfoBlobRepository:
     async def get(self, id: UUID) -> InfoBlobInDB:
         return await self.delegate.get(id)
 
+    async def get_many(
+        self, ids: list[UUID], without_text: bool = False
+    ) -> list[InfoBlobInDB] | list[InfoBlobInDBNoText]:
+        if not ids:
+            return []
+
+        query = sa.select(InfoBlobs).where(InfoBlobs.id.in_(set(ids)))
+
+        if without_text:
+            query = query.options(defer(InfoBlobs.text))
+            records = await self.delegate.get_records_from_query(query)
+            return [InfoBlobInDBNoText.model_validate(record) for record in records]
+
+        return await self.delegate.get_models_from_query(query)
+
     async def get_by_title_and_group(self, title: str, group_id: UUID):
         return await self.delegate.get_by(
             conditions={InfoBlobs.title: title, InfoBlobs.group_id: group_id}
         )
 
+    async def get_by_title_and_source(
+        self,
+        title: str,
+        *,
+        group_id: UUID | None = None,
+        website_id: UUID | None = None,
+    ) -> InfoBlobInDBNoText | None:
+        query = (
+            sa.select(InfoBlobs)
+            .where(InfoBlobs.title == title)
+            .where(InfoBlobs.group_id == group_id)
+            .where(InfoBlobs.website_id == website_id)
+            .order_by(InfoBlobs.created_at)
+            .options(defer(InfoBlobs.text))
+        )
+        record = await self.delegate.get_record_from_query(query)
+
+        if record is None:
+            return
+
+        return InfoBlobInDBNoText.model_validate(record)
+
+    async def delete_other_versions(self, info_blob: InfoBlobInDBNoText):
+        stmt = (
+            sa.delete(InfoBlobs)
+            .where(InfoBlobs.title == info_blob.title)
+            .where(InfoBlobs.group_id == info_blob.group_id)
+            .where(InfoBlobs.website_id == info_blob.website_id)
+            .where(InfoBlobs.id != info_blob.id)
+            .returning(InfoBlobs.group_id, InfoBlobs.website_id, InfoBlobs.integration_knowledge_id)
+        )
+        deleted = (await self.session.execute(stmt)).all()
+
+        await self._invalidate_vector_index(
+            [source_id for source_ids in deleted for source_id in source_ids]
+        )
+
     async def delete_by_title_and_group(self, title: str, group_id: UUID) -> InfoBlobInDB:
-        return await self.delegate.delete_by(
+        info_blob = await self.delegate.delete_by(
             conditions={InfoBlobs.title: title, InfoBlobs.group_id: group_id}
         )
+        if info_blob is not None:
+            await self._invalidate_vector_index([group_id])
+
+        return info_blob
 
     async def delete_by_title_and_website(self, title: str, website_id: UUID) -> InfoBlobInDB:
-        return await self.delegate.delete_by(
+        info_blob = await self.delegate.delete_by(
             conditions={InfoBlobs.title: title, InfoBlobs.website_id: website_id}
         )
+        if info_blob is not None:
+            await self._invalidate_vector_index([website_id])
+
+        return info_blob
 
     async def delete_by_website(self, website_id: UUID):
         await self.delegate.delete_by(conditions={InfoBlobs.website_id: website_id})
+        await self._invalidate_vector_index([website_id])
 
     async def get_by_group(self, group_id: UUID) -> list[InfoBlobInDB]:
         query = (
@@ -150,7 +218,19 @@ class InfoBlobRepository:
         return await self.delegate.filter_by(conditions={InfoBlobs.website_id: website_id})
 
     async def delete(self, id: int) -> InfoBlobInDB:
-        return await self.delegate.delete(id)
+        info_blob = await self.delegate.delete(id)
+
+        if info_blob is not None:
+            await self._invalidate_vector_index(
+                [info_blob.group_id, info_blob.website_id, info_blob.integration_knowledge_id]
+            )
+
+        return info_blob
+
+    async def _invalidate_vector_index(self, source_ids: list[UUID]):
+        # The chunks of deleted info blobs are deleted by cascade, past the chunk repo
+        if self.vector_index is not None and source_ids:
+            await self.vector_index.invalidate_after_commit(self.session, source_ids)
 
     async def get_count_of_group(self, group_id: UUID):
         stmt = (
@@ -199,7 +279,9 @@ class InfoBlobRepository:
 
         return set(ids)
 
-    async def get_titles_of_website(self, website_id: UUID) -> list[str]:
-        stmt = sa.select(InfoBlobs.title).where(InfoBlobs.website_id == website_id)
-        result = await self.session.scalars(stmt)
-        return list(result)
+    async def get_content_hashes_of_website(self, website_id: UUID) -> dict[str, str | None]:
+        stmt = sa.select(InfoBlobs.title, InfoBlobs.content_hash).where(
+            InfoBlobs.website_id == website_id
+        )
+        result = await self.session.execute(stmt)
+        return {title: content_hash for title, content_hash in result}
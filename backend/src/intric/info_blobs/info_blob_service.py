@@ -7,6 +7,7 @@ from intric.groups_legacy.group_service import GroupService
 from intric.info_blobs.info_blob import (
     InfoBlobAdd,
     InfoBlobInDB,
+    InfoBlobInDBNoText,
     InfoBlobMetadataFilter,
     InfoBlobMetadataFilterPublic,
     InfoBlobUpdate,
@@ -124,14 +125,37 @@ class InfoBlobService:
                         f"({info_blob.website_id}) was replaced"
                     )
 
-    async def add_info_blob_without_validation(self, info_blob: InfoBlobAdd):
-        await self._delete_if_same_title(info_blob)
+    async def get_unchanged_info_blob(self, info_blob: InfoBlobAdd) -> Optional[InfoBlobInDBNoText]:
+        if not info_blob.title or info_blob.content_hash is None:
+            return
+
+        existing_info_blob = await self.repo.get_by_title_and_source(
+            info_blob.title,
+            group_id=info_blob.group_id,
+            website_id=info_blob.website_id,
+        )
+
+        if existing_info_blob is None or existing_info_blob.content_hash != info_blob.content_hash:
+            return
+
+        return existing_info_blob
+
+    async def add_info_blob_without_validation(
+        self, info_blob: InfoBlobAdd, replace_existing: bool = True
+    ):
+        if replace_existing:
+            await self._delete_if_same_title(info_blob)
+
         size_of_text = await self.quota_service.add_text(info_blob.text)
         info_blob.size = size_of_text
         info_blob_in_db = await self.repo.add(info_blob)
 
         return info_blob_in_db
 
+    async def delete_replaced_info_blobs(self, info_blob: InfoBlobInDB):
+        if info_blob.title and (info_blob.group_id or info_blob.website_id):
+            await self.repo.delete_other_versions(info_blob)
+
     async def add_info_blob(self, info_blob: InfoBlobAdd):
         info_blob_in_db = await self.add_info_blob_without_validation(info_blob)
 
@@ -1,16 +1,25 @@
+import hashlib
 from pathlib import Path
 from typing import TYPE_CHECKING
 from uuid import UUID
 
 from intric.embedding_models.infrastructure.datastore import Datastore
+from intric.files.extraction_executor import ExtractionExecutor, extraction_executor
 from intric.files.text import TextExtractor
 from intric.info_blobs.info_blob import InfoBlobAdd
 from intric.info_blobs.info_blob_service import InfoBlobService
+from intric.main.logging import get_logger
 from intric.users.user import UserInDB
 
 if TYPE_CHECKING:
     from intric.embedding_models.domain.embedding_model import EmbeddingModel
 
+logger = get_logger(__name__)
+
+
+def get_content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
 
 class TextProcessor:
     def __init__(
@@ -19,11 +28,13 @@ class TextProcessor:
         extractor: TextExtractor,
         datastore: Datastore,
         info_blob_service: InfoBlobService,
+        extraction_executor: ExtractionExecutor = extraction_executor,
     ):
         self.user = user
         self.extractor = extractor
         self.datastore = datastore
         self.info_blob_service = info_blob_service
+        self.extraction_executor = extraction_executor
 
     async def process_file(
         self,
@@ -35,7 +46,7 @@ class TextProcessor:
         group_id: UUID | None = None,
         website_id: UUID | None = None,
     ):
-        text = self.extractor.extract(filepath, mimetype)
+        text = await self.extraction_executor.run(self.extractor.extract, filepath, mimetype)
 
         return await self.process_text(
             text=text,
@@ -54,6 +65,8 @@ class TextProcessor:
         group_id: UUID | None = None,
         website_id: UUID | None = None,
         url: str | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
     ):
         info_blob_add = InfoBlobAdd(
             title=title,
@@ -63,10 +76,25 @@ class TextProcessor:
             url=url,
             website_id=website_id,
             tenant_id=self.user.tenant_id,
+            content_hash=get_content_hash(text),
+            etag=etag,
+            last_modified=last_modified,
         )
 
-        info_blob = await self.info_blob_service.add_info_blob_without_validation(info_blob_add)
+        # If the content has not changed since the last time it was processed,
+        # there is no need to chunk and embed it again
+        unchanged_info_blob = await self.info_blob_service.get_unchanged_info_blob(info_blob_add)
+        if unchanged_info_blob is not None:
+            logger.debug(f"Info blob ({title}) is unchanged, skipping")
+            return unchanged_info_blob
+
+        # Keep the previous version around until the new one is embedded,
+        # so that the embeddings of its unchanged chunks can be reused
+        info_blob = await self.info_blob_service.add_info_blob_without_validation(
+            info_blob_add, replace_existing=False
+        )
         await self.datastore.add(info_blob=info_blob, embedding_model=embedding_model)
+        await self.info_blob_service.delete_replaced_info_blobs(info_blob)
         info_blob_updated = await self.info_blob_service.update_info_blob_size(info_blob.id)
 
         return info_blob_updated
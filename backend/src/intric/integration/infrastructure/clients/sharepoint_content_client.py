@@ -3,6 +3,7 @@ from uuid import UUID
 
 import aiohttp
 
+from intric.files.extraction_executor import extraction_executor
 from intric.integration.infrastructure.content_service.utils import (
     process_sharepoint_response,
 )
@@ -257,7 +258,8 @@ class SharePointContentClient(BaseClient):
                     return await response.text(), content_type
                 else:
                     binary_content = await response.read()
-                    text, detected_content_type = process_sharepoint_response(
+                    text, detected_content_type = await extraction_executor.run(
+                        process_sharepoint_response,
                         response_content=binary_content,
                         content_type=content_type,
                         filename=file_name,
@@ -294,7 +296,8 @@ class SharePointContentClient(BaseClient):
                         return await response.text(), content_type
                     else:
                         binary_content = await response.read()
-                        text, detected_content_type = process_sharepoint_response(
+                        text, detected_content_type = await extraction_executor.run(
+                            process_sharepoint_response,
                             response_content=binary_content,
                             content_type=content_type,
                             filename=file_name,
@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from uuid import UUID
 
+from intric.database.transaction import unit_of_work
 from intric.embedding_models.infrastructure.datastore import Datastore
 from intric.info_blobs.info_blob import InfoBlobAdd
 from intric.integration.domain.entities.oauth_token import SharePointToken
@@ -66,7 +67,9 @@ class SharePointContentService:
         integration_knowledge_id: UUID,
         site_id: str,
     ):
-        token = await self.oauth_token_repo.one(id=token_id)
+        async with unit_of_work(self.session, savepoint=False):
+            token = await self.oauth_token_repo.one(id=token_id)
+
         await self._pull_content(
             token=token,
             integration_knowledge_id=integration_knowledge_id,
@@ -88,9 +91,10 @@ class SharePointContentService:
             integration_knowledge_id: ID of the integration knowledge object
             site_id: The SharePoint site ID to process
         """
-        integration_knowledge = await self.integration_knowledge_repo.one(
-            id=integration_knowledge_id
-        )
+        async with unit_of_work(self.session, savepoint=False):
+            integration_knowledge = await self.integration_knowledge_repo.one(
+                id=integration_knowledge_id
+            )
 
         try:
             async with SharePointContentClient(
@@ -192,14 +196,16 @@ class SharePointContentService:
             integration_knowledge_id=integration_knowledge.id,
         )
 
-        info_blob = await self.info_blob_service.add_info_blob_without_validation(info_blob_add)
-        await self.datastore.add(
-            info_blob=info_blob, embedding_model=integration_knowledge.embedding_model
-        )
+        # Every document is committed on its own when the job runs with short transactions
+        async with unit_of_work(self.session):
+            info_blob = await self.info_blob_service.add_info_blob_without_validation(info_blob_add)
+            await self.datastore.add(
+                info_blob=info_blob, embedding_model=integration_knowledge.embedding_model
+            )
 
-        integration_knowledge_size += info_blob.size
-        integration_knowledge.size = integration_knowledge_size
-        await self.integration_knowledge_repo.update(obj=integration_knowledge)
+            integration_knowledge_size += info_blob.size
+            integration_knowledge.size = integration_knowledge_size
+            await self.integration_knowledge_repo.update(obj=integration_knowledge)
 
     async def _fetch_and_process_content(
         self,
@@ -241,9 +247,10 @@ class SharePointContentService:
         token: "SharePointToken",
         processed_items: set,
     ) -> None:
-        integration_knowledge = await self.integration_knowledge_repo.one(
-            id=integration_knowledge_id
-        )
+        async with unit_of_work(self.session, savepoint=False):
+            integration_knowledge = await self.integration_knowledge_repo.one(
+                id=integration_knowledge_id
+            )
         integration_knowledge_size = integration_knowledge.size
 
         for item in results:
@@ -273,7 +280,7 @@ class SharePointContentService:
             content = await self._get_file_content(token, item)
 
             if content:
-                async with self.session.begin_nested():
+                async with unit_of_work(self.session):
                     info_blob_add = InfoBlobAdd(
                         title=item_name,
                         user_id=self.user.id,
@@ -295,10 +302,12 @@ class SharePointContentService:
                     integration_knowledge_size += info_blob.size
 
         integration_knowledge.size = integration_knowledge_size
-        await self.integration_knowledge_repo.update(obj=integration_knowledge)
+        async with unit_of_work(self.session, savepoint=False):
+            await self.integration_knowledge_repo.update(obj=integration_knowledge)
 
     async def token_refresh_callback(self, token_id: UUID) -> Dict[str, str]:
-        token = await self.oauth_token_service.refresh_and_update_token(token_id=token_id)
+        async with unit_of_work(self.session, savepoint=False):
+            token = await self.oauth_token_service.refresh_and_update_token(token_id=token_id)
         return {
             "access_token": token.access_token,
             "refresh_token": token.refresh_token,
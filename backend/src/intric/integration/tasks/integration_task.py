@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING
 
+from intric.database.transaction import unit_of_work
 from intric.main.models import ChannelType
 from intric.worker.worker import Worker
 
@@ -28,11 +29,14 @@ async def pull_confluence_content(
     )
 
 
-@worker.task(channel_type=ChannelType.PULL_SHAREPOINT_CONTENT)
+@worker.task(channel_type=ChannelType.PULL_SHAREPOINT_CONTENT, short_transactions=True)
 async def pull_sharepoint_content(
     params: "SharepointContentTaskParam", container: "Container", **kw
 ):
-    knowledge = await container.integration_knowledge_repo().one(id=params.integration_knowledge_id)
+    async with unit_of_work(container.session(), savepoint=False):
+        knowledge = await container.integration_knowledge_repo().one(
+            id=params.integration_knowledge_id
+        )
 
     service = container.sharepoint_content_service()
 
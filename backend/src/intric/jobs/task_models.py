@@ -26,6 +26,8 @@ class UploadTask(InfoBlobTask):
     filepath: str
     filename: str
     mimetype: str
+    # sha256 of the file, computed when it was uploaded
+    checksum: Optional[str] = None
 
 
 class UploadInfoBlob(UploadTask):
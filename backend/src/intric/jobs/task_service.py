@@ -1,9 +1,8 @@
-import asyncio
 from tempfile import SpooledTemporaryFile
 from uuid import UUID
 
 from intric.files.audio import AudioMimeTypes
-from intric.files.file_size_service import FileSizeService
+from intric.files.file_size_service import GENERIC_MIMETYPES, FileSizeService
 from intric.files.text import TextMimeTypes
 from intric.jobs.job_models import JobInDb, Task
 from intric.jobs.job_service import JobService
@@ -45,12 +44,6 @@ class TaskService:
             case _:
                 return 0
 
-    async def validate_file_size(self, file: SpooledTemporaryFile, task: Task):
-        max_size = self.get_max_size(task)
-
-        if await asyncio.to_thread(self.file_size_service.is_too_large, file, max_size):
-            raise FileTooLargeException("File too large.")
-
     async def queue_upload_file(
         self,
         group_id: UUID,
@@ -59,30 +52,38 @@ class TaskService:
         mimetype: str,
         filename: str,
     ):
-        task_type = self.get_task_type(mimetype)
+        # A generic mimetype is sniffed from the content, which is only known once ingested
+        if mimetype in GENERIC_MIMETYPES:
+            max_size = max(
+                self.get_max_size(Task.UPLOAD_FILE), self.get_max_size(Task.TRANSCRIPTION)
+            )
+        else:
+            max_size = self.get_max_size(self.get_task_type(mimetype))
 
-        await self.validate_file_size(file, task_type)
+        ingested = await self.file_size_service.ingest(file, max_size=max_size, mimetype=mimetype)
 
-        filepath = await self.file_size_service.save_file_to_disk(file)
+        try:
+            task_type = self.get_task_type(ingested.mimetype)
+            if ingested.size > self.get_max_size(task_type):
+                raise FileTooLargeException("File too large.")
+        except BaseException:
+            ingested.filepath.unlink(missing_ok=True)
+            raise
 
         if task_type == Task.UPLOAD_FILE:
-            params = UploadInfoBlob(
-                filepath=filepath,
-                filename=filename,
-                user_id=self.user.id,
-                group_id=group_id,
-                space_id=space_id,
-                mimetype=mimetype,
-            )
+            task_params_type = UploadInfoBlob
         elif task_type == Task.TRANSCRIPTION:
-            params = Transcription(
-                filepath=filepath,
-                filename=filename,
-                user_id=self.user.id,
-                group_id=group_id,
-                space_id=space_id,
-                mimetype=mimetype,
-            )
+            task_params_type = Transcription
+
+        params = task_params_type(
+            filepath=str(ingested.filepath),
+            filename=filename,
+            user_id=self.user.id,
+            group_id=group_id,
+            space_id=space_id,
+            mimetype=ingested.mimetype,
+            checksum=ingested.checksum,
+        )
 
         # Set name of the job to the filename being processed
         job = await self.job_service.queue_job(task_type, name=filename, task_params=params)
@@ -1,7 +1,7 @@
 import json
 import logging
 import os
-from typing import Optional
+from typing import Literal, Optional
 
 from intric.definitions import ROOT_DIR
 from pydantic import computed_field
@@ -76,6 +76,8 @@ class Settings(BaseSettings):
     using_access_management: bool = True
     using_iam: bool = False
     using_image_generation: bool = False
+    using_hybrid_search: bool = False
+    using_chunk_vector_index: bool = False
 
     # Security
     api_prefix: str
@@ -93,6 +95,61 @@ class Settings(BaseSettings):
     testing: bool = False
     dev: bool = False
 
+    # Embeddings
+    embedding_max_concurrent_requests: int = 4
+    embedding_tokens_per_minute: Optional[int] = None
+    # Per model overrides, keyed on the model name
+    embedding_model_concurrency: dict[str, int] = {}
+    embedding_model_tokens_per_minute: dict[str, int] = {}
+    query_embedding_cache_size: int = 1024
+    query_embedding_cache_ttl: int = 60 * 60  # 1 hour
+    using_redis_query_embedding_cache: bool = False
+    # Candidates considered by the HNSW index, higher gives better recall but slower search
+    hnsw_ef_search: int = 100
+    # Keep scanning the HNSW index until enough chunks pass the source filter (pgvector 0.8+)
+    hnsw_iterative_scan: bool = True
+    hnsw_max_scan_tuples: int = 20000
+    # Sources with at most this many chunks are searched exactly instead of with the index
+    exact_search_max_chunks: int = 10000
+    # In process vector index of hot sources, see using_chunk_vector_index
+    chunk_vector_index_max_chunks: int = 300_000  # per source
+    chunk_vector_index_max_bytes: int = 2 * 1024**3
+    chunk_vector_index_ttl: int = 5 * 60
+    # float16 halves the memory, but is searched several times slower than float32
+    chunk_vector_index_dtype: Literal["float32", "float16"] = "float32"
+
+    # Text extraction
+    # Documents are extracted in separate processes, killed when over the limits
+    extraction_max_workers: int = 4
+    extraction_timeout: int = 5 * 60
+    extraction_memory_limit: Optional[int] = 2 * 1024**3
+
+    # Transcription
+    # Audio is split in segments that are transcribed concurrently
+    transcription_segment_seconds: int = 5 * 60
+    transcription_max_concurrency: int = 4
+    # Cut segments at the quietest point of the last seconds before the limit, 0 to disable
+    transcription_silence_window_seconds: int = 10
+    # Days a transcription is reused for the same audio within a tenant, None disables it.
+    # Shortened to the data retention of the app the audio was transcribed for.
+    transcription_cache_days: Optional[int] = 30
+
+    # File blobs
+    # Where the content of images and audio is kept, "database" keeps it in the files table
+    blob_store: Literal["database", "local", "s3"] = "database"
+    blob_store_path: str = "/data/blobs"
+    blob_store_s3_endpoint_url: Optional[str] = None
+    blob_store_s3_bucket: Optional[str] = None
+    blob_store_s3_region: str = "us-east-1"
+    blob_store_s3_access_key_id: Optional[str] = None
+    blob_store_s3_secret_access_key: Optional[str] = None
+    # Base64 encoded images sent to the models, keyed by checksum
+    encoded_image_cache_max_bytes: int = 256 * 1024**2
+
+    # Sessions
+    # Newest questions of a session loaded as history when asking
+    session_history_max_questions: int = 50
+
     # Crawl
     crawl_max_length: int = 60 * 60 * 4  # 4 hour crawls max
     closespider_itemcount: int = 20000
@@ -60,6 +60,7 @@ from intric.files.file_size_service import FileSizeService
 from intric.files.image import ImageExtractor
 from intric.files.text import TextExtractor
 from intric.files.transcriber import Transcriber
+from intric.files.transcription_cache_repo import TranscriptionCacheRepository
 from intric.group_chat.application.group_chat_service import GroupChatService
 from intric.group_chat.presentation.assemblers.group_chat_assembler import (
     GroupChatAssembler,
@@ -381,6 +382,7 @@ class Container(containers.DeclarativeContainer):
     session_repo = providers.Factory(SessionRepository, session=session)
     question_repo = providers.Factory(QuestionRepository, session=session)
     file_repo = providers.Factory(FileRepository, session=session)
+    transcription_cache_repo = providers.Factory(TranscriptionCacheRepository, session=session)
     crawl_run_repo = providers.Factory(CrawlRunRepository, session=session)
 
     storage_repo = providers.Factory(
@@ -430,10 +432,13 @@ class Container(containers.DeclarativeContainer):
     completion_service = providers.Factory(
         CompletionService,
         context_builder=context_builder,
+        file_repo=file_repo,
     )
 
     # Datastore
-    create_embeddings_service = providers.Factory(CreateEmbeddingsService)
+    create_embeddings_service = providers.Factory(
+        CreateEmbeddingsService, info_blob_chunk_repo=info_blob_chunk_repo
+    )
     datastore = providers.Factory(
         Datastore,
         user=user,
@@ -848,6 +853,8 @@ class Container(containers.DeclarativeContainer):
     transcriber = providers.Factory(
         Transcriber,
         file_repo=file_repo,
+        user=user,
+        transcription_cache_repo=transcription_cache_repo,
     )
     crawler = providers.Factory(Crawler)
 
@@ -28,6 +28,7 @@ class ErrorCodes(int, Enum):
     INTERNAL_HTTP_ERROR = 9023
     INTERNAL_SERVER_ERROR = 9024
     TENANT_SUSPENDED = 9025
+    EXTRACTION_FAILED = 9026
 
 
 class NotFoundException(Exception):
@@ -98,6 +99,10 @@ class ChunkEmbeddingMisMatchException(Exception):
     pass
 
 
+class ExtractionFailedException(Exception):
+    pass
+
+
 class CrawlerException(Exception):
     pass
 
@@ -166,6 +171,7 @@ EXCEPTION_MAP = {
     PydanticParseError: (500, None, ErrorCodes.PYDANTIC_PARSE_ERROR),
     FileNotSupportedException: (415, None, ErrorCodes.FILE_NOT_SUPPORTED),
     FileTooLargeException: (413, None, ErrorCodes.FILE_TOO_LARGE),
+    ExtractionFailedException: (422, None, ErrorCodes.EXTRACTION_FAILED),
     ChunkEmbeddingMisMatchException: (
         500,
         "Something went wrong.",
@@ -20,6 +20,7 @@ from intric.database.tables.web_search_results_table import (
     WebSearchResult as WebSearchResultsTable,
 )
 from intric.files.file_models import File
+from intric.files.file_repo import defer_payload
 from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
 from intric.questions.question import Question, QuestionAdd
 
@@ -46,7 +47,9 @@ class QuestionRepository:
             selectinload(Questions.logging_details),
             selectinload(Questions.assistant),
             selectinload(Questions.session),
-            selectinload(Questions.questions_files).selectinload(QuestionsFiles.file),
+            selectinload(Questions.questions_files)
+            .selectinload(QuestionsFiles.file)
+            .options(*defer_payload()),
             selectinload(Questions.info_blob_references)
             .selectinload(InfoBlobReferences.info_blob)
             .selectinload(InfoBlobs.website),
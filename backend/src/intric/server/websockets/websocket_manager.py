@@ -20,28 +20,53 @@ from intric.users.user import UserInDB
 from intric.worker.redis import r
 
 
+# Messages queued for a websocket, beyond which the oldest are dropped
+SEND_QUEUE_SIZE = 100
+
+# Seconds to wait before subscribing again when the subscription to Redis fails
+RECONNECT_DELAY = 1
+
+# Every channel a websocket can subscribe to, formatted like Channel.channel_string
+CHANNEL_PATTERNS = [f"{channel_type}:*" for channel_type in ChannelType]
+
+
 @dataclass
-class SubscribedChannels:
-    websockets: set[WebSocket]
-    redis_task: asyncio.Task
+class Sender:
+    """Sends the messages to one websocket, in order, from a queue of its own."""
+
+    queue: asyncio.Queue
+    task: asyncio.Task
 
 
 logger = get_logger(__name__)
 
 
 class WebSocketManager:
+    """Fans out the messages published to Redis to the subscribed websockets.
+
+    Every process keeps one pattern subscription to all channels, and
+    dispatches the messages to the websockets subscribed to their channel in
+    this process. Messages are queued for every websocket and sent by a task of
+    its own, so that a slow client does not hold up the others.
+    """
+
     def __init__(
         self,
         redis: aioredis.Redis,
-        channels: dict[str, SubscribedChannels] = None,
+        channels: dict[str, set[WebSocket]] = None,
     ):
         self.redis = redis
         self.channels = channels or {}
-        self.task_monitoring = None
+        self.senders: dict[WebSocket, Sender] = {}
+        self.listener: asyncio.Task | None = None
 
     @property
     def tasks(self):
-        return [self.channels[channel].redis_task for channel in self.channels]
+        tasks = [sender.task for sender in self.senders.values()]
+        if self.listener is not None:
+            tasks.append(self.listener)
+
+        return tasks
 
     def _check_exceptions(self, task: asyncio.Task):
         try:
@@ -51,23 +76,39 @@ class WebSocketManager:
         except Exception:
             logger.exception(traceback.format_exc())
 
-    def _remove_websocket_if_exists(self, websocket, channel):
-        try:
-            self.channels[channel].websockets.remove(websocket)
-        except KeyError:
-            logger.debug(f"WebSocket not found in channel {channel}")
-
-    async def _listen_to_redis(self, channel: str):
-        async with self.redis.pubsub() as pubsub:
-            await pubsub.subscribe(channel)
-            logger.debug('Subscribed to Redis channel: %s', channel)
+    def _start_listener(self):
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.create_task(self._listen_to_redis())
+            self.listener.add_done_callback(self._check_exceptions)
+
+    async def _listen_to_redis(self):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.psubscribe(*CHANNEL_PATTERNS)
+                    logger.debug("Subscribed to Redis channels: %s", CHANNEL_PATTERNS)
+
+                    while True:
+                        raw_message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=None
+                        )
+                        if raw_message is not None:
+                            await self._dispatch(raw_message)
+            except Exception:
+                # The listener is shared by every websocket of the process, it must not end
+                logger.exception("Lost the subscription to Redis, subscribing again")
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _dispatch(self, raw_message: dict):
+        channel = raw_message["channel"].decode()
+        if channel not in self.channels:
+            # Nobody is subscribed to the channel in this process
+            return
 
-            while True:
-                raw_message = await pubsub.get_message(
-                    ignore_subscribe_messages=True, timeout=None
-                )
-                if raw_message is not None:
-                    await self._process_redis_message(channel, raw_message)
+        try:
+            await self._process_redis_message(channel, raw_message)
+        except Exception:
+            logger.exception(f"Could not process message on channel {channel}")
 
     async def _process_redis_message(self, channel: str, raw_message: dict):
         message = RedisMessage.model_validate_json(raw_message["data"].decode())
@@ -103,6 +144,27 @@ class WebSocketManager:
             message.model_dump_json(serialize_as_any=True, exclude_none=True)
         )
 
+    async def _send_from_queue(self, websocket: WebSocket, queue: asyncio.Queue):
+        while True:
+            message = await queue.get()
+
+            try:
+                await self._send_message(websocket, message)
+            except Exception:
+                logger.debug("Could not send message to websocket", exc_info=True)
+
+    def _enqueue(self, websocket: WebSocket, message: WsOutgoingWebSocketMessage):
+        sender = self.senders.get(websocket)
+        if sender is None:
+            return
+
+        if sender.queue.full():
+            # Updates supersede each other, so the oldest is the one to lose
+            sender.queue.get_nowait()
+            logger.warning("Send queue of websocket is full, dropped a message")
+
+        sender.queue.put_nowait(message)
+
     async def pong(self, websocket: WebSocket):
         message = WsOutgoingWebSocketMessage(type=OutGoingMessageType.PONG)
         await self._send_message(websocket, message)
@@ -131,50 +193,60 @@ class WebSocketManager:
     def subscribe(self, websocket: WebSocket, channel_type: ChannelType, user_id: UUID):
         channel = Channel(type=channel_type, user_id=user_id).channel_string
 
-        if channel not in self.channels:
-            redis_task = asyncio.create_task(self._listen_to_redis(channel))
-            redis_task.add_done_callback(self._check_exceptions)
-            self.channels[channel] = SubscribedChannels(
-                websockets=set(), redis_task=redis_task
-            )
+        self._start_listener()
 
-        self.channels[channel].websockets.add(websocket)
+        if websocket not in self.senders:
+            queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+            task = asyncio.create_task(self._send_from_queue(websocket, queue))
+            task.add_done_callback(self._check_exceptions)
+            self.senders[websocket] = Sender(queue=queue, task=task)
+
+        self.channels.setdefault(channel, set()).add(websocket)
+
+    def _remove_websocket(self, websocket: WebSocket, channel: str):
+        websockets = self.channels.get(channel)
+        if websockets is None or websocket not in websockets:
+            logger.debug(f"WebSocket not found in channel {channel}")
+            return
+
+        websockets.remove(websocket)
+        if not websockets:
+            del self.channels[channel]
+
+    def _stop_sender_if_unused(self, websocket: WebSocket):
+        if any(websocket in websockets for websockets in self.channels.values()):
+            return
+
+        sender = self.senders.pop(websocket, None)
+        if sender is not None:
+            sender.task.cancel()
 
     def unsubscribe(self, websocket: WebSocket, channel_type: Channel, user_id: UUID):
         channel = Channel(type=channel_type, user_id=user_id).channel_string
 
-        if channel in self.channels:
-            self._remove_websocket_if_exists(websocket, channel)
-
-            if not self.channels[channel].websockets:
-                # No one is listening, cancel the task
-                self.channels[channel].redis_task.cancel()
-                del self.channels[channel]
+        self._remove_websocket(websocket, channel)
+        self._stop_sender_if_unused(websocket)
 
     def unsubscribe_from_all_channels(self, websocket: WebSocket):
-        channels_to_delete = []
-        for channel in self.channels:
-            self._remove_websocket_if_exists(websocket, channel)
+        for channel in list(self.channels):
+            if websocket in self.channels[channel]:
+                self._remove_websocket(websocket, channel)
 
-            if not self.channels[channel].websockets:
-                channels_to_delete.append(channel)
-
-        for channel in channels_to_delete:
-            self.channels[channel].redis_task.cancel()
-            del self.channels[channel]
+        self._stop_sender_if_unused(websocket)
 
     async def publish(self, channel: str, message: WsOutgoingWebSocketMessage):
-        subscribed_channels = self.channels.get(channel, None)
-
-        if subscribed_channels is not None:
-            for ws in subscribed_channels.websockets:
-                await self._send_message(ws, message)
+        for websocket in self.channels.get(channel, ()):
+            self._enqueue(websocket, message)
 
     async def shutdown(self):
-        for task in self.tasks:
+        tasks = self.tasks
+        for task in tasks:
             task.cancel()
 
-        await asyncio.gather(*self.tasks)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.senders.clear()
+        self.listener = None
 
 
 websocket_manager = WebSocketManager(redis=r)
@@ -2,7 +2,7 @@ import pydantic
 
 from intric.assistants.references import ReferencesService
 from intric.completion_models.infrastructure.completion_service import CompletionService
-from intric.completion_models.infrastructure.context_builder import count_tokens
+from intric.completion_models.infrastructure.token_counter import count_tokens
 from intric.files.file_service import FileService
 from intric.main.exceptions import PydanticParseError
 from intric.main.logging import get_logger
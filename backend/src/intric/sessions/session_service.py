@@ -74,6 +74,23 @@ class SessionService:
 
         return session
 
+    async def get_session_with_recent_history(
+        self,
+        id: UUID,
+        max_questions: int,
+        assistant_id: UUID = None,
+        group_chat_id: UUID = None,
+    ):
+        session = await self.session_repo.get_with_recent_history(
+            id=id, max_questions=max_questions
+        )
+
+        self._check_exists_and_belongs_to_user(
+            session, assistant_id=assistant_id, group_chat_id=group_chat_id
+        )
+
+        return session
+
     async def get_sessions_by_assistant(
         self,
         assistant_id: UUID,
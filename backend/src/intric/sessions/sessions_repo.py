@@ -3,7 +3,7 @@ from typing import Optional
 from uuid import UUID
 
 import sqlalchemy as sa
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, selectinload
 
 from intric.database.database import AsyncSession
 from intric.database.repositories.base import BaseRepositoryDelegate
@@ -16,6 +16,8 @@ from intric.database.tables.questions_table import (
 )
 from intric.database.tables.sessions_table import Sessions
 from intric.database.tables.users_table import Users
+from intric.files.file_repo import defer_payload
+from intric.questions.question import Question
 from intric.sessions.session import (
     SessionAdd,
     SessionFeedback,
@@ -45,14 +47,33 @@ class SessionRepository:
             selectinload(Sessions.questions).selectinload(Questions.logging_details),
             selectinload(Sessions.questions).selectinload(Questions.assistant),
             selectinload(Sessions.questions).selectinload(Questions.completion_model),
+            # The text is kept, sessions loaded like this are used as history
             selectinload(Sessions.questions)
             .selectinload(Questions.questions_files)
-            .selectinload(QuestionsFiles.file),
-            selectinload(Sessions.questions).selectinload(Questions.questions_files),
+            .selectinload(QuestionsFiles.file)
+            .options(*defer_payload(include_text=True)),
             selectinload(Sessions.questions).selectinload(Questions.web_search_results),
             selectinload(Sessions.assistant).selectinload(Assistants.user),
         ]
 
+    @staticmethod
+    def _history_options():
+        """Only what is needed to build the conversation history of a question.
+
+        The text of files counts towards the tokens of the history, the blobs of
+        images are only loaded for the questions that fit in the context.
+        """
+        return [
+            selectinload(Questions.questions_files)
+            .selectinload(QuestionsFiles.file)
+            .options(*defer_payload(include_text=True)),
+            selectinload(Questions.assistant),
+            selectinload(Questions.completion_model),
+            noload(Questions.info_blob_references),
+            noload(Questions.logging_details),
+            noload(Questions.web_search_results),
+        ]
+
     def _add_options(self, stmt: sa.Select | sa.Insert | sa.Update):
         for option in self._options():
             stmt = stmt.options(option)
@@ -87,6 +108,50 @@ class SessionRepository:
 
         return await self.delegate.filter_by(conditions={Sessions.user_id: user_id})
 
+    async def get_with_recent_history(self, id: UUID, max_questions: int) -> Optional[SessionInDB]:
+        """Gets a session with only its newest `max_questions` questions.
+
+        The stored token counts of a question include the whole prompt it was
+        asked with, knowledge and history included, so the history is not cut
+        on them here. The context builder fits the questions in the context.
+        References, logging details and web search results of the questions
+        are not loaded.
+        """
+        stmt = (
+            sa.select(Sessions)
+            .where(Sessions.id == id)
+            .options(
+                noload(Sessions.questions),
+                selectinload(Sessions.assistant).selectinload(Assistants.user),
+            )
+        )
+        session = await self.session.scalar(stmt)
+
+        if session is None:
+            return None
+
+        recent_questions = (
+            sa.select(Questions.id)
+            .where(Questions.session_id == id)
+            .order_by(Questions.created_at.desc(), Questions.id.desc())
+            .limit(max_questions)
+            .subquery()
+        )
+
+        stmt = (
+            sa.select(Questions)
+            .join(recent_questions, recent_questions.c.id == Questions.id)
+            .order_by(Questions.created_at, Questions.id)
+            .options(*self._history_options())
+        )
+
+        questions = (await self.session.scalars(stmt)).all()
+
+        session_in_db = SessionInDB.model_validate(session)
+        session_in_db.questions = [Question.model_validate(question) for question in questions]
+
+        return session_in_db
+
     async def _get_total_count(
         self,
         assistant_id: UUID = None,
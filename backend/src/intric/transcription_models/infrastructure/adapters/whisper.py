@@ -1,5 +1,6 @@
 # MIT License
 
+import asyncio
 from pathlib import Path
 
 import openai
@@ -11,8 +12,8 @@ from tenacity import (
     wait_random_exponential,
 )
 
-from intric.files.audio import AudioFile
-from intric.main.config import SETTINGS
+from intric.files.audio import AudioFile, AudioSegment
+from intric.main.config import SETTINGS, get_settings
 from intric.main.exceptions import BadRequestException, OpenAIException
 from intric.main.logging import get_logger
 from intric.transcription_models.domain import TranscriptionModel
@@ -25,35 +26,50 @@ class OpenAISTTModelAdapter:
         self.model = model
         self.client = AsyncOpenAI(api_key=SETTINGS.openai_api_key, base_url=model.base_url)
 
-    async def get_text_from_file(self, audio_file: AudioFile):
-        text = ""
-        five_minutes = 60 * 5
-        chunk_index = 0
-        total_duration_seconds = int(audio_file.info.duration)
+    @staticmethod
+    def _format_time(seconds: float) -> str:
+        seconds = int(seconds)
+        return f"{seconds // 60}:{seconds % 60:02d}"
 
-        async with audio_file.asplit_file(seconds=five_minutes) as files:
-            total_chunks = len(files)
+    async def _get_text_from_segment(
+        self, segment: AudioSegment, semaphore: asyncio.Semaphore
+    ) -> str:
+        async with semaphore:
+            return await self._get_text_from_file(segment.path)
 
-            for i, path in enumerate(files):
-                block_text = await self._get_text_from_file(path)
-                start_time = chunk_index * five_minutes
+    async def get_text_from_file(self, audio_file: AudioFile):
+        settings = get_settings()
 
-                # For the last chunk, calculate the correct end time based on total duration
-                if i == total_chunks - 1:
-                    end_time = total_duration_seconds
-                else:
-                    end_time = (chunk_index + 1) * five_minutes
+        async with audio_file.asplit_file(
+            seconds=settings.transcription_segment_seconds,
+            silence_window_seconds=settings.transcription_silence_window_seconds,
+        ) as segments:
+            semaphore = asyncio.Semaphore(settings.transcription_max_concurrency)
+            transcribed_segments = []
+            tasks = []
 
-                start_time_formatted = f"{start_time // 60}:{start_time % 60:02d}"
-                end_time_formatted = f"{end_time // 60}:{end_time % 60:02d}"
+            try:
+                # Segments are transcribed while the rest of the file is being split
+                async for segment in segments:
+                    transcribed_segments.append(segment)
+                    tasks.append(
+                        asyncio.create_task(self._get_text_from_segment(segment, semaphore))
+                    )
 
-                # Add markdown formatting with timestamp
-                if chunk_index > 0:
-                    text += "\n\n"
-                text += f"### {start_time_formatted} - {end_time_formatted}\n\n{block_text}"
-                chunk_index += 1
+                texts = [await task for task in tasks]
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                # The segments are deleted when the split file is closed
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
 
-        return text
+        # Markdown with a timestamp per segment, in the order of the segments
+        return "\n\n".join(
+            f"### {self._format_time(segment.start_seconds)} - "
+            f"{self._format_time(segment.end_seconds)}\n\n{text}"
+            for segment, text in zip(transcribed_segments, texts)
+        )
 
     @retry(
         wait=wait_random_exponential(min=1, max=20),
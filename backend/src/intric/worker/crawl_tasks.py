@@ -2,6 +2,8 @@ from uuid import UUID
 
 from dependency_injector import providers
 
+from intric.database.transaction import unit_of_work
+from intric.info_blobs.text_processor import get_content_hash
 from intric.main.container.container import Container
 from intric.main.logging import get_logger
 from intric.websites.crawl_dependencies.crawl_models import (
@@ -46,7 +48,15 @@ async def crawl_task(*, job_id: UUID, params: CrawlTask, container: Container):
         info_blob_repo = container.info_blob_repo()
         update_website_size_service = container.update_website_size_service()
         website_service = container.website_crud_service()
-        website = await website_service.get_website(params.website_id)
+
+        # Every page and file is committed on its own, see `Worker.function`
+        session = container.session()
+
+        async with unit_of_work(session, savepoint=False):
+            website = await website_service.get_website(params.website_id)
+            existing_content_hashes = await info_blob_repo.get_content_hashes_of_website(
+                params.website_id
+            )
 
         # Do task
         logger.info(f"Running crawl with params: {params}")
@@ -55,13 +65,11 @@ async def crawl_task(*, job_id: UUID, params: CrawlTask, container: Container):
         num_failed_pages = 0
         num_failed_files = 0
         num_deleted_blobs = 0
+        num_unchanged_pages = 0
 
-        # Unfortunately, in this type of background task we still need to care about the session atm
-        session = container.session()
-
-        existing_titles = await info_blob_repo.get_titles_of_website(params.website_id)
+        existing_titles = list(existing_content_hashes)
 
-        crawled_titles = []
+        crawled_titles = set()
 
         async with crawler.crawl(
             url=params.url,
@@ -72,15 +80,24 @@ async def crawl_task(*, job_id: UUID, params: CrawlTask, container: Container):
                 num_pages += 1
                 try:
                     title = page.url
-                    async with session.begin_nested():
+
+                    # Skip pages that are byte-identical to the last crawl
+                    if existing_content_hashes.get(title) == get_content_hash(page.content):
+                        num_unchanged_pages += 1
+                        crawled_titles.add(title)
+                        continue
+
+                    async with unit_of_work(session):
                         await uploader.process_text(
                             text=page.content,
                             title=title,
                             website_id=params.website_id,
                             url=page.url,
                             embedding_model=website.embedding_model,
+                            etag=page.etag,
+                            last_modified=page.last_modified,
                         )
-                    crawled_titles.append(title)
+                    crawled_titles.add(title)
 
                 except Exception:
                     logger.exception("Exception while uploading page")
@@ -90,7 +107,7 @@ async def crawl_task(*, job_id: UUID, params: CrawlTask, container: Container):
                 num_files += 1
                 try:
                     filename = file.stem
-                    async with session.begin_nested():
+                    async with unit_of_work(session):
                         await uploader.process_file(
                             filepath=file,
                             filename=filename,
@@ -98,34 +115,37 @@ async def crawl_task(*, job_id: UUID, params: CrawlTask, container: Container):
                             embedding_model=website.embedding_model,
                         )
 
-                    crawled_titles.append(filename)
+                    crawled_titles.add(filename)
                 except Exception:
                     logger.exception("Exception while uploading file")
                     num_failed_files += 1
 
-            for title in existing_titles:
-                if title not in crawled_titles:
-                    num_deleted_blobs += 1
-                    await info_blob_repo.delete_by_title_and_website(
-                        title=title, website_id=params.website_id
-                    )
+            async with unit_of_work(session, savepoint=False):
+                for title in existing_titles:
+                    if title not in crawled_titles:
+                        num_deleted_blobs += 1
+                        await info_blob_repo.delete_by_title_and_website(
+                            title=title, website_id=params.website_id
+                        )
 
-            await update_website_size_service.update_website_size(website_id=website.id)
+                await update_website_size_service.update_website_size(website_id=website.id)
 
             logger.info(
-                f"Crawler finished. {num_pages} pages, {num_failed_pages} failed. "
+                f"Crawler finished. {num_pages} pages, {num_failed_pages} failed, "
+                f"{num_unchanged_pages} unchanged. "
                 f"{num_files} files, {num_failed_files} failed. "
                 f"{num_deleted_blobs} blobs deleted."
             )
 
-            crawl_run = await crawl_run_repo.one(params.run_id)
-            crawl_run.update(
-                pages_crawled=num_pages,
-                files_downloaded=num_files,
-                pages_failed=num_failed_pages,
-                files_failed=num_failed_files,
-            )
-            await crawl_run_repo.update(crawl_run)
+            async with unit_of_work(session, savepoint=False):
+                crawl_run = await crawl_run_repo.one(params.run_id)
+                crawl_run.update(
+                    pages_crawled=num_pages,
+                    files_downloaded=num_files,
+                    pages_failed=num_failed_pages,
+                    files_failed=num_failed_files,
+                )
+                await crawl_run_repo.update(crawl_run)
 
         task_manager.result_location = f"/api/v1/websites/{params.website_id}/info-blobs/"
 
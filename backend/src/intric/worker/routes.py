@@ -13,12 +13,12 @@ async def upload_info_blob(job_id: str, params: UploadInfoBlob, container: Conta
     return await upload_info_blob_task(job_id=job_id, params=params, container=container)
 
 
-@worker.function()
+@worker.function(short_transactions=True)
 async def transcription(job_id: str, params: Transcription, container: Container):
     return await transcription_task(job_id=job_id, params=params, container=container)
 
 
-@worker.function()
+@worker.function(short_transactions=True)
 async def crawl(job_id: str, params: CrawlTask, container: Container):
     return await crawl_task(job_id=job_id, params=params, container=container)
 
@@ -5,6 +5,7 @@ from typing import Callable
 from uuid import UUID
 
 from intric.database.database import AsyncSession
+from intric.database.transaction import unit_of_work
 from intric.jobs.job_service import JobService
 from intric.main.logging import get_logger
 from intric.main.models import Channel, ChannelType, RedisMessage, Status
@@ -99,12 +100,16 @@ class TaskManager:
     async def set_status(self, status: Status):
         self._log_status(status)
         await self._publish_status(status=status)
-        await self.job_service.set_status(self.job_id, status)
+        # Committed right away when the job runs with short transactions
+        async with unit_of_work(self.session, savepoint=False):
+            await self.job_service.set_status(self.job_id, status)
 
     async def complete_job(self):
         await self._publish_status(status=Status.COMPLETE)
-        await self.job_service.complete_job(self.job_id, self.result_location)
+        async with unit_of_work(self.session, savepoint=False):
+            await self.job_service.complete_job(self.job_id, self.result_location)
 
     async def fail_job(self):
         await self._publish_status(status=Status.FAILED)
-        await self.job_service.fail_job(self.job_id)
+        async with unit_of_work(self.session, savepoint=False):
+            await self.job_service.fail_job(self.job_id)
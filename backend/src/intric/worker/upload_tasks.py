@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 from uuid import UUID
 
+from intric.database.transaction import unit_of_work
 from intric.jobs.task_models import Transcription, UploadInfoBlob
 from intric.main.container.container import Container
 from intric.main.exceptions import BadRequestException
@@ -26,32 +27,39 @@ async def transcription_task(
         # Define cleanup function
         task_manager.cleanup_func = lambda: _remove_file(filepath)
 
-        # Get the space
-        space_service = container.space_service()
-        space = await space_service.get_space(params.space_id)
+        # The transcription runs outside of any transaction, see `Worker.function`
+        session = container.session()
 
-        # Get the transcription model from the space
-        transcription_model = space.get_default_transcription_model()
+        async with unit_of_work(session, savepoint=False):
+            # Get the space
+            space_service = container.space_service()
+            space = await space_service.get_space(params.space_id)
 
-        # If the space doesn't have any transcription models, fail the job
-        if transcription_model is None:
-            raise BadRequestException("No transcription model enabled in the space.")
+            # Get the transcription model from the space
+            transcription_model = space.get_default_transcription_model()
+
+            # If the space doesn't have any transcription models, fail the job
+            if transcription_model is None:
+                raise BadRequestException("No transcription model enabled in the space.")
+
+            group_service = container.group_service()
+            group = await group_service.get_group(params.group_id)
 
         transcriber = container.transcriber()
         uploader = container.text_processor()
-        group_service = container.group_service()
-        group = await group_service.get_group(params.group_id)
 
         text = await transcriber.transcribe_from_filepath(
-            filepath=filepath, transcription_model=transcription_model
-        )
-        info_blob = await uploader.process_text(
-            text=text,
-            embedding_model=group.embedding_model,
-            title=params.filename,
-            group_id=params.group_id,
+            filepath=filepath, transcription_model=transcription_model, checksum=params.checksum
         )
 
+        async with unit_of_work(session, savepoint=False):
+            info_blob = await uploader.process_text(
+                text=text,
+                embedding_model=group.embedding_model,
+                title=params.filename,
+                group_id=params.group_id,
+            )
+
         task_manager.result_location = f"/api/v1/info-blobs/{info_blob.id}/"
 
     return task_manager.successful()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import contextlib
 import inspect
 from functools import wraps
 from typing import Callable
@@ -11,6 +12,7 @@ from arq.cron import cron
 from dependency_injector import providers
 
 from intric.database.database import AsyncSession, sessionmanager
+from intric.database.transaction import unit_of_work
 from intric.jobs.task_models import ResourceTaskParams
 from intric.main.config import get_settings
 from intric.main.container.container import Container
@@ -51,10 +53,10 @@ class Worker:
         shutdown(ctx):
             Shuts down the worker and performs cleanup.
 
-        function(with_user: bool = True):
+        function(with_user: bool = True, short_transactions: bool = False):
             Decorator to register a function with optional user context.
 
-        task(with_user: bool = True):
+        task(with_user: bool = True, short_transactions: bool = False):
             Decorator to register a task with optional user context.
 
         cron_job(**decorator_kwargs):
@@ -62,6 +64,11 @@ class Worker:
 
         include_subworker(sub_worker: Worker):
             Includes functions and cron jobs from a sub-worker.
+
+    By default a function or task runs in one transaction, which holds a
+    connection for as long as it runs. With short_transactions, no transaction
+    is open while it runs. Every unit of work commits on its own with
+    `unit_of_work`, and so do the status updates of the job.
     """
 
     def __init__(self):
@@ -90,9 +97,19 @@ class Worker:
 
     async def _override_user(self, container: Container, user_id: UUID):
         user_repo = container.user_repo()
-        user = await user_repo.get_user_by_id(id=user_id)
+        async with unit_of_work(container.session(), savepoint=False):
+            user = await user_repo.get_user_by_id(id=user_id)
         override_user(container=container, user=user)
 
+    @contextlib.asynccontextmanager
+    async def _session(self, short_transactions: bool):
+        async with sessionmanager.session() as session:
+            if short_transactions:
+                yield session
+            else:
+                async with session.begin():
+                    yield session
+
     def _get_kwargs(self, func: Callable, task_manager: TaskManager):
         sig = inspect.signature(func)
         parameters = {k for k in sig.parameters if k not in {"params", "container"}}
@@ -110,7 +127,7 @@ class Worker:
     async def shutdown(self, ctx):
         await lifespan.shutdown()
 
-    def function(self, with_user: bool = True):
+    def function(self, with_user: bool = True, short_transactions: bool = False):
         def decorator(func):
             @wraps(func)
             async def wrapper(*args):
@@ -119,7 +136,7 @@ class Worker:
                     f"Executing {func.__name__} with context {ctx} and params {params}"
                 )
 
-                async with sessionmanager.session() as session, session.begin():
+                async with self._session(short_transactions) as session:
                     user_id = params.user_id if with_user else None
                     container = await self._create_container(session, user_id=user_id)
                     return await func(ctx["job_id"], params, container=container)
@@ -133,6 +150,7 @@ class Worker:
         self,
         with_user: bool = True,
         channel_type: ChannelType | None = None,
+        short_transactions: bool = False,
     ):
         def decorator(func):
             @wraps(func)
@@ -143,7 +161,7 @@ class Worker:
                     f"Executing {func.__name__} with context {ctx} and params {params}"
                 )
 
-                async with sessionmanager.session() as session, session.begin():
+                async with self._session(short_transactions) as session:
                     user_id = params.user_id if with_user else None
                     container = await self._create_container(session, user_id=user_id)
 
@@ -0,0 +1,66 @@
+from unittest.mock import AsyncMock, MagicMock
+
+from intric.embedding_models.infrastructure.create_embeddings_service import (
+    CreateEmbeddingsService,
+)
+from intric.files.chunk_embedding_list import ChunkEmbeddingList
+from intric.info_blobs.info_blob import InfoBlobChunk, get_chunk_text_hash
+from tests.fixtures import TEST_UUID
+
+
+def _get_chunks(texts: list[str]):
+    return [
+        InfoBlobChunk(chunk_no=i, text=text, info_blob_id=TEST_UUID, tenant_id=TEST_UUID)
+        for i, text in enumerate(texts)
+    ]
+
+
+def _get_service(cached_embeddings: dict[str, list[float]]):
+    chunk_repo = AsyncMock()
+    chunk_repo.get_embeddings_by_text_hash.return_value = cached_embeddings
+
+    adapter = AsyncMock()
+
+    async def get_embeddings(chunks):
+        chunk_embedding_list = ChunkEmbeddingList()
+        chunk_embedding_list.add(chunks, [[float(chunk.chunk_no)] * 3 for chunk in chunks])
+        return chunk_embedding_list
+
+    adapter.get_embeddings.side_effect = get_embeddings
+
+    service = CreateEmbeddingsService(info_blob_chunk_repo=chunk_repo)
+    service._get_adapter = MagicMock(return_value=adapter)
+
+    return service, adapter
+
+
+def test_chunk_text_hash_ignores_whitespace_differences():
+    assert get_chunk_text_hash("Hello  world\n") == get_chunk_text_hash("Hello world")
+    assert get_chunk_text_hash("Hello world") != get_chunk_text_hash("Hello there")
+
+
+async def test_only_embeds_chunks_that_are_not_cached():
+    chunks = _get_chunks(["first", "second", "third"])
+    service, adapter = _get_service({get_chunk_text_hash("second"): [9.0, 9.0, 9.0]})
+
+    chunk_embedding_list = await service.get_embeddings(model=MagicMock(), chunks=chunks)
+
+    embedded_chunks = adapter.get_embeddings.call_args[0][0]
+    assert [chunk.text for chunk in embedded_chunks] == ["first", "third"]
+
+    result = [(chunk.text, list(embedding)) for chunk, embedding in chunk_embedding_list]
+    assert result == [
+        ("first", [0.0, 0.0, 0.0]),
+        ("second", [9.0, 9.0, 9.0]),
+        ("third", [2.0, 2.0, 2.0]),
+    ]
+
+
+async def test_does_not_call_adapter_if_everything_is_cached():
+    chunks = _get_chunks(["first"])
+    service, adapter = _get_service({get_chunk_text_hash("first"): [1.0, 1.0, 1.0]})
+
+    chunk_embedding_list = await service.get_embeddings(model=MagicMock(), chunks=chunks)
+
+    adapter.get_embeddings.assert_not_called()
+    assert [list(embedding) for _, embedding in chunk_embedding_list] == [[1.0, 1.0, 1.0]]
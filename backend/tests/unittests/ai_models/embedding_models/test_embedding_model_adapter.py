@@ -0,0 +1,104 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from intric.embedding_models.infrastructure.adapters.base import EmbeddingModelAdapter
+from intric.embedding_models.infrastructure.adapters.rate_limiter import (
+    EmbeddingRateLimiter,
+)
+from intric.info_blobs.info_blob import InfoBlobChunk
+from tests.fixtures import TEST_UUID
+
+
+class SlowAdapter(EmbeddingModelAdapter):
+    def __init__(self, model):
+        super().__init__(model)
+        self.running = 0
+        self.max_running = 0
+
+    async def get_embedding_for_query(self, query: str):
+        pass
+
+    async def _get_embeddings_for_chunks(self, chunks: list[InfoBlobChunk]):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+
+        # Later batches finish first
+        await asyncio.sleep(0.01 / (chunks[0].chunk_no + 1))
+
+        self.running -= 1
+        return [[float(chunk.chunk_no)] for chunk in chunks]
+
+
+def _get_chunks(num_chunks: int):
+    return [
+        InfoBlobChunk(chunk_no=i, text="c" * 5, info_blob_id=TEST_UUID, tenant_id=TEST_UUID)
+        for i in range(num_chunks)
+    ]
+
+
+async def test_batches_are_embedded_concurrently_and_reassembled_in_order():
+    adapter = SlowAdapter(MagicMock(max_batch_size=1))
+    rate_limiter = EmbeddingRateLimiter(max_concurrent_requests=3)
+
+    with patch(
+        "intric.embedding_models.infrastructure.adapters.base.get_rate_limiter",
+        return_value=rate_limiter,
+    ):
+        chunk_embedding_list = await adapter.get_embeddings(_get_chunks(10))
+
+    assert adapter.max_running == 3
+    assert [list(embedding) for _, embedding in chunk_embedding_list] == [
+        [float(i)] for i in range(10)
+    ]
+
+
+class FailingAdapter(SlowAdapter):
+    def __init__(self, model):
+        super().__init__(model)
+        self.cancelled = 0
+
+    async def _get_embeddings_for_chunks(self, chunks: list[InfoBlobChunk]):
+        if chunks[0].chunk_no == 0:
+            raise ValueError()
+
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+async def test_remaining_batches_are_cancelled_when_one_fails():
+    adapter = FailingAdapter(MagicMock(max_batch_size=1))
+    rate_limiter = EmbeddingRateLimiter(max_concurrent_requests=3)
+
+    with patch(
+        "intric.embedding_models.infrastructure.adapters.base.get_rate_limiter",
+        return_value=rate_limiter,
+    ):
+        with pytest.raises(ValueError):
+            await adapter.get_embeddings(_get_chunks(3))
+
+    # The cancelled batches are done before the error is raised
+    assert adapter.cancelled == 2
+
+
+async def test_rate_limiter_waits_when_token_budget_is_spent():
+    rate_limiter = EmbeddingRateLimiter(max_concurrent_requests=1, tokens_per_minute=100)
+
+    async with rate_limiter.limit(60):
+        pass
+
+    with patch(
+        "intric.embedding_models.infrastructure.adapters.rate_limiter.asyncio.sleep",
+        side_effect=asyncio.CancelledError,
+    ) as sleep_mock:
+        try:
+            async with rate_limiter.limit(60):
+                pass
+        except asyncio.CancelledError:
+            pass
+
+    sleep_mock.assert_called_once()
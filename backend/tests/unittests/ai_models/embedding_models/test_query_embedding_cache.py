@@ -0,0 +1,80 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from intric.embedding_models.infrastructure.create_embeddings_service import (
+    CreateEmbeddingsService,
+)
+from intric.embedding_models.infrastructure.query_embedding_cache import (
+    QueryEmbeddingCache,
+)
+from tests.fixtures import TEST_EMBEDDING_MODEL, TEST_EMBEDDING_MODEL_ADA
+
+
+async def test_cache_hit_and_miss():
+    cache = QueryEmbeddingCache(max_size=10, ttl_seconds=60)
+
+    assert await cache.get(TEST_EMBEDDING_MODEL, "giraffe") is None
+    await cache.set(TEST_EMBEDDING_MODEL, "giraffe", [1.0, 2.0])
+
+    assert await cache.get(TEST_EMBEDDING_MODEL, "giraffe") == [1.0, 2.0]
+    assert await cache.get(TEST_EMBEDDING_MODEL_ADA, "giraffe") is None
+    assert cache.stats() == {"size": 1, "hits": 1, "redis_hits": 0, "misses": 2}
+
+
+async def test_cache_evicts_least_recently_used():
+    cache = QueryEmbeddingCache(max_size=2, ttl_seconds=60)
+
+    await cache.set(TEST_EMBEDDING_MODEL, "first", [1.0])
+    await cache.set(TEST_EMBEDDING_MODEL, "second", [2.0])
+    await cache.get(TEST_EMBEDDING_MODEL, "first")
+    await cache.set(TEST_EMBEDDING_MODEL, "third", [3.0])
+
+    assert await cache.get(TEST_EMBEDDING_MODEL, "first") == [1.0]
+    assert await cache.get(TEST_EMBEDDING_MODEL, "second") is None
+
+
+async def test_cache_expires_entries():
+    cache = QueryEmbeddingCache(max_size=10, ttl_seconds=60)
+
+    with patch(
+        "intric.embedding_models.infrastructure.query_embedding_cache.time.monotonic",
+        side_effect=[0, 61],
+    ):
+        await cache.set(TEST_EMBEDDING_MODEL, "giraffe", [1.0])
+        assert await cache.get(TEST_EMBEDDING_MODEL, "giraffe") is None
+
+
+async def test_cache_falls_back_to_redis():
+    redis_client = AsyncMock()
+    cache = QueryEmbeddingCache(max_size=10, ttl_seconds=60, redis_client=redis_client)
+
+    await cache.set(TEST_EMBEDDING_MODEL, "giraffe", [1.0, 2.0])
+    stored_value = redis_client.set.call_args[0][1]
+    cache.clear()
+
+    redis_client.get.return_value = stored_value
+    assert await cache.get(TEST_EMBEDDING_MODEL, "giraffe") == [1.0, 2.0]
+    assert cache.redis_hits == 1
+
+
+async def test_cache_treats_redis_errors_as_misses():
+    redis_client = AsyncMock()
+    redis_client.get.side_effect = ConnectionError()
+    cache = QueryEmbeddingCache(max_size=10, ttl_seconds=60, redis_client=redis_client)
+
+    assert await cache.get(TEST_EMBEDDING_MODEL, "giraffe") is None
+
+
+async def test_query_embedding_is_only_computed_once():
+    adapter = AsyncMock()
+    adapter.get_embedding_for_query.return_value = [1.0, 2.0]
+
+    service = CreateEmbeddingsService(
+        query_embedding_cache=QueryEmbeddingCache(max_size=10, ttl_seconds=60)
+    )
+    service._get_adapter = MagicMock(return_value=adapter)
+
+    for _ in range(3):
+        embedding = await service.get_embedding_for_query(TEST_EMBEDDING_MODEL, "giraffe")
+        assert embedding == [1.0, 2.0]
+
+    adapter.get_embedding_for_query.assert_called_once()
@@ -0,0 +1,54 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from intric.completion_models.infrastructure.completion_service import CompletionService
+from intric.files.encoded_image_cache import encoded_image_cache
+
+
+def _image(checksum: str, payload_loaded: bool = False):
+    return MagicMock(
+        id=uuid4(),
+        checksum=checksum,
+        blob=None,
+        blob_in_store=False,
+        payload_loaded=payload_loaded,
+        encoded_blob=None,
+    )
+
+
+async def test_load_images_loads_the_images_that_are_not_encoded():
+    encoded_image_cache.clear()
+    encoded_image_cache.put("encoded", "ZW5jb2RlZA==")
+    encoded, deferred = _image("encoded"), _image("deferred")
+    file_repo = MagicMock(get_blobs=AsyncMock(return_value={deferred.id: b"image"}))
+    service = CompletionService(context_builder=MagicMock(), file_repo=file_repo)
+
+    await service._load_images([encoded, deferred])
+
+    file_repo.get_blobs.assert_awaited_once_with([deferred.id])
+    assert deferred.blob == b"image"
+    assert deferred.encoded_blob == "aW1hZ2U="
+    assert encoded.blob is None
+    assert encoded.encoded_blob == "ZW5jb2RlZA=="
+
+    encoded_image_cache.clear()
+
+
+async def test_load_images_keeps_encodings_evicted_while_loading():
+    encoded_image_cache.clear()
+    encoded_image_cache.put("encoded", "ZW5jb2RlZA==")
+    encoded, deferred = _image("encoded"), _image("deferred")
+
+    async def get_blobs(ids):
+        encoded_image_cache.clear()
+        return {deferred.id: b"image"}
+
+    file_repo = MagicMock(get_blobs=AsyncMock(side_effect=get_blobs))
+    service = CompletionService(context_builder=MagicMock(), file_repo=file_repo)
+
+    await service._load_images([encoded, deferred])
+
+    assert encoded_image_cache.encode(encoded) == "ZW5jb2RlZA=="
+    assert encoded.blob is None
+
+    encoded_image_cache.clear()
@@ -6,14 +6,12 @@ from uuid import uuid4
 import pytest
 
 from intric.ai_models.completion_models.completion_model import Message
-from intric.completion_models.infrastructure.context_builder import (
-    ContextBuilder,
-    count_tokens,
-)
+from intric.completion_models.infrastructure.context_builder import ContextBuilder
 from intric.completion_models.infrastructure.static_prompts import (
     HALLUCINATION_GUARD,
     SHOW_REFERENCES_PROMPT,
 )
+from intric.completion_models.infrastructure.token_counter import count_tokens
 from intric.files.file_models import File, FileType
 from intric.main.exceptions import QueryException
 
@@ -148,6 +146,28 @@ Question 2 with file"""  # noqa
     assert context.messages == expected_messages
 
 
+def test_context_with_messages_is_budgeted_on_the_text(context_builder: ContextBuilder):
+    # The stored token counts include the whole prompt, knowledge and history
+    session = MagicMock(
+        questions=[
+            MagicMock(
+                question=f"Question {i}",
+                answer=f"Answer {i}",
+                files=[],
+                num_tokens_question=50000,
+                num_tokens_answer=10,
+            )
+            for i in range(10)
+        ]
+    )
+
+    context = context_builder.build_context(input_str=QUESTION, session=session, max_tokens=10000)
+
+    assert context.messages == [
+        Message(question=f"Question {i}", answer=f"Answer {i}") for i in range(10)
+    ]
+
+
 def test_context_with_images(context_builder: ContextBuilder):
     image = File(
         id=uuid4(),
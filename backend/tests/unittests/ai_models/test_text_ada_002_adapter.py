@@ -13,13 +13,17 @@ from intric.info_blobs.info_blob import InfoBlobChunk
 from tests.fixtures import TEST_UUID
 
 
-def _get_adapter_with_max_limit(max_limit: int):
+def _get_adapter_with_max_limit(
+    max_limit: int, max_batch_size: int | None = None, max_batch_tokens: int | None = None
+):
     model = EmbeddingModelLegacy(
         id=uuid4(),
         name="multilingual-e5-large",
         family=EmbeddingModelFamily.E5,
         open_source=True,
         max_input=max_limit,
+        max_batch_size=max_batch_size,
+        max_batch_tokens=max_batch_tokens,
         stability=ModelStability.STABLE,
         hosting=ModelHostingLocation.USA,
         is_deprecated=False,
@@ -39,6 +43,7 @@ def _get_chunks(texts: list[str]):
             info_blob_id=TEST_UUID,
             group_id=0,
             tenant_id=TEST_UUID,
+            num_tokens=len(text),
         )
         for i, text in enumerate(texts)
     ]
@@ -69,3 +74,30 @@ def test_chunking_with_three_chunks():
     chunks = _get_chunks(texts)
 
     assert len(list(adapter._chunk_chunks(chunks))) == 3
+
+
+def test_chunking_respects_max_inputs_per_request():
+    adapter = _get_adapter_with_max_limit(8191, max_batch_size=2)
+
+    texts = ["c"] * 5
+    chunks = _get_chunks(texts)
+
+    assert [len(batch) for batch in adapter._chunk_chunks(chunks)] == [2, 2, 1]
+
+
+def test_chunking_prefers_max_tokens_per_request_over_max_input():
+    adapter = _get_adapter_with_max_limit(8, max_batch_tokens=20)
+
+    texts = ["c" * 7, "c" * 5, "c" * 3, "c" * 6]
+    chunks = _get_chunks(texts)
+
+    assert len(list(adapter._chunk_chunks(chunks))) == 2
+
+
+def test_chunking_estimates_tokens_when_not_counted():
+    adapter = _get_adapter_with_max_limit(8191)
+
+    chunks = _get_chunks(["c" * 100])
+    chunks[0].num_tokens = None
+
+    assert adapter._count_tokens(chunks[0]) == 26
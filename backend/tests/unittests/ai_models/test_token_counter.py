@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock
+
+from intric.completion_models.infrastructure import token_counter as token_counter_module
+from intric.completion_models.infrastructure.token_counter import (
+    DEFAULT_ENCODING_NAME,
+    TokenCounter,
+    count_tokens,
+    count_tokens_batch,
+    get_encoding,
+    get_encoding_name_for_model,
+)
+
+
+def test_encoding_is_cached():
+    assert get_encoding() is get_encoding(DEFAULT_ENCODING_NAME)
+
+
+def test_count_none_is_zero():
+    assert count_tokens(None) == 0
+    assert TokenCounter().count_immutable(None) == 0
+
+
+def test_count_batch_matches_single_counts():
+    texts = ["Hello world", "", None, "A somewhat longer sentence, with punctuation!"]
+
+    assert count_tokens_batch(texts) == [count_tokens(text) for text in texts]
+
+
+def test_count_immutable_matches_count():
+    token_counter = TokenCounter()
+    text = "What is the capital of Sweden?"
+
+    assert token_counter.count_immutable(text) == token_counter.count(text)
+    assert token_counter.count_immutable(text) == token_counter.count(text)
+
+
+def test_unknown_model_falls_back_to_default_encoding():
+    assert get_encoding_name_for_model("claude-3-5-sonnet-latest") == DEFAULT_ENCODING_NAME
+    assert TokenCounter("mixtral").encoding_name == DEFAULT_ENCODING_NAME
+
+
+def test_known_model_uses_its_own_encoding():
+    assert get_encoding_name_for_model("gpt-4o") == "o200k_base"
+
+
+def test_falls_back_to_default_encoding_if_model_encoding_cannot_be_loaded(monkeypatch):
+    get_encoding_original = token_counter_module.get_encoding
+    failures = [ConnectionError()]
+
+    def get_encoding(encoding_name):
+        if encoding_name == DEFAULT_ENCODING_NAME:
+            return get_encoding_original(encoding_name)
+        if failures:
+            raise failures.pop()
+        # A stand in, the encoding is not downloaded by the tests
+        encoding = MagicMock()
+        encoding.name = encoding_name
+        return encoding
+
+    monkeypatch.setattr(token_counter_module, "get_encoding", get_encoding)
+    monkeypatch.setattr(token_counter_module, "_failed_encodings", {})
+
+    assert TokenCounter("gpt-4o").encoding_name == DEFAULT_ENCODING_NAME
+    # Not tried again until the retry interval has passed
+    assert TokenCounter("gpt-4o").encoding_name == DEFAULT_ENCODING_NAME
+
+    monkeypatch.setattr(token_counter_module, "ENCODING_RETRY_SECONDS", 0)
+
+    # The fallback is not cached, the encoding of the model is used once it loads
+    assert TokenCounter("gpt-4o").encoding_name == "o200k_base"
@@ -0,0 +1,82 @@
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from intric.files.audio import AudioSegment
+from intric.transcription_models.infrastructure.adapters.whisper import (
+    OpenAISTTModelAdapter,
+)
+
+
+def _audio_file(segments: list[AudioSegment]):
+    async def iter_segments():
+        for segment in segments:
+            yield segment
+
+    @asynccontextmanager
+    async def asplit_file(**kwargs):
+        yield iter_segments()
+
+    return MagicMock(asplit_file=asplit_file)
+
+
+@pytest.fixture
+def adapter():
+    return OpenAISTTModelAdapter(model=MagicMock(base_url=None))
+
+
+async def test_segments_are_transcribed_concurrently_and_joined_in_order(adapter):
+    segments = [
+        AudioSegment(path=Path(f"{i}.mp3"), start_seconds=i * 300, end_seconds=(i + 1) * 300)
+        for i in range(3)
+    ]
+    segments[-1].end_seconds = 725.4
+    running = 0
+    max_running = 0
+
+    async def get_text_from_file(path: Path):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        # The first segment finishes last
+        await asyncio.sleep(0.03 if path.name == "0.mp3" else 0.01)
+        running -= 1
+        return f"Text {path.stem}"
+
+    adapter._get_text_from_file = get_text_from_file
+
+    text = await adapter.get_text_from_file(_audio_file(segments))
+
+    assert max_running > 1
+    assert text == (
+        "### 0:00 - 5:00\n\nText 0\n\n"
+        "### 5:00 - 10:00\n\nText 1\n\n"
+        "### 10:00 - 12:05\n\nText 2"
+    )
+
+
+async def test_remaining_segments_are_cancelled_when_one_fails(adapter):
+    segments = [
+        AudioSegment(path=Path(f"{i}.mp3"), start_seconds=0, end_seconds=1) for i in range(2)
+    ]
+    cancelled = asyncio.Event()
+
+    async def get_text_from_file(path: Path):
+        if path.name == "0.mp3":
+            raise ValueError()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    adapter._get_text_from_file = get_text_from_file
+
+    with pytest.raises(ValueError):
+        await adapter.get_text_from_file(_audio_file(segments))
+
+    # The cancelled segments are done before the error is raised
+    assert cancelled.is_set()
@@ -1,3 +1,4 @@
+import asyncio
 from copy import deepcopy
 from dataclasses import dataclass
 from typing import Any
@@ -11,7 +12,11 @@ from intric.assistants.api.assistant_models import (
     AssistantCreatePublic,
     AssistantUpdatePublic,
 )
-from intric.assistants.assistant_service import AssistantService
+from intric.assistants.assistant_service import (
+    AssistantService,
+    ReferenceTracker,
+    get_references,
+)
 from intric.main.config import get_settings
 from intric.main.exceptions import BadRequestException, UnauthorizedException
 from intric.main.models import ModelId
@@ -173,3 +178,124 @@ async def test_error_when_assistant_cannot_be_used_in_space(setup: Setup):
 
     with pytest.raises(UnauthorizedException):
         await setup.service.ask(question="hello", assistant_id=MagicMock())
+
+
+def _setup_ask(setup: Setup, monkeypatch, web_search):
+    assistant = MagicMock()
+    assistant.completion_model.token_limit = 128000
+    assistant.ask = AsyncMock(side_effect=RuntimeError("stop after prefetch"))
+    space = MagicMock()
+    space.get_assistant.return_value = assistant
+    setup.service.space_repo.get_space_by_assistant.return_value = space
+    setup.service.session_service.create_session.return_value = MagicMock(questions=[])
+    monkeypatch.setattr(AssistantService, "web_search", property(lambda self: web_search))
+
+    return assistant
+
+
+async def test_ask_searches_the_web_while_fetching_references(setup: Setup, monkeypatch):
+    references_started = asyncio.Event()
+    web_search_started = asyncio.Event()
+
+    async def search(search_query):
+        web_search_started.set()
+        await references_started.wait()
+        return ["result"]
+
+    async def get_references(**kwargs):
+        references_started.set()
+        await web_search_started.wait()
+        return MagicMock()
+
+    assistant = _setup_ask(setup, monkeypatch, MagicMock(search=search))
+    assistant.get_references = AsyncMock(side_effect=get_references)
+
+    with pytest.raises(RuntimeError, match="stop after prefetch"):
+        await asyncio.wait_for(
+            setup.service.ask(
+                question="hello", assistant_id=uuid4(), version=2, use_web_search=True
+            ),
+            timeout=5,
+        )
+
+    assert assistant.ask.call_args.kwargs["web_search_results"] == ["result"]
+
+
+async def test_ask_cancels_the_web_search_if_the_references_fail(setup: Setup, monkeypatch):
+    search_cancelled = asyncio.Event()
+
+    async def search(search_query):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            search_cancelled.set()
+            raise
+
+    async def get_references(**kwargs):
+        await asyncio.sleep(0)
+        raise ValueError("no references")
+
+    assistant = _setup_ask(setup, monkeypatch, MagicMock(search=search))
+    assistant.get_references = AsyncMock(side_effect=get_references)
+
+    with pytest.raises(ValueError, match="no references"):
+        await setup.service.ask(
+            question="hello", assistant_id=uuid4(), version=2, use_web_search=True
+        )
+
+    # The cancelled search is done before the error is raised
+    assert search_cancelled.is_set()
+
+
+def _blob_with_id(id):
+    blob = MagicMock()
+    blob.id = id
+    return blob
+
+
+def test_reference_tracker_finds_tags_split_between_chunks():
+    blob_1 = _blob_with_id(uuid4())
+    blob_2 = _blob_with_id(uuid4())
+    tracker = ReferenceTracker(info_blobs=[blob_1, blob_2], version=2)
+
+    answer = (
+        f'First <inref id="{str(blob_2.id)[:8]}"/> then '
+        f'<inref id="{str(blob_1.id)[:8]}"/> and again <inref id="{str(blob_2.id)[:8]}"/>.'
+    )
+    for i in range(0, len(answer), 5):
+        tracker.add_text(answer[i : i + 5])
+
+    assert tracker.references == [blob_2, blob_1]
+
+
+def test_reference_tracker_matches_get_references():
+    blobs = [_blob_with_id(uuid4()) for _ in range(3)]
+    answer = "".join(f'Text <inref id="{str(blob.id)[:8]}"/>' for blob in reversed(blobs))
+    tracker = ReferenceTracker(info_blobs=blobs, version=2)
+
+    for char in answer:
+        tracker.add_text(char)
+
+    assert tracker.references == get_references(answer, info_blobs=blobs, version=2)
+
+
+def test_reference_tracker_gets_references_from_other_items():
+    blob = _blob_with_id(uuid4())
+    chunk = MagicMock()
+    chunk.info_blob_id = blob.id
+    tracker = ReferenceTracker(info_blobs=[blob], version=2)
+
+    tracker.add_text(f'<inref id="{str(blob.id)[:8]}"/> <inref id="ffffffff"/>')
+
+    assert tracker.get_references_from(
+        [MagicMock(info_blob_id=uuid4()), chunk], get_id_func=lambda chunk: chunk.info_blob_id
+    ) == [chunk]
+
+
+def test_reference_tracker_returns_everything_for_version_1():
+    blobs = [_blob_with_id(uuid4())]
+    tracker = ReferenceTracker(info_blobs=blobs, version=1)
+
+    tracker.add_text("No references")
+
+    assert tracker.references == blobs
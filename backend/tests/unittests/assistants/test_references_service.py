@@ -4,7 +4,7 @@ from uuid import uuid4
 import pytest
 
 from intric.assistants.references import ReferencesService
-from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
+from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore, InfoBlobInDBNoText
 from tests.fixtures import TEST_UUID
 
 
@@ -94,3 +94,56 @@ def test_concatenate_session_is_null():
     service = ReferencesService(AsyncMock(), AsyncMock())
     concatenated_session = service._concatenate_conversation("next question", None)
     assert concatenated_session == "next question"
+
+
+def _create_info_blob(id):
+    return InfoBlobInDBNoText(
+        id=id,
+        title="title",
+        embedding_model_id=TEST_UUID,
+        user_id=TEST_UUID,
+        tenant_id=TEST_UUID,
+        size=1,
+    )
+
+
+async def test_get_info_blobs_from_chunks_in_one_query():
+    info_blobs_repo = AsyncMock()
+    service = ReferencesService(info_blobs_repo, AsyncMock())
+
+    blob_1_id = uuid4()
+    blob_2_id = uuid4()
+    info_blobs_repo.get_many.return_value = [
+        _create_info_blob(blob_2_id),
+        _create_info_blob(blob_1_id),
+    ]
+
+    chunks = [
+        _create_chunk_with_score(0.9, blob_1_id),
+        _create_chunk_with_score(0.7, blob_2_id),
+    ]
+
+    info_blobs = await service._get_info_blobs_from_chunks(chunks)
+
+    info_blobs_repo.get_many.assert_awaited_once_with([blob_1_id, blob_2_id], without_text=True)
+    assert [(info_blob.id, info_blob.score) for info_blob in info_blobs] == [
+        (blob_1_id, 0.9),
+        (blob_2_id, 0.7),
+    ]
+
+
+async def test_get_info_blobs_from_chunks_skips_deleted_info_blobs():
+    info_blobs_repo = AsyncMock()
+    service = ReferencesService(info_blobs_repo, AsyncMock())
+
+    blob_id = uuid4()
+    info_blobs_repo.get_many.return_value = [_create_info_blob(blob_id)]
+
+    chunks = [
+        _create_chunk_with_score(0.9, uuid4()),
+        _create_chunk_with_score(0.7, blob_id),
+    ]
+
+    info_blobs = await service._get_info_blobs_from_chunks(chunks)
+
+    assert [info_blob.id for info_blob in info_blobs] == [blob_id]
@@ -0,0 +1,171 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from intric.info_blobs.chunk_vector_index import ChunkVectorIndex
+
+
+def _index(**kwargs):
+    return ChunkVectorIndex(**{"max_chunks": 1000, "max_bytes": 10**8, "ttl_seconds": 60} | kwargs)
+
+
+def _put(index, source_id, embeddings, version=0):
+    ids = np.array([uuid4() for _ in embeddings], dtype=object)
+    return index.put(
+        source_id, embeddings.shape[1], version, ids=ids, matrix=index.build_matrix(embeddings)
+    )
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_search_matches_cosine_similarity(dtype):
+    rng = np.random.default_rng(0)
+    index = _index(dtype=dtype)
+    embeddings = rng.standard_normal((500, 32))
+    query = rng.standard_normal(32)
+    source_matrix = _put(index, uuid4(), embeddings)
+
+    nearest = index.search([source_matrix], query.tolist(), limit=10)
+
+    similarities = embeddings @ query / (np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query))
+    expected = np.argsort(-similarities)[:10]
+    assert [id for id, _ in nearest] == list(source_matrix.ids[expected])
+    assert [score for _, score in nearest] == pytest.approx(similarities[expected], abs=1e-2)
+
+
+def test_search_merges_sources():
+    index = _index()
+    first = _put(index, uuid4(), np.array([[1.0, 0.0], [0.0, 1.0]]))
+    second = _put(index, uuid4(), np.array([[1.0, 0.1]]))
+
+    nearest = index.search([first, second], [1.0, 0.0], limit=2)
+
+    assert [id for id, _ in nearest] == [first.ids[0], second.ids[0]]
+
+
+def test_stale_versions_are_not_returned():
+    index = _index()
+    source_id = uuid4()
+    _put(index, source_id, np.ones((2, 4)), version=1)
+
+    assert index.get(source_id, 4, version=1) is not None
+    assert index.get(source_id, 4, version=2) is None
+    assert index.stats() == {"sources": 0, "bytes": 0}
+
+
+def test_evicts_least_recently_used_sources():
+    index = _index()
+    first, second, third = uuid4(), uuid4(), uuid4()
+    _put(index, first, np.ones((10, 4)))
+    index.max_bytes = index.stats()["bytes"] * 2
+
+    _put(index, second, np.ones((10, 4)))
+    index.get(first, 4, version=0)
+    _put(index, third, np.ones((10, 4)))
+
+    assert index.get(first, 4, version=0) is not None
+    assert index.get(second, 4, version=0) is None
+
+
+async def test_invalidate_bumps_the_version():
+    index = _index()
+    source_id = uuid4()
+    _put(index, source_id, np.ones((2, 4)))
+
+    await index.invalidate([source_id, None])
+
+    assert await index.get_versions([source_id]) == {source_id: 1}
+    assert index.get(source_id, 4, version=0) is None
+
+
+async def test_versions_are_shared_through_redis():
+    pipe = MagicMock(execute=AsyncMock())
+    redis_client = MagicMock(mget=AsyncMock(return_value=[b"3", None]))
+    redis_client.pipeline.return_value.__aenter__.return_value = pipe
+    index = _index(redis_client=redis_client)
+    first, second = uuid4(), uuid4()
+
+    await index.invalidate([first])
+
+    pipe.incr.assert_called_once_with(f"chunk_vector_index:version:{first}")
+    assert await index.get_versions([first, second]) == {first: 3, second: 0}
+
+
+async def test_invalidate_after_commit_waits_for_the_transaction():
+    index = _index()
+    session = AsyncSession()
+    source_id, other_source_id = uuid4(), uuid4()
+
+    async with session.begin():
+        await index.invalidate_after_commit(session, [source_id])
+        async with session.begin_nested():
+            await index.invalidate_after_commit(session, [other_source_id, None])
+
+        versions = await index.get_versions([source_id, other_source_id])
+        assert versions == {source_id: 0, other_source_id: 0}
+
+    versions = await index.get_versions([source_id, other_source_id])
+    assert versions == {source_id: 1, other_source_id: 1}
+
+
+async def test_invalidate_after_commit_skips_rolled_back_transactions():
+    index = _index()
+    session = AsyncSession()
+    source_id = uuid4()
+
+    with pytest.raises(ValueError):
+        async with session.begin():
+            await index.invalidate_after_commit(session, [source_id])
+            raise ValueError()
+
+    async with session.begin():
+        pass
+
+    assert await index.get_versions([source_id]) == {source_id: 0}
+
+
+async def test_invalidate_after_commit_shares_the_versions_through_redis():
+    pipe = MagicMock(execute=AsyncMock())
+    redis_client = MagicMock()
+    redis_client.pipeline.return_value.__aenter__.return_value = pipe
+    index = _index(redis_client=redis_client)
+    session = AsyncSession()
+    source_id = uuid4()
+
+    async with session.begin():
+        await index.invalidate_after_commit(session, [source_id])
+        pipe.incr.assert_not_called()
+
+    await asyncio.sleep(0)
+
+    pipe.incr.assert_called_once_with(f"chunk_vector_index:version:{source_id}")
+
+
+async def test_build_lock_is_dropped_once_no_search_holds_it():
+    index = _index()
+    source_id = uuid4()
+    running = 0
+    max_running = 0
+
+    async def build():
+        nonlocal running, max_running
+        async with index.build_lock(source_id, 4):
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0)
+            running -= 1
+
+    await asyncio.gather(build(), build(), build())
+
+    assert max_running == 1
+    assert index._build_locks[asyncio.get_running_loop()] == {}
+
+
+async def test_redis_failure_disables_the_index():
+    redis_client = MagicMock(mget=AsyncMock(side_effect=ConnectionError()))
+    index = _index(redis_client=redis_client)
+
+    assert await index.get_versions([uuid4()]) is None
@@ -0,0 +1,73 @@
+from functools import partial
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from intric.embedding_models.infrastructure.datastore import Datastore, iter_sections
+from intric.files.chunk_embedding_list import ChunkEmbeddingList
+from tests.fixtures import TEST_UUID
+
+
+@pytest.fixture
+def datastore():
+    return Datastore(
+        user=MagicMock(tenant_id=TEST_UUID),
+        info_blob_chunk_repo=AsyncMock(),
+        create_embeddings_service=AsyncMock(),
+    )
+
+
+def _info_blob(text: str):
+    return MagicMock(
+        id=TEST_UUID,
+        text=text,
+        group_id=TEST_UUID,
+        website_id=None,
+        integration_knowledge_id=None,
+    )
+
+
+def test_iter_sections_splits_at_paragraphs_then_lines_then_words():
+    text = "aaaa bbbb\ncccc\n\ndddd eeee"
+
+    sections = list(iter_sections(text, max_length=16))
+
+    assert "".join(sections) == text
+    assert sections == ["aaaa bbbb\ncccc", "\n\ndddd eeee"]
+    assert list(iter_sections("aaaa bbbb\ncccc", max_length=12)) == ["aaaa bbbb", "\ncccc"]
+    assert list(iter_sections("aaaaaaaa", max_length=3)) == ["aaa", "aaa", "aa"]
+
+
+def test_chunk_text_numbers_chunks_across_sections(datastore: Datastore, monkeypatch):
+    monkeypatch.setattr("intric.embedding_models.infrastructure.datastore.SECTION_LENGTH", 2000)
+    text = "\n\n".join(f"Paragraph {i}. " + "word " * 100 for i in range(50))
+
+    batches = list(datastore._chunk_text(_info_blob(text), batch_size=10))
+    chunks = [chunk for batch in batches for chunk in batch]
+
+    assert len(batches) > 1
+    assert all(len(batch) >= 10 for batch in batches[:-1])
+    assert [chunk.chunk_no for chunk in chunks] == list(range(len(chunks)))
+    assert all(chunk.source_id == TEST_UUID for chunk in chunks)
+    assert "Paragraph 49." in chunks[-1].text
+
+
+async def test_add_embeds_and_adds_a_batch_at_a_time(datastore: Datastore, monkeypatch):
+    monkeypatch.setattr("intric.embedding_models.infrastructure.datastore.SECTION_LENGTH", 2000)
+    monkeypatch.setattr(datastore, "_chunk_text", partial(datastore._chunk_text, batch_size=10))
+    events = []
+
+    async def get_embeddings(model, chunks):
+        events.append("embed")
+        chunk_embedding_list = ChunkEmbeddingList()
+        chunk_embedding_list.add(chunks, np.zeros((len(chunks), 4)))
+        return chunk_embedding_list
+
+    datastore.create_embeddings_service.get_embeddings.side_effect = get_embeddings
+    datastore.chunk_repo.add.side_effect = lambda *args: events.append("add")
+    text = "\n\n".join("word " * 100 for _ in range(50))
+
+    await datastore.add(_info_blob(text), embedding_model=MagicMock())
+
+    assert events[:4] == ["embed", "add", "embed", "add"]
@@ -0,0 +1,180 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from pgvector.utils import to_db, to_db_binary
+from sqlalchemy.dialects import postgresql
+
+from intric.database.database import register_vector_codec
+from intric.info_blobs.chunk_vector_index import ChunkVectorIndex
+from intric.info_blobs.info_blob import InfoBlobChunk, get_chunk_text_hash
+from intric.info_blobs.info_blob_chunk_repo import InfoBlobChunkRepo
+from intric.main.config import get_settings
+
+
+def _compile(stmt):
+    return str(
+        stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True})
+    )
+
+
+def _result(rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    result.__iter__.side_effect = lambda: iter(rows)
+    return result
+
+
+@pytest.fixture
+def session():
+    session = AsyncMock()
+    session.in_transaction = MagicMock(return_value=False)
+    session.execute.return_value = _result([])
+    session.scalar.return_value = get_settings().exact_search_max_chunks + 1
+    return session
+
+
+async def test_semantic_search_uses_the_index_of_the_dimension(session):
+    repo = InfoBlobChunkRepo(session, vector_index=None)
+    repo._to_chunks_with_score = list
+    rows = [(MagicMock(), 0.1, "title")] * 2
+    session.execute.side_effect = [_result([])] * 3 + [_result(rows)]
+
+    await repo.semantic_search([0.1] * 512, group_ids=[uuid4()], limit=2)
+
+    statements = [_compile(call.args[0]) for call in session.execute.call_args_list]
+    assert statements[0].startswith("SET LOCAL hnsw.ef_search")
+    assert statements[1] == "SET LOCAL hnsw.iterative_scan = relaxed_order"
+    assert statements[2].startswith("SET LOCAL hnsw.max_scan_tuples")
+    assert "CAST(info_blob_chunks.embedding AS VECTOR(512)) <=>" in statements[3]
+    assert "vector_dims(info_blob_chunks.embedding) = 512" in statements[3]
+    assert not any("enable_seqscan" in statement for statement in statements)
+    assert len(statements) == 4
+
+
+async def test_semantic_search_filters_on_the_source_id_of_the_chunks(session):
+    repo = InfoBlobChunkRepo(session, vector_index=None)
+    group_id, website_id = uuid4(), uuid4()
+
+    await repo.semantic_search([0.1] * 3, group_ids=[group_id], website_ids=[website_id])
+
+    statement = _compile(session.execute.call_args.args[0])
+    nearest_chunks = statement[: statement.index(" SELECT info_blob_chunks.text")]
+    assert "info_blob_chunks.source_id IN" in nearest_chunks
+    assert "info_blobs" not in nearest_chunks
+
+
+async def test_semantic_search_without_iterative_scan(session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "hnsw_iterative_scan", False)
+    repo = InfoBlobChunkRepo(session, vector_index=None)
+
+    await repo.semantic_search([0.1] * 512, group_ids=[uuid4()], limit=30)
+
+    statements = [_compile(call.args[0]) for call in session.execute.call_args_list]
+    assert not any("iterative_scan" in statement for statement in statements)
+
+
+async def test_semantic_search_falls_back_to_exact_search_when_too_few_results(session):
+    repo = InfoBlobChunkRepo(session, vector_index=None)
+
+    await repo.semantic_search([0.1] * 512, group_ids=[uuid4()], limit=30)
+
+    statements = [_compile(call.args[0]) for call in session.execute.call_args_list]
+    assert len(statements) == 5
+    assert "CAST" not in statements[4]
+    assert "vector_dims" not in statements[4]
+
+
+async def test_semantic_search_searches_small_sources_exactly(session):
+    session.scalar.return_value = 100
+    repo = InfoBlobChunkRepo(session, vector_index=None)
+
+    await repo.semantic_search([0.1] * 512, group_ids=[uuid4()], limit=30)
+
+    statements = [_compile(call.args[0]) for call in session.execute.call_args_list]
+    assert len(statements) == 1
+    assert "hnsw" not in statements[0]
+    assert "CAST" not in statements[0]
+
+
+async def test_semantic_search_without_index_for_the_dimension(session):
+    repo = InfoBlobChunkRepo(session, vector_index=None)
+
+    await repo.semantic_search([0.1] * 3, group_ids=[uuid4()])
+
+    statements = [_compile(call.args[0]) for call in session.execute.call_args_list]
+    assert len(statements) == 1
+    assert "hnsw" not in statements[0]
+    session.scalar.assert_not_called()
+
+
+@pytest.fixture
+def vector_index():
+    return ChunkVectorIndex(max_chunks=1000, max_bytes=10**8, ttl_seconds=60)
+
+
+async def test_semantic_search_with_vector_index(session, vector_index):
+    session.scalar.return_value = 2
+    repo = InfoBlobChunkRepo(session, vector_index=vector_index)
+    repo._to_chunks_with_score = list
+    group_id = uuid4()
+    near, far = MagicMock(id=uuid4()), MagicMock(id=uuid4())
+    embeddings = _result([(far.id, np.array([0.0, 1.0])), (near.id, np.array([1.0, 0.1]))])
+    chunks = [(far, "far"), (near, "near")]
+    session.execute.side_effect = [embeddings, _result(chunks), _result(chunks[1:])]
+
+    first = await repo.semantic_search([1.0, 0.0], group_ids=[group_id], limit=2)
+    # The far chunk has been deleted since the source was indexed
+    second = await repo.semantic_search([1.0, 0.0], group_ids=[group_id], limit=2)
+
+    assert [(chunk, title) for chunk, _, title in first] == [(near, "near"), (far, "far")]
+    assert first[0][1] == pytest.approx(1 / np.linalg.norm([1.0, 0.1]))
+    assert [chunk for chunk, _, _ in second] == [near]
+    assert session.execute.call_count == 3
+
+
+async def test_semantic_search_of_large_sources_skips_vector_index(session, vector_index):
+    repo = InfoBlobChunkRepo(session, vector_index=vector_index)
+    group_id = uuid4()
+
+    await repo.semantic_search([0.1] * 512, group_ids=[group_id])
+    await repo.semantic_search([0.1] * 512, group_ids=[group_id])
+
+    statements = [_compile(call.args[0]) for call in session.execute.call_args_list]
+    load_embeddings = "SELECT info_blob_chunks.id, info_blob_chunks.embedding"
+    assert not any(statement.startswith(load_embeddings) for statement in statements)
+    # The size of the source is only counted once for the vector index
+    assert session.scalar.call_count == 3
+
+
+async def test_add_copies_the_chunks(session, vector_index):
+    repo = InfoBlobChunkRepo(session, vector_index=vector_index)
+    copy_records_to_table = (
+        session.connection.return_value.get_raw_connection.return_value.driver_connection
+    ).copy_records_to_table
+    source_id = uuid4()
+    chunk = InfoBlobChunk(
+        text="hello", chunk_no=0, info_blob_id=uuid4(), tenant_id=uuid4(), source_id=source_id
+    )
+
+    await repo.add([chunk], np.ones((1, 3), dtype=np.float32))
+
+    kwargs = copy_records_to_table.call_args.kwargs
+    (record,) = [dict(zip(kwargs["columns"], record)) for record in kwargs["records"]]
+    assert copy_records_to_table.call_args.args == ("info_blob_chunks",)
+    assert record["size"] == len("hello") + 3 * 4
+    assert record["text_hash"] == get_chunk_text_hash("hello")
+    assert record["embedding"].tolist() == [1.0, 1.0, 1.0]
+    assert record["source_id"] == source_id
+    session.execute.assert_not_called()
+    assert await vector_index.get_versions([source_id]) == {source_id: 1}
+
+
+async def test_vector_codec_encodes_the_text_format_of_pgvector_sqlalchemy():
+    connection = AsyncMock()
+
+    await register_vector_codec(connection)
+
+    encoder = connection.set_type_codec.call_args.kwargs["encoder"]
+    assert encoder(to_db([1.0, 2.0])) == encoder(np.array([1.0, 2.0])) == to_db_binary([1.0, 2.0])
@@ -1,8 +1,15 @@
 from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
 
 import pytest
 
-from intric.embedding_models.infrastructure.datastore import Datastore
+from intric.embedding_models.infrastructure.datastore import (
+    RRF_K,
+    Datastore,
+    get_exact_terms,
+    reciprocal_rank_fusion,
+)
+from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
 from tests.fixtures import TEST_COLLECTION
 
 
@@ -33,3 +40,68 @@ async def test_semantic_search(datastore: Datastore):
             embedding_model=TEST_COLLECTION.embedding_model,
         )
         autocut_mock.assert_called_once()
+
+
+def _chunk(score: float, id=None):
+    return InfoBlobChunkInDBWithScore(
+        id=id or uuid4(),
+        text="chunk",
+        chunk_no=0,
+        info_blob_id=uuid4(),
+        tenant_id=uuid4(),
+        score=score,
+        info_blob_title="title",
+    )
+
+
+def test_reciprocal_rank_fusion_favours_chunks_in_both_results():
+    shared = _chunk(0.5)
+    semantic_only = _chunk(0.9)
+    keyword_only = _chunk(3.0)
+
+    fused = reciprocal_rank_fusion(
+        [semantic_only, shared], [keyword_only, shared.model_copy(update={"score": 2.0})]
+    )
+
+    assert [chunk.id for chunk in fused] == [shared.id, semantic_only.id, keyword_only.id]
+    assert fused[0].score == pytest.approx(2 / (RRF_K + 2))
+
+
+def test_get_exact_terms():
+    assert get_exact_terms("What is the price of X-123 and case 2024/1234? X-123") == [
+        "X-123",
+        "2024/1234",
+    ]
+    assert get_exact_terms("No codes here") == []
+
+
+async def test_hybrid_search_fuses_semantic_and_keyword_results(datastore: Datastore):
+    semantic_chunk = _chunk(0.8)
+    keyword_chunk = _chunk(0.1)
+    datastore.chunk_repo.semantic_search.return_value = [semantic_chunk]
+    datastore.chunk_repo.keyword_search.return_value = [keyword_chunk]
+
+    results = await datastore.hybrid_search(
+        search_string="conversation and question",
+        keyword_search_string="question",
+        collections=[TEST_COLLECTION],
+        embedding_model=TEST_COLLECTION.embedding_model,
+    )
+
+    assert {chunk.id for chunk in results} == {semantic_chunk.id, keyword_chunk.id}
+    assert datastore.chunk_repo.keyword_search.call_args.args == ("question",)
+
+
+async def test_hybrid_search_falls_back_to_exact_terms(datastore: Datastore):
+    keyword_chunk = _chunk(0.1)
+    datastore.chunk_repo.semantic_search.return_value = []
+    datastore.chunk_repo.keyword_search.side_effect = [[], [keyword_chunk]]
+
+    results = await datastore.hybrid_search(
+        search_string="What is the status of case 2024-1234?",
+        collections=[TEST_COLLECTION],
+        embedding_model=TEST_COLLECTION.embedding_model,
+    )
+
+    assert [chunk.id for chunk in results] == [keyword_chunk.id]
+    assert datastore.chunk_repo.keyword_search.call_args.args == ("2024-1234",)
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from intric.files.audio import AudioFile
+
+SAMPLERATE = 8000
+
+
+@pytest.fixture
+def tone(tmp_path):
+    """Twenty seconds of stereo tone, silent between 7.5 and 8 seconds."""
+    seconds = np.arange(20 * SAMPLERATE) / SAMPLERATE
+    data = 0.5 * np.sin(2 * np.pi * 440 * seconds)
+    data[int(7.5 * SAMPLERATE) : 8 * SAMPLERATE] = 0
+
+    filepath = tmp_path / "tone.wav"
+    sf.write(filepath, np.stack([data, data], axis=1), SAMPLERATE)
+    return AudioFile(str(filepath))
+
+
+async def test_split_file_in_segments_of_at_most_the_seconds(tone: AudioFile):
+    async with tone.asplit_file(seconds=6) as iter_segments:
+        segments = [segment async for segment in iter_segments]
+
+        assert [(s.start_seconds, s.end_seconds) for s in segments] == [
+            (0, 6),
+            (6, 12),
+            (12, 18),
+            (18, 20),
+        ]
+
+        for segment in segments:
+            info = sf.info(segment.path)
+            assert info.channels == 1
+            assert info.duration == pytest.approx(
+                segment.end_seconds - segment.start_seconds, abs=0.1
+            )
+
+    assert not segments[0].path.exists()
+
+
+async def test_split_file_cuts_at_silence(tone: AudioFile):
+    async with tone.asplit_file(seconds=9, silence_window_seconds=3) as iter_segments:
+        segments = [segment async for segment in iter_segments]
+        cut = segments[0].end_seconds
+
+    assert 7.5 <= cut <= 8
+    assert segments[1].start_seconds == cut
+    assert segments[-1].end_seconds == 20
+    assert all(s.end_seconds - s.start_seconds <= 9 for s in segments)
+
+
+async def test_split_file_can_be_left_before_it_is_done(tone: AudioFile):
+    async with tone.asplit_file(seconds=6) as iter_segments:
+        async for segment in iter_segments:
+            break
+
+    assert not segment.path.exists()
@@ -1,5 +1,10 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
 import pytest
 
+from intric.embedding_models.infrastructure.datastore import Datastore
+from intric.files import chunk_embedding_list as chunk_embedding_list_module
 from intric.files.chunk_embedding_list import ChunkEmbeddingList
 from intric.main.exceptions import ChunkEmbeddingMisMatchException
 
@@ -41,3 +46,61 @@ def test_fails_when_the_lengths_dont_match():
 
     with pytest.raises(ChunkEmbeddingMisMatchException):
         chunk_embedding_list.add([1, 2], [[1]])
+
+
+def test_grows_beyond_the_capacity():
+    chunk_embedding_list = ChunkEmbeddingList(capacity=2)
+
+    for i in range(5):
+        chunk_embedding_list.add([str(i)], [[float(i), 1.0]])
+
+    assert len(chunk_embedding_list) == 5
+    assert chunk_embedding_list.embeddings.tolist() == [[float(i), 1.0] for i in range(5)]
+
+
+def test_rows_are_views_of_the_matrix():
+    chunk_embedding_list = ChunkEmbeddingList(capacity=2)
+    chunk_embedding_list.add(["hello", "there"], [[1, 2], [3, 4]])
+
+    for _, embedding in chunk_embedding_list:
+        assert embedding.dtype == np.float32
+        assert np.shares_memory(embedding, chunk_embedding_list.embeddings)
+
+
+def test_fails_when_the_dimensions_dont_match():
+    chunk_embedding_list = ChunkEmbeddingList()
+    chunk_embedding_list.add(["hello"], [[1, 2, 3]])
+
+    with pytest.raises(ChunkEmbeddingMisMatchException):
+        chunk_embedding_list.add(["there"], [[1, 2]])
+
+
+def test_large_lists_are_memory_mapped(monkeypatch):
+    monkeypatch.setattr(chunk_embedding_list_module, "MEMMAP_THRESHOLD_BYTES", 16)
+    chunk_embedding_list = ChunkEmbeddingList(capacity=3)
+
+    chunk_embedding_list.add(["hello", "there", "Henry"], [[i, 2, 3, 4] for i in range(3)])
+
+    assert isinstance(chunk_embedding_list.embeddings, np.memmap)
+    assert [list(embedding) for _, embedding in chunk_embedding_list] == [
+        [i, 2, 3, 4] for i in range(3)
+    ]
+
+
+async def test_datastore_adds_the_matrix_in_batches():
+    chunk_repo = AsyncMock()
+    datastore = Datastore(
+        user=MagicMock(), info_blob_chunk_repo=chunk_repo, create_embeddings_service=MagicMock()
+    )
+    chunk_embedding_list = ChunkEmbeddingList()
+    chunk_embedding_list.add(list("abcde"), [[i, 0] for i in range(5)])
+
+    await datastore._add(chunk_embedding_list, batch_size=2)
+
+    batches = [call.args for call in chunk_repo.add.call_args_list]
+    assert [chunks for chunks, _ in batches] == [["a", "b"], ["c", "d"], ["e"]]
+    assert [embeddings.tolist() for _, embeddings in batches] == [
+        [[0, 0], [1, 0]],
+        [[2, 0], [3, 0]],
+        [[4, 0]],
+    ]
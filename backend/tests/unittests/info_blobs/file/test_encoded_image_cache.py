@@ -0,0 +1,54 @@
+import base64
+from unittest.mock import MagicMock
+
+import pytest
+
+from intric.files.encoded_image_cache import EncodedImageCache
+
+
+def _image(checksum: str, blob: bytes | None = b"image"):
+    return MagicMock(checksum=checksum, blob=blob, encoded_blob=None)
+
+
+def test_encode_caches_the_encoding():
+    cache = EncodedImageCache(max_bytes=1000)
+
+    assert cache.encode(_image("a")) == base64.b64encode(b"image").decode()
+    # Another file with the same content is not encoded again
+    assert cache.encode(_image("a", blob=None)) == base64.b64encode(b"image").decode()
+
+
+def test_encode_without_content():
+    cache = EncodedImageCache(max_bytes=1000)
+
+    with pytest.raises(ValueError):
+        cache.encode(_image("a", blob=None))
+
+
+def test_encode_uses_the_encoding_kept_with_the_file():
+    cache = EncodedImageCache(max_bytes=1000)
+    image = _image("a", blob=None)
+    image.encoded_blob = "ZW5jb2RlZA=="
+
+    assert cache.encode(image) == "ZW5jb2RlZA=="
+
+
+def test_evicts_the_least_recently_used_images():
+    cache = EncodedImageCache(max_bytes=16)
+    cache.put("a", "a" * 8)
+    cache.put("b", "b" * 8)
+
+    cache.get("a")
+    cache.put("c", "c" * 8)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.stats() == {"images": 2, "bytes": 16}
+
+
+def test_images_larger_than_the_cache_are_not_cached():
+    cache = EncodedImageCache(max_bytes=16)
+
+    cache.put("a", "a" * 17)
+
+    assert "a" not in cache
@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+
+from intric.files.extraction_executor import ExtractionExecutor
+from intric.main.exceptions import ExtractionFailedException
+
+
+def _extract(text: str, suffix: str = "") -> str:
+    return text + suffix
+
+
+def _sleep(seconds: float):
+    time.sleep(seconds)
+
+
+def _fail():
+    raise ValueError("Malformed document")
+
+
+def _allocate(size: int):
+    return len(bytearray(size))
+
+
+@pytest.fixture
+def executor():
+    return ExtractionExecutor(max_workers=2, timeout_seconds=5, memory_limit=None)
+
+
+async def test_run_returns_the_result(executor: ExtractionExecutor):
+    assert await executor.run(_extract, "Hello", suffix=" world") == "Hello world"
+
+
+async def test_run_raises_the_exception_of_the_job(executor: ExtractionExecutor):
+    with pytest.raises(ValueError, match="Malformed document"):
+        await executor.run(_fail)
+
+
+async def test_run_kills_jobs_that_time_out():
+    executor = ExtractionExecutor(max_workers=1, timeout_seconds=0.5)
+
+    start = time.perf_counter()
+    with pytest.raises(ExtractionFailedException):
+        await executor.run(_sleep, 30)
+
+    assert time.perf_counter() - start < 5
+
+
+async def test_run_fails_jobs_that_exceed_the_memory_limit():
+    pytest.importorskip("resource")
+    executor = ExtractionExecutor(max_workers=1, timeout_seconds=5, memory_limit=1024**3)
+
+    with pytest.raises(ExtractionFailedException):
+        await executor.run(_allocate, 2 * 1024**3)
+
+
+def test_run_from_several_event_loops():
+    executor = ExtractionExecutor(max_workers=1, timeout_seconds=5)
+
+    async def run_concurrently():
+        return await asyncio.gather(*[executor.run(_extract, str(i)) for i in range(2)])
+
+    # Waiting for the semaphore binds it to the loop
+    assert asyncio.run(run_concurrently()) == ["0", "1"]
+    assert asyncio.run(run_concurrently()) == ["0", "1"]
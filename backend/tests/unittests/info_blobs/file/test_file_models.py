@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from intric.database.tables.files_table import Files
+from intric.files.file_models import File, FileType
+
+
+def _row(**kwargs):
+    now = datetime.now(timezone.utc)
+    return Files(
+        id=uuid4(),
+        created_at=now,
+        updated_at=now,
+        name="image.png",
+        checksum="checksum",
+        size=10,
+        mimetype="image/png",
+        file_type=FileType.IMAGE,
+        blob_in_store=False,
+        user_id=uuid4(),
+        tenant_id=uuid4(),
+        **kwargs,
+    )
+
+
+def test_file_with_deferred_payload():
+    file = File.model_validate(_row())
+
+    assert not file.payload_loaded
+    assert file.blob is None
+    assert "payload_loaded" not in file.model_dump()
+
+
+def test_file_with_payload():
+    file = File.model_validate(_row(text=None, blob=b"image", transcription=None))
+
+    assert file.payload_loaded
+    assert file.blob == b"image"
+
+
+def test_file_without_content():
+    with pytest.raises(ValueError):
+        File.model_validate(_row(text=None, blob=None, transcription=None))
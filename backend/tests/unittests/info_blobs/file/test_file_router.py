@@ -0,0 +1,26 @@
+import pytest
+
+from intric.files.file_router import _parse_range
+
+
+@pytest.mark.parametrize(
+    ["header", "byte_range"],
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=900-2000", (900, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=", None),
+        ("items=0-10", None),
+        ("bytes=0-10,20-30", None),
+    ],
+)
+def test_parse_range(header: str, byte_range):
+    assert _parse_range(header, 1000) == byte_range
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=20-10", "bytes=-0"])
+def test_parse_range_not_satisfiable(header: str):
+    with pytest.raises(ValueError):
+        _parse_range(header, 1000)
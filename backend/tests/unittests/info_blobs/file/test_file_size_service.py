@@ -0,0 +1,43 @@
+import hashlib
+import io
+
+import pytest
+
+from intric.files import file_size_service as module
+from intric.files.file_size_service import FileSizeService
+from intric.main.exceptions import FileTooLargeException
+
+CONTENT = b"%PDF-1.4\n" + b"0" * (3 * module.CHUNK_SIZE)
+
+
+@pytest.fixture(autouse=True)
+def tmp_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(module, "TMP_DIR", str(tmp_path))
+    return tmp_path
+
+
+async def test_ingest_copies_hashes_and_sniffs_in_one_pass():
+    ingested = await FileSizeService().ingest(io.BytesIO(CONTENT), max_size=len(CONTENT))
+
+    assert ingested.filepath.read_bytes() == CONTENT
+    assert ingested.size == len(CONTENT)
+    assert ingested.checksum == hashlib.sha256(CONTENT).hexdigest()
+    assert ingested.mimetype == "application/pdf"
+
+
+async def test_ingest_keeps_the_declared_mimetype():
+    ingested = await FileSizeService().ingest(
+        io.BytesIO(b"plain text"), max_size=100, mimetype="text/markdown"
+    )
+
+    assert ingested.mimetype == "text/markdown"
+
+
+async def test_ingest_of_too_large_file_leaves_nothing_on_disk(tmp_dir):
+    upload = io.BytesIO(CONTENT)
+
+    with pytest.raises(FileTooLargeException):
+        await FileSizeService().ingest(upload, max_size=module.CHUNK_SIZE)
+
+    assert upload.closed
+    assert list(tmp_dir.iterdir()) == []
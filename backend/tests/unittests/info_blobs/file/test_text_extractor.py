@@ -0,0 +1,33 @@
+import pptx
+from pptx.util import Inches
+
+from intric.files.text import TextExtractor, TextMimeTypes
+
+
+def _presentation(tmp_path, slides: list[list[str]]):
+    presentation = pptx.Presentation()
+    for texts in slides:
+        slide = presentation.slides.add_slide(presentation.slide_layouts[6])
+        for text in texts:
+            textbox = slide.shapes.add_textbox(Inches(1), Inches(1), Inches(4), Inches(1))
+            textbox.text_frame.text = text
+
+    filepath = tmp_path / "presentation.pptx"
+    presentation.save(filepath)
+    return filepath
+
+
+def test_extract_slides_from_pptx_yields_a_text_per_slide(tmp_path):
+    filepath = _presentation(tmp_path, [["Hello", "world"], ["Second slide"]])
+
+    slides = list(TextExtractor.extract_slides_from_pptx(filepath))
+
+    assert slides == ["Hello \nworld \n", "Second slide \n"]
+
+
+def test_extract_joins_the_slides(tmp_path):
+    filepath = _presentation(tmp_path, [["Hello", "world"], ["Second slide"]])
+
+    text = TextExtractor().extract(filepath, TextMimeTypes.PPTX)
+
+    assert text == "Hello \nworld \nSecond slide"
@@ -0,0 +1,106 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from intric.files.file_size_service import FileSizeService
+from intric.files.transcriber import Transcriber
+from tests.fixtures import TEST_UUID
+
+
+@pytest.fixture
+def transcriber():
+    return Transcriber(
+        file_repo=AsyncMock(),
+        user=MagicMock(tenant_id=TEST_UUID),
+        transcription_cache_repo=AsyncMock(session=MagicMock()),
+    )
+
+
+@pytest.fixture
+def adapter():
+    @asynccontextmanager
+    async def to_wav(filepath):
+        yield MagicMock()
+
+    adapter = AsyncMock()
+    adapter.get_text_from_file.return_value = "Transcribed"
+
+    with (
+        patch("intric.files.transcriber.audio.to_wav", to_wav),
+        patch("intric.files.transcriber.OpenAISTTModelAdapter", return_value=adapter),
+    ):
+        yield adapter
+
+
+def _audio_file():
+    return MagicMock(blob=b"audio", mimetype="audio/mpeg", checksum="abc", transcription=None)
+
+
+async def test_transcribe_reuses_the_cached_transcription(transcriber: Transcriber, adapter):
+    transcriber.transcription_cache_repo.get.return_value = "Cached"
+    file = _audio_file()
+    model = MagicMock(id=TEST_UUID)
+
+    assert await transcriber.transcribe(file, model) == "Cached"
+
+    transcriber.transcription_cache_repo.get.assert_called_once_with(
+        tenant_id=TEST_UUID, checksum="abc", transcription_model_id=TEST_UUID
+    )
+    adapter.get_text_from_file.assert_not_called()
+    assert file.transcription == "Cached"
+    transcriber.file_repo.update.assert_called_once_with(file)
+
+
+async def test_transcribe_caches_for_at_most_the_retention(transcriber: Transcriber, adapter):
+    transcriber.transcription_cache_repo.get.return_value = None
+
+    result = await transcriber.transcribe(_audio_file(), MagicMock(id=TEST_UUID), retention_days=7)
+
+    assert result == "Transcribed"
+    kwargs = transcriber.transcription_cache_repo.add.call_args.kwargs
+    assert kwargs["checksum"] == "abc"
+    assert kwargs["transcription"] == "Transcribed"
+    expected_expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+    assert abs(kwargs["expires_at"] - expected_expires_at) < timedelta(minutes=1)
+
+
+async def test_transcribe_does_not_cache_without_retention_days(transcriber: Transcriber, adapter):
+    transcriber.transcription_cache_repo.get.return_value = None
+
+    await transcriber.transcribe(_audio_file(), MagicMock(id=TEST_UUID), retention_days=0)
+
+    transcriber.transcription_cache_repo.add.assert_not_called()
+
+
+async def test_transcribe_from_filepath_looks_up_the_checksum(
+    transcriber: Transcriber, adapter, tmp_path
+):
+    filepath = tmp_path / "audio.mp3"
+    filepath.write_bytes(b"audio")
+    transcriber.transcription_cache_repo.get.return_value = "Cached"
+
+    result = await transcriber.transcribe_from_filepath(
+        filepath=filepath, transcription_model=MagicMock(id=TEST_UUID)
+    )
+
+    assert result == "Cached"
+    checksum = transcriber.transcription_cache_repo.get.call_args.kwargs["checksum"]
+    assert checksum == FileSizeService.get_file_checksum(filepath)
+
+
+async def test_transcribe_from_filepath_uses_the_checksum_of_the_upload(
+    transcriber: Transcriber, adapter, tmp_path
+):
+    transcriber.transcription_cache_repo.get.return_value = "Cached"
+
+    # The file is not read again to compute the checksum
+    result = await transcriber.transcribe_from_filepath(
+        filepath=tmp_path / "missing.mp3",
+        transcription_model=MagicMock(id=TEST_UUID),
+        checksum="abc",
+    )
+
+    assert result == "Cached"
+    assert transcriber.transcription_cache_repo.get.call_args.kwargs["checksum"] == "abc"
@@ -70,3 +70,20 @@ async def test_update_fails_if_info_blob_with_same_name_exists(setup: Setup):
 
     with pytest.raises(NameCollisionException):
         await setup.service.update_info_blob(MagicMock())
+
+
+async def test_get_unchanged_info_blob_when_hash_matches(setup: Setup):
+    existing_info_blob = MagicMock(content_hash="hash")
+    setup.repo.get_by_title_and_source.return_value = existing_info_blob
+
+    info_blob = MagicMock(title="title", content_hash="hash")
+
+    assert await setup.service.get_unchanged_info_blob(info_blob) == existing_info_blob
+
+
+async def test_get_unchanged_info_blob_when_hash_differs(setup: Setup):
+    setup.repo.get_by_title_and_source.return_value = MagicMock(content_hash="old hash")
+
+    info_blob = MagicMock(title="title", content_hash="new hash")
+
+    assert await setup.service.get_unchanged_info_blob(info_blob) is None
@@ -0,0 +1,71 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from intric.info_blobs.text_processor import TextProcessor, get_content_hash
+from tests.fixtures import TEST_UUID
+
+
+@pytest.fixture
+def text_processor():
+    return TextProcessor(
+        user=MagicMock(id=TEST_UUID, tenant_id=TEST_UUID),
+        extractor=MagicMock(),
+        datastore=AsyncMock(),
+        info_blob_service=AsyncMock(),
+    )
+
+
+async def test_process_text_skips_unchanged_content(text_processor: TextProcessor):
+    unchanged_info_blob = MagicMock()
+    text_processor.info_blob_service.get_unchanged_info_blob.return_value = unchanged_info_blob
+
+    info_blob = await text_processor.process_text(
+        text="Hello world",
+        title="https://example.com",
+        website_id=TEST_UUID,
+        embedding_model=MagicMock(),
+    )
+
+    assert info_blob == unchanged_info_blob
+    text_processor.info_blob_service.add_info_blob_without_validation.assert_not_called()
+    text_processor.datastore.add.assert_not_called()
+
+
+async def test_process_text_embeds_changed_content(text_processor: TextProcessor):
+    text_processor.info_blob_service.get_unchanged_info_blob.return_value = None
+
+    await text_processor.process_text(
+        text="Hello world",
+        title="https://example.com",
+        website_id=TEST_UUID,
+        embedding_model=MagicMock(),
+        etag='"abc"',
+    )
+
+    add_info_blob = text_processor.info_blob_service.add_info_blob_without_validation
+    info_blob_add = add_info_blob.call_args[0][0]
+    assert info_blob_add.content_hash == get_content_hash("Hello world")
+    assert info_blob_add.etag == '"abc"'
+    text_processor.datastore.add.assert_called_once()
+
+
+async def test_process_file_extracts_text_in_the_executor(text_processor: TextProcessor):
+    text_processor.extraction_executor = AsyncMock()
+    text_processor.extraction_executor.run.return_value = "Hello world"
+    text_processor.info_blob_service.get_unchanged_info_blob.return_value = None
+
+    await text_processor.process_file(
+        filepath="document.pdf",
+        filename="document.pdf",
+        mimetype="application/pdf",
+        embedding_model=MagicMock(),
+        group_id=TEST_UUID,
+    )
+
+    text_processor.extraction_executor.run.assert_called_once_with(
+        text_processor.extractor.extract, "document.pdf", "application/pdf"
+    )
+    add_info_blob = text_processor.info_blob_service.add_info_blob_without_validation
+    info_blob_add = add_info_blob.call_args[0][0]
+    assert info_blob_add.text == "Hello world"
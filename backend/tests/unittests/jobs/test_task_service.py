@@ -0,0 +1,62 @@
+import hashlib
+import io
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from intric.files.file_size_service import FileSizeService
+from intric.jobs.job_models import Task
+from intric.jobs.task_models import UploadInfoBlob
+from intric.jobs.task_service import TaskService
+from intric.main.exceptions import FileNotSupportedException
+from tests.fixtures import TEST_USER, TEST_UUID
+
+CONTENT = b"Some text to upload\n" * 10
+
+
+@pytest.fixture
+def service():
+    return TaskService(user=TEST_USER, file_size_service=FileSizeService(), job_service=AsyncMock())
+
+
+async def test_queue_upload_file_passes_what_the_upload_computed(service: TaskService):
+    await service.queue_upload_file(
+        group_id=TEST_UUID,
+        space_id=TEST_UUID,
+        file=io.BytesIO(CONTENT),
+        mimetype="application/octet-stream",
+        filename="notes",
+    )
+
+    task_type = service.job_service.queue_job.call_args.args[0]
+    params = service.job_service.queue_job.call_args.kwargs["task_params"]
+    assert task_type == Task.UPLOAD_FILE
+    assert isinstance(params, UploadInfoBlob)
+    assert params.mimetype == "text/plain"
+    assert params.checksum == hashlib.sha256(CONTENT).hexdigest()
+
+    Path(params.filepath).unlink()
+
+
+async def test_queue_upload_file_removes_unsupported_files(service: TaskService, monkeypatch):
+    ingest = service.file_size_service.ingest
+    ingested = []
+
+    async def _ingest(*args, **kwargs):
+        ingested.append(await ingest(*args, **kwargs))
+        return ingested[-1]
+
+    monkeypatch.setattr(service.file_size_service, "ingest", _ingest)
+
+    with pytest.raises(FileNotSupportedException):
+        await service.queue_upload_file(
+            group_id=TEST_UUID,
+            space_id=TEST_UUID,
+            file=io.BytesIO(b"\x89PNG\r\n\x1a\n" + bytes(100)),
+            mimetype="application/octet-stream",
+            filename="image",
+        )
+
+    assert not ingested[0].filepath.exists()
+    service.job_service.queue_job.assert_not_called()
@@ -0,0 +1,156 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from redis.exceptions import TimeoutError
+
+from intric.main.models import Channel, ChannelType, RedisMessage, Status
+from intric.server.websockets import websocket_manager as module
+from intric.server.websockets.websocket_manager import WebSocketManager
+from intric.server.websockets.websocket_models import (
+    OutGoingMessageType,
+    WsOutgoingWebSocketMessage,
+)
+
+MESSAGE = WsOutgoingWebSocketMessage(type=OutGoingMessageType.PONG)
+
+
+class FakePubSub:
+    def __init__(self, messages: list[dict]):
+        self.messages = messages
+        self.psubscribe = AsyncMock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def get_message(self, **kwargs):
+        if self.messages:
+            return self.messages.pop(0)
+
+        await asyncio.Event().wait()
+
+
+def _manager(messages: list[dict] = []):
+    pubsub = FakePubSub(messages)
+    return WebSocketManager(redis=MagicMock(pubsub=MagicMock(return_value=pubsub))), pubsub
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def test_one_pattern_subscription_dispatches_to_subscribers():
+    user_id = uuid4()
+    channel = Channel(type=ChannelType.APP_RUN_UPDATES, user_id=user_id).channel_string
+    message = RedisMessage(id=uuid4(), status=Status.COMPLETE)
+    manager, pubsub = _manager(
+        [
+            {"type": "pmessage", "channel": b"other:channel", "data": b"{}"},
+            {
+                "type": "pmessage",
+                "channel": channel.encode(),
+                "data": message.model_dump_json().encode(),
+            },
+        ]
+    )
+    first, second = AsyncMock(), AsyncMock()
+
+    manager.subscribe(first, ChannelType.APP_RUN_UPDATES, user_id)
+    manager.subscribe(second, ChannelType.APP_RUN_UPDATES, user_id)
+    await _settle()
+
+    pubsub.psubscribe.assert_awaited_once_with(*module.CHANNEL_PATTERNS)
+    assert str(message.id) in first.send_text.call_args.args[0]
+    assert str(message.id) in second.send_text.call_args.args[0]
+
+    await manager.shutdown()
+
+
+async def test_listener_subscribes_again_after_any_error(monkeypatch):
+    monkeypatch.setattr(module, "RECONNECT_DELAY", 0)
+    user_id = uuid4()
+    channel = Channel(type=ChannelType.APP_RUN_UPDATES, user_id=user_id).channel_string
+    message = RedisMessage(id=uuid4(), status=Status.COMPLETE)
+    failing, pubsub = FakePubSub([]), FakePubSub(
+        [
+            {
+                "type": "pmessage",
+                "channel": channel.encode(),
+                "data": message.model_dump_json().encode(),
+            }
+        ]
+    )
+    failing.psubscribe.side_effect = TimeoutError()
+    manager = WebSocketManager(redis=MagicMock(pubsub=MagicMock(side_effect=[failing, pubsub])))
+    websocket = AsyncMock()
+
+    manager.subscribe(websocket, ChannelType.APP_RUN_UPDATES, user_id)
+    await _settle()
+
+    assert not manager.listener.done()
+    assert str(message.id) in websocket.send_text.call_args.args[0]
+
+    await manager.shutdown()
+
+
+async def test_slow_websocket_does_not_hold_up_the_others():
+    manager, _ = _manager()
+    user_id = uuid4()
+    channel = Channel(type=ChannelType.APP_RUN_UPDATES, user_id=user_id).channel_string
+    slow, fast = AsyncMock(), AsyncMock()
+
+    async def never_sent(text: str):
+        await asyncio.Event().wait()
+
+    slow.send_text.side_effect = never_sent
+
+    manager.subscribe(slow, ChannelType.APP_RUN_UPDATES, user_id)
+    manager.subscribe(fast, ChannelType.APP_RUN_UPDATES, user_id)
+    await manager.publish(channel, MESSAGE)
+    await manager.publish(channel, MESSAGE)
+    await _settle()
+
+    assert fast.send_text.await_count == 2
+    assert slow.send_text.call_count == 1
+
+    await manager.shutdown()
+
+
+async def test_full_queue_drops_the_oldest_message(monkeypatch):
+    monkeypatch.setattr(module, "SEND_QUEUE_SIZE", 1)
+    manager, _ = _manager()
+    websocket = AsyncMock()
+    manager.subscribe(websocket, ChannelType.APP_RUN_UPDATES, uuid4())
+    newest = WsOutgoingWebSocketMessage(type=OutGoingMessageType.APP_RUN_UPDATES)
+
+    manager._enqueue(websocket, MESSAGE)
+    manager._enqueue(websocket, newest)
+
+    assert manager.senders[websocket].queue.get_nowait() == newest
+
+    await manager.shutdown()
+
+
+async def test_unsubscribe_from_all_channels_stops_the_sender():
+    manager, _ = _manager()
+    websocket = AsyncMock()
+    user_id = uuid4()
+    manager.subscribe(websocket, ChannelType.APP_RUN_UPDATES, user_id)
+    manager.subscribe(websocket, ChannelType.CRAWL_RUN_UPDATES, user_id)
+    sender = manager.senders[websocket]
+
+    manager.unsubscribe(websocket, ChannelType.APP_RUN_UPDATES, user_id)
+    assert websocket in manager.senders
+
+    manager.unsubscribe_from_all_channels(websocket)
+    await _settle()
+
+    assert manager.channels == {}
+    assert manager.senders == {}
+    assert sender.task.cancelled()
+
+    await manager.shutdown()
@@ -0,0 +1,56 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from intric.completion_models.infrastructure.context_builder import ContextBuilder
+from intric.database.tables.files_table import Files
+from intric.files.file_models import File, FileType
+from intric.sessions.sessions_repo import SessionRepository
+
+FILE_TEXT = "This is the text from the file"
+
+
+def _file_loaded_with(options) -> File:
+    """Validates a file row with the columns the options defer left unloaded."""
+    deferred = {
+        element.path[-1].key
+        for option in options
+        for element in option.context
+        if dict(element.strategy or ()).get("deferred") and element.path[-2].class_ is Files
+    }
+    columns = dict(
+        id=uuid4(),
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+        name="test_file.pdf",
+        text=FILE_TEXT,
+        blob=None,
+        blob_in_store=False,
+        checksum="",
+        size=0,
+        mimetype="application/pdf",
+        file_type=FileType.TEXT,
+        transcription=None,
+        user_id=uuid4(),
+        tenant_id=uuid4(),
+    )
+    row = Files(**{name: value for name, value in columns.items() if name not in deferred})
+
+    return File.model_validate(row)
+
+
+def test_sessions_are_loaded_with_the_text_of_their_files():
+    file = _file_loaded_with(SessionRepository._options())
+    session = MagicMock(questions=[MagicMock(question="Question", answer="Answer", files=[file])])
+
+    context = ContextBuilder().build_context(
+        input_str="I have a question", session=session, max_tokens=10000
+    )
+
+    assert f'"text": "{FILE_TEXT}"' in context.messages[0].question
+
+
+def test_history_is_loaded_with_the_text_of_the_files():
+    file = _file_loaded_with(SessionRepository._history_options())
+
+    assert file.text == FILE_TEXT
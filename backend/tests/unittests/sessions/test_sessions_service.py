@@ -115,3 +115,35 @@ async def test_delete_error_when_user_not_owner_of_session(service: SessionServi
 
     with pytest.raises(UnauthorizedException, match="belongs to other user"):
         await service.delete(1)
+
+
+async def test_get_with_recent_history_passes_the_window_to_the_repo(service: SessionService):
+    session = SessionInDB(
+        user_id=TEST_USER.id,
+        name="test_session",
+        assistant=TEST_ASSISTANT,
+        id=TEST_UUID,
+    )
+    service.session_repo.get_with_recent_history.return_value = session
+
+    session_in_db = await service.get_session_with_recent_history(
+        TEST_UUID, max_questions=10, assistant_id=TEST_ASSISTANT.id
+    )
+
+    assert session_in_db == session
+    service.session_repo.get_with_recent_history.assert_awaited_once_with(
+        id=TEST_UUID, max_questions=10
+    )
+
+
+async def test_get_with_recent_history_error_when_user_not_owner_of_session(
+    service: SessionService,
+):
+    service.session_repo.get_with_recent_history.return_value = SessionInDB(
+        user_id=uuid4(),
+        name="test_session",
+        id=TEST_UUID,
+    )
+
+    with pytest.raises(UnauthorizedException, match="belongs to other user"):
+        await service.get_session_with_recent_history(TEST_UUID, max_questions=10)
@@ -0,0 +1,63 @@
+import contextlib
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.database.transaction import unit_of_work
+from intric.worker import worker as module
+from intric.worker.task_manager import TaskManager
+from intric.worker.worker import Worker
+
+
+def _session(in_transaction: bool):
+    session = MagicMock()
+    session.in_transaction.return_value = in_transaction
+    return session
+
+
+@pytest.mark.parametrize(
+    ["in_transaction", "savepoint", "expected"],
+    [
+        (False, True, "begin"),
+        (False, False, "begin"),
+        (True, True, "begin_nested"),
+        (True, False, None),
+    ],
+)
+async def test_unit_of_work(in_transaction: bool, savepoint: bool, expected: str):
+    session = _session(in_transaction)
+
+    async with unit_of_work(session, savepoint=savepoint):
+        pass
+
+    for method in ["begin", "begin_nested"]:
+        assert getattr(session, method).called == (method == expected)
+
+
+async def test_task_with_short_transactions_commits_the_status_on_its_own(monkeypatch):
+    session = _session(in_transaction=False)
+
+    @contextlib.asynccontextmanager
+    async def session_context():
+        yield session
+
+    monkeypatch.setattr(module.sessionmanager, "session", session_context)
+    job_service = AsyncMock()
+    task_manager = TaskManager(
+        user=MagicMock(), job_id=uuid4(), session=session, job_service=job_service
+    )
+    container = MagicMock()
+    container.task_manager.return_value = task_manager
+    worker = Worker()
+    worker._create_container = AsyncMock(return_value=container)
+
+    @worker.task(with_user=False, short_transactions=True)
+    async def long_task(params, container):
+        return "/result"
+
+    assert await long_task({"job_id": task_manager.job_id}, MagicMock(id=uuid4()))
+
+    # One transaction for the in progress status, and one for the completion
+    assert session.begin.call_count == 2
+    job_service.complete_job.assert_awaited_once_with(task_manager.job_id, "/result")